@@ -50,8 +50,6 @@ OUTPUTS=./outputs
 rm -f -r $SCRATCH $INPUTS $OUTPUTS
 mkdir $SCRATCH $INPUTS $OUTPUTS
 
-cp elmfire.data.in $INPUTS/elmfire.data
-
 printf "x,y,z\n-100000,-100000,0\n100000,-100000,0\n-100000,100000,0\n100000,100000,0\n" > $SCRATCH/dummy.xyz
 
 gdalwarp -tr 200000 200000 -te -100000 -100000 100000 100000 -s_srs "$A_SRS" -t_srs "$A_SRS" $SCRATCH/dummy.xyz $SCRATCH/dummy.tif
@@ -60,31 +58,43 @@ gdalwarp -dstnodata -9999 -ot Int16   -tr $TR -te $TE $SCRATCH/dummy.tif $SCRATC
 
 # Create float input rasters
 for i in $(eval echo "{1..$NUM_FLOAT_RASTERS}"); do
-   gdal_calc.py -A $SCRATCH/float.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/${FLOAT_RASTER[i]}.tif" --calc="A + ${FLOAT_VAL[i]}"
+   gdal_calc.py -A $SCRATCH/float.tif $(raster_co --co float) --NoDataValue=-9999 --outfile="$INPUTS/${FLOAT_RASTER[i]}.tif" --calc="A + ${FLOAT_VAL[i]}"
 done
 
 # Create integer input rasters
 for i in $(eval echo "{1..$NUM_INT_RASTERS}"); do
-   gdal_calc.py -A $SCRATCH/int.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/${INT_RASTER[i]}.tif" --calc="A + ${INT_VAL[i]}"
+   gdal_calc.py -A $SCRATCH/int.tif $(raster_co --co int) --NoDataValue=-9999 --outfile="$INPUTS/${INT_RASTER[i]}.tif" --calc="A + ${INT_VAL[i]}"
 done
 
-# Set inputs in elmfire.data
-replace_line COMPUTATIONAL_DOMAIN_XLLCORNER $XMIN no
-replace_line COMPUTATIONAL_DOMAIN_YLLCORNER $YMIN no
-replace_line COMPUTATIONAL_DOMAIN_CELLSIZE $CELLSIZE no
-replace_line SIMULATION_TSTOP $SIMULATION_TSTOP no
-replace_line LH_MOISTURE_CONTENT $LH_MOISTURE_CONTENT no
-replace_line LW_MOISTURE_CONTENT $LW_MOISTURE_CONTENT no
-replace_line A_SRS "$A_SRS" yes
+# Set inputs in elmfire.data (rendered from elmfire.data.in in a single write)
+render_elmfire_data elmfire.data.in $INPUTS/elmfire.data \
+   COMPUTATIONAL_DOMAIN_XLLCORNER=$XMIN \
+   COMPUTATIONAL_DOMAIN_YLLCORNER=$YMIN \
+   COMPUTATIONAL_DOMAIN_CELLSIZE=$CELLSIZE \
+   SIMULATION_TSTOP=$SIMULATION_TSTOP \
+   LH_MOISTURE_CONTENT=$LH_MOISTURE_CONTENT \
+   LW_MOISTURE_CONTENT=$LW_MOISTURE_CONTENT \
+   A_SRS="$A_SRS"
 
 # Execute ELMFIRE
 elmfire_$ELMFIRE_VER ./inputs/elmfire.data
 
+# With FUSED_POSTPROCESS=1 the raw .bil/.hdr outputs are left for fused_worker.py
+# (see 0N-run.sh), which reads them directly, so the GeoTIFF conversion is skipped
+if [ "${FUSED_POSTPROCESS:-0}" = "1" ]; then
+   rm -f -r ./outputs/*.csv $SCRATCH
+   exit 0
+fi
+
 # Postprocess
 for f in ./outputs/*.bil; do
-   gdal_translate -a_srs "$A_SRS" -co "COMPRESS=DEFLATE" -co "ZLEVEL=9" $f ./outputs/`basename $f | cut -d. -f1`.tif
+   gdal_translate -a_srs "$A_SRS" $(raster_co -co float) $f ./outputs/`basename $f | cut -d. -f1`.tif
 done
-gdal_contour -i 3600 `ls ./outputs/time_of_arrival*.tif` ./outputs/hourly_isochrones.shp
+# Isochrones are opt-in: GDAL_ISOCHRONES=1 writes per-run shapefiles with gdal_contour, or run
+# ../01-test-postprocess/isochrones.py once per campaign (ISOCHRONES=1 in 0N-run.sh)
+if [ "${GDAL_ISOCHRONES:-0}" = "1" ]; then
+   gdal_contour -i 3600 `ls ./outputs/time_of_arrival*.tif | tail -n 1` ./outputs/hourly_isochrones.shp
+fi
 
 # Clean up and exit:
 rm -f -r ./outputs/*.csv ./outputs/*.bil ./outputs/*.hdr $SCRATCH
@@ -28,26 +28,143 @@ if [ -z "$3" ]; then
 else
     DOMAIN_SIZE=$3
 fi
+# optional: number of cases generated from each ELMFIRE run, the predicted maximum spread
+# distance (m) used to size the guard bands between packed fires, and the generation mode.
+# With MAX_SPREAD=observed (default) the first packed run uses the domain size and later runs
+# use the largest spread observed in the completed cases (pack_ignitions.py max_spread);
+# fires that outgrow the guard band are rejected and rerun, so their spread is observed too.
+#   pack      - independent fires packed on a tiled domain (see pack_ignitions.py)
+#   translate - one centered fire shifted to each ignition point (see translate_ignitions.py)
+FIRES_PER_RUN=${4:-1}
+MAX_SPREAD=${5:-observed}
+MODE=${6:-pack}
+# optional: FUSED_POSTPROCESS=1 postprocesses each single-ignition run straight from the raw
+# .bil outputs into ./elmfire_sims (see ../01-test-postprocess/fused_worker.py) instead of
+# converting them to GeoTIFFs in ./cases. Packed and translate modes need the GeoTIFFs.
+# POSTPROCESS_ARGS passes the postprocessor options to the fused worker so it builds the same
+# dataset as elmfire_postprocessor.py would, e.g. POSTPROCESS_ARGS="--trim 1 --crop_size 64 --center_on_ignition"
+FUSED=${FUSED_POSTPROCESS:-0}
+unset FUSED_POSTPROCESS
+POSTPROCESS_ARGS=${POSTPROCESS_ARGS:-}
+# optional: RASTER_CODEC, RASTER_LEVEL and RASTER_PREDICTOR set the GeoTIFF codec policy of the
+# campaign (default DEFLATE level 9, no predictor); see raster_co in ../functions/functions.sh and
+# ../functions/benchmark_codecs.py to measure the settings on our own rasters
+# optional: ISOCHRONES=1 writes the hourly TOA isochrones of all cases to one isochrones.parquet
+# at the end of the campaign, from ./cases or, in fused campaigns, from ./elmfire_sims
+# (see ../01-test-postprocess/isochrones.py)
+ISOCHRONES=${ISOCHRONES:-0}
+
+write_isochrones() {
+    if [ "$ISOCHRONES" = "1" ]; then
+        SIMS_ARGS=""
+        if [ "$FUSED" = "1" ]; then
+            SIMS_ARGS="--sims_dir ./elmfire_sims"
+        fi
+        python3 ../01-test-postprocess/isochrones.py --cases_dir $RUN_DIR --out isochrones.parquet $SIMS_ARGS
+    fi
+}
 
 # replace input_tracking.txt with the header
 echo "run,xign,yign,fuel,slp,asp,ws,wd,m1,m10,m100,cc,ch,cbh,cbd,lhc,lwc" > input_tracking.txt
 # reset sim_times.txt
 echo "run,sim_time" > sim_times.txt
+# reset the per-case summaries, raster previews and parameter statistics
+# (see case_summary.py, case_previews.py, param_stats.py)
+rm -f case_summaries.csv case_previews.npz param_stats.json
 
 RUN_DIR="./cases"
 rm -rf $RUN_DIR
 mkdir -p $RUN_DIR
+if [ "$FUSED" = "1" ]; then
+    rm -rf ./elmfire_sims
+fi
+
+if [ "$FIRES_PER_RUN" -gt 1 ] && [ "$MODE" = "translate" ]; then
+    rm -f translation_flags.txt
+    run=1
+    while (( run <= NUM_RUNS )); do
+        NUM_CASES=$(( NUM_RUNS - run + 1 < FIRES_PER_RUN ? NUM_RUNS - run + 1 : FIRES_PER_RUN ))
+        echo "Running centered simulation for run numbers: $run-$(( run + NUM_CASES - 1 ))"
+
+        # Simulate once on an enlarged domain and shift/crop the fire to each ignition point
+        python3 translate_ignitions.py setup $run $NUM_CASES $TSTOP $DOMAIN_SIZE
+        bash 01-run.sh
+        python3 translate_ignitions.py synthesize
+        rm -rf outputs/*
+        python3 case_summary.py --previews case_previews.npz --param_stats param_stats.json $(seq -f "$RUN_DIR/case_%g" $run $(( run + NUM_CASES - 1 )))
+
+        run=$(( run + NUM_CASES ))
+    done
+    write_isochrones
+    exit 0
+fi
+
+if [ "$FIRES_PER_RUN" -gt 1 ]; then
+    SPREAD=$MAX_SPREAD
+    if [ "$MAX_SPREAD" = "observed" ]; then
+        SPREAD=$DOMAIN_SIZE
+        OBSERVED_SPREAD=0
+    fi
+    run=1
+    while (( run <= NUM_RUNS )); do
+        NUM_FIRES=$(( NUM_RUNS - run + 1 < FIRES_PER_RUN ? NUM_RUNS - run + 1 : FIRES_PER_RUN ))
+        echo "Running packed simulation for run numbers: $run-$(( run + NUM_FIRES - 1 ))"
+
+        # Lay out the ignitions on a tiled domain, run once and crop each fire into its case
+        python3 pack_ignitions.py layout $run $NUM_FIRES $TSTOP $DOMAIN_SIZE $SPREAD
+        bash 01-run.sh
+        python3 pack_ignitions.py crop
+        rm -rf outputs/*
+
+        # Rerun fires that crossed a guard band as single-ignition runs
+        for rerun in $(cat packing_reruns.txt); do
+            echo "Rerunning run number $rerun without packing"
+            python3 pack_ignitions.py rerun $rerun $TSTOP $DOMAIN_SIZE
+            bash 01-run.sh
+            RUN_CASE_DIR="$RUN_DIR/case_$rerun"
+            mkdir -p $RUN_CASE_DIR
+            mv outputs/* $RUN_CASE_DIR/
+        done
+        python3 case_summary.py --previews case_previews.npz --param_stats param_stats.json $(seq -f "$RUN_DIR/case_%g" $run $(( run + NUM_FIRES - 1 )))
+
+        # Size the next guard bands from the spread observed so far
+        if [ "$MAX_SPREAD" = "observed" ]; then
+            OBSERVED_SPREAD=$(python3 pack_ignitions.py max_spread $run $(( run + NUM_FIRES - 1 )) $OBSERVED_SPREAD)
+            SPREAD=$OBSERVED_SPREAD
+        fi
+
+        run=$(( run + NUM_FIRES ))
+    done
+    write_isochrones
+    exit 0
+fi
+
 for (( run=1; run<=NUM_RUNS; run++ )); do
     echo "Running simulation for run number: $run"
     
     # Call set_params.py to set the parameters
     python3 set_params.py $run $TSTOP $DOMAIN_SIZE
 
+    if [ "$FUSED" = "1" ]; then
+        FUSED_POSTPROCESS=1 bash 01-run.sh
+        python3 ../01-test-postprocess/fused_worker.py ./outputs --case case_$run --output_dir ./elmfire_sims \
+            --summary case_summaries.csv --previews case_previews.npz --param_stats param_stats.json $POSTPROCESS_ARGS
+        continue
+    fi
+
     bash 01-run.sh
     
     # Create a directory for this run and move inputs and outputs
     RUN_CASE_DIR="$RUN_DIR/case_$run"
     mkdir -p $RUN_CASE_DIR
     mv outputs/* $RUN_CASE_DIR/
+    python3 case_summary.py --previews case_previews.npz --param_stats param_stats.json $RUN_CASE_DIR
     
 done
+
+if [ "$FUSED" = "1" ]; then
+    # merge the per-run channel statistics of the fused workers into elmfire_sims/channel_stats.json
+    python3 ../01-test-postprocess/channel_stats.py --combine ./elmfire_sims
+fi
+
+write_isochrones
@@ -5,15 +5,30 @@ from matplotlib import cm
 import pandas as pd
 import seaborn as sns
 
+import os
 import glob
 import rasterio
+import numpy as np
+
+from results_table import load_results
+from case_summary import burned_window
+from raster_window import read_window
+from case_previews import load_previews
+from param_stats import load_param_stats
 
 case_dir = './cases'
 
-# prints max and min for raster files of a case
-def print_case_info(case_num):
+# prints max and min for raster files of a case, from case_summaries.csv when the case is in it
+def print_case_info(case_num, summary_file='case_summaries.csv'):
     case_path = f'{case_dir}/case_{case_num}'
     print(f'Case {case_num} path: {case_path}')
+
+    if os.path.exists(summary_file):
+        summaries = load_results(summary_file)
+        row = summaries[summaries['run'] == case_num]
+        if len(row):
+            print(row.iloc[-1].to_string())
+            return
     
     patterns = ["flin_*.tif", "time_of_arrival_*.tif", "vs_*.tif"]
 
@@ -29,8 +44,12 @@ def print_all_cases_info(num_cases, max_cases=10):
         print_case_info(i)
 
 # plot rasters for one case
-def plot_case(case_num):
+# window: a rasterio Window to read, or True for the burned extent recorded in case_summaries.csv
+# (grown by padding cells); unburned cases are drawn empty
+def plot_case(case_num, window=None, padding=2, pad_nodata=False):
     case_path = f'{case_dir}/case_{case_num}'
+    if window is True:
+        window = burned_window(case_num, padding=padding)
     # plot the three rasters
     flin_files = glob.glob(f"{case_path}/flin_*.tif")
     time_files = glob.glob(f"{case_path}/time_of_arrival_*.tif")
@@ -41,14 +60,11 @@ def plot_case(case_num):
         time_file = time_files[0]
         vs_file = vs_files[0]
 
-        with rasterio.open(flin_file) as src:
-            flin_data = src.read(1)
-        
-        with rasterio.open(time_file) as src:
-            time_data = src.read(1)
-        
-        with rasterio.open(vs_file) as src:
-            vs_data = src.read(1)
+        rasters = []
+        for filepath in (flin_file, time_file, vs_file):
+            with rasterio.open(filepath) as src:
+                rasters.append(read_window(src, window, pad_nodata)[0])
+        flin_data, time_data, vs_data = rasters
 
         # Plotting the rasters
         fig, axs = plt.subplots(1, 3, figsize=(15, 5))
@@ -68,28 +84,55 @@ def plot_case(case_num):
         print("One or more output files not found. Please check the output directory and file patterns.")
 
 # plot all of one raster type for all cases in a grid
-def plot_all_cases_raster(pattern, num_cases, max_cols=5):
+# preview_size (32 or 64) draws the cached overviews from case_previews.npz instead of the GeoTIFFs
+def plot_all_cases_raster(pattern, num_cases, max_cols=5, preview_size=None):
     print(f'Plotting all cases for raster pattern: {pattern}')
     fig, axes = plt.subplots(nrows=1, ncols=max_cols, figsize=(15, 5))
-    for i in range(1, min(num_cases, max_cols) + 1):
-        case_path = f'{case_dir}/case_{i}'
-        filepath = glob.glob(f"{case_path}/{pattern}")
-        if filepath:
+    runs = range(1, min(num_cases, max_cols) + 1)
+    previews = load_previews(runs, pattern.split('_*')[0], preview_size) if preview_size else {}
+    for i in runs:
+        if i in previews:
+            data = previews[i]
+        else:
+            case_path = f'{case_dir}/case_{i}'
+            filepath = glob.glob(f"{case_path}/{pattern}")
+            if not filepath:
+                continue
             with rasterio.open(filepath[0]) as src:
                 data = src.read(1)
-                ax = axes[i - 1]
-                show(data, ax=ax, cmap=cm.viridis)
-                ax.set_title(f"Case {i}")
-                ax.set_axis_off()
+        ax = axes[i - 1]
+        show(data, ax=ax, cmap=cm.viridis)
+        ax.set_title(f"Case {i}")
+        ax.set_axis_off()
     plt.tight_layout()
     plt.show()
     
+# histogram with a KDE line; with kde_sample the KDE is estimated on at most that many random
+# values (Gaussian kernel, Scott's bandwidth) and scaled to the counts, since seaborn's KDE over
+# every run dominates the plotting time of large campaigns
+def hist_with_kde(data, kde_sample=None, seed=0, **kwargs):
+    data = data.dropna()
+    if kde_sample is None or len(data) <= kde_sample:
+        return sns.histplot(data, kde=True, **kwargs)
+
+    ax = sns.histplot(data, kde=False, **kwargs)
+    sample = data.sample(kde_sample, random_state=seed).to_numpy(dtype=float)
+    bandwidth = sample.std() * len(sample) ** (-1 / 5)
+    if bandwidth == 0:
+        return ax
+    grid = np.linspace(data.min() - 3 * bandwidth, data.max() + 3 * bandwidth, 200)
+    density = np.exp(-0.5 * ((grid[:, None] - sample[None, :]) / bandwidth) ** 2).sum(axis=1)
+    density /= len(sample) * bandwidth * np.sqrt(2 * np.pi)
+    bin_width = ax.patches[-1].get_width() if ax.patches else 1.0
+    ax.plot(grid, density * len(data) * bin_width, color=kwargs.get('color', 'C0'))
+    return ax
+
 # plot the distribution of all of the input parameters for all cases
 # run,xign,yign,fuel,slp,asp,ws,wd,m1,m10,m100,cc,ch,cbh,cbd,lhc,lwc in input_tracking.txt
-def plot_input_distribution():
+def plot_input_distribution(kde_sample=None):
 
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Input parameters distribution from {input_file}:')
     print(df.describe())
@@ -98,7 +141,7 @@ def plot_input_distribution():
     plt.figure(figsize=(15, 10))
     for i, column in enumerate(df.columns[1:], start=1):
         plt.subplot(4, 5, i)
-        sns.histplot(df[column], kde=True)
+        hist_with_kde(df[column], kde_sample)
         plt.title(column)
         plt.xlabel('')
         plt.ylabel('Frequency')
@@ -109,7 +152,7 @@ def plot_input_distribution():
 # for each input, plot with run number on x-axis
 def plot_input_vs_run():
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Input parameters vs Run number from {input_file}:')
     print(df.describe())
@@ -146,7 +189,7 @@ def plot_input_vs_run():
 # DEM,elevation,0,-,-,[0,0],# not perturbed
 def check_input_ranges():
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Checking input parameter ranges from {input_file}:')
     print(df.columns)
@@ -185,7 +228,7 @@ def check_input_ranges():
 # I want to analyze the way in which the fire area changes with the input parameters
 def analyze_fire_area():
     input_file = 'it_scratch_fixed.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Analyzing fire area from {input_file}:')
     
@@ -208,9 +251,21 @@ def analyze_fire_area():
         print("No 'firearea' column found in the input file.")
 
 # get fire area covariance with each input parameter
-def fire_area_covariance():
+# from it_scratch_fixed.txt, or from the running statistics in stats_file (e.g. param_stats.json,
+# also mid-campaign) when it is given
+def fire_area_covariance(stats_file=None):
+    if stats_file:
+        if not os.path.exists(stats_file):
+            raise FileNotFoundError(f"Parameter statistics not found: {stats_file}")
+        stats = load_param_stats(stats_file)
+        print(f'Fire area covariance from {stats_file} ({stats.count} runs):')
+        covariances = stats.covariance()['firearea'].drop('firearea').to_dict()
+        for column, cov in covariances.items():
+            print(f"Covariance between fire area and {column}: {cov}")
+        return covariances
+
     input_file = 'it_scratch_fixed.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Calculating fire area covariance from {input_file}:')
     
@@ -230,15 +285,25 @@ def fire_area_covariance():
 
 # calculate correlation coefficient between fire area and each input parameter
 # and plot heatmap of the correlation coefficients
-def fire_area_correlation():
-    input_file = 'it_scratch_fixed.txt'
-    df = pd.read_csv(input_file)
-
-    print(f'Calculating fire area correlation from {input_file}:')
+# from it_scratch_fixed.txt, or from the running statistics in stats_file (e.g. param_stats.json,
+# also mid-campaign) when it is given
+def fire_area_correlation(stats_file=None):
+    if stats_file:
+        if not os.path.exists(stats_file):
+            raise FileNotFoundError(f"Parameter statistics not found: {stats_file}")
+        stats = load_param_stats(stats_file)
+        print(f'Fire area correlation from {stats_file} ({stats.count} runs):')
+        df = None
+        correlation_matrix = stats.correlation()
+    else:
+        input_file = 'it_scratch_fixed.txt'
+        df = load_results(input_file)
+        print(f'Calculating fire area correlation from {input_file}:')
     
     # Check if 'firearea' column exists
-    if 'firearea' in df.columns:
-        correlation_matrix = df.corr()
+    if df is None or 'firearea' in df.columns:
+        if df is not None:
+            correlation_matrix = df.corr()
         fire_area_corr = correlation_matrix['firearea'].drop('firearea')
         
         print("Correlation coefficients with fire area:")
@@ -257,7 +322,7 @@ def fire_area_correlation():
 # select cases with the most fire area
 def select_cases_with_most_fire_area(num_cases):
     input_file = 'it_scratch_fixed.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Selecting top {num_cases} cases with the most fire area from {input_file}:')
     
@@ -271,9 +336,10 @@ def select_cases_with_most_fire_area(num_cases):
         print("No 'firearea' column found in the input file.")
 
 # get the cases with the most fire are and plot their time of arrival on subplots
-def plot_top_fire_area_cases(num_cases):
+# preview_size (32 or 64) draws the cached overviews from case_previews.npz instead of the GeoTIFFs
+def plot_top_fire_area_cases(num_cases, preview_size=None):
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Plotting top {num_cases} cases with the most fire area from {input_file} (excluding fire area == 3419.5):')
     
@@ -286,6 +352,7 @@ def plot_top_fire_area_cases(num_cases):
         # Set up 3 rows and 5 columns for subplots
         fig, axes = plt.subplots(nrows=3, ncols=5, figsize=(18, 10))
         axes = axes.flatten()
+        previews = load_previews(top_cases['run'], 'time_of_arrival', preview_size) if preview_size else {}
         
         for ax_idx, (i, row) in enumerate(top_cases.iterrows()):
             case_num = row['run']
@@ -295,15 +362,18 @@ def plot_top_fire_area_cases(num_cases):
             print(case_path)
             time_files = glob.glob(f"{case_path}/time_of_arrival_*.tif")
             
-            if time_files:
-                with rasterio.open(time_files[0]) as src:
-                    time_data = src.read(1)
-                    ax = axes[ax_idx]
-                    show(time_data, ax=ax, cmap=cm.viridis)
-                    ax.set_title(
-                        f"Case {case_num}\nFire Area: {row['firearea']:.1f}\n"
-                        f"x_ign: {x_ign:.1f}, y_ign: {y_ign:.1f}"
-                    )
+            if int(case_num) in previews or time_files:
+                if int(case_num) in previews:
+                    time_data = previews[int(case_num)]
+                else:
+                    with rasterio.open(time_files[0]) as src:
+                        time_data = src.read(1)
+                ax = axes[ax_idx]
+                show(time_data, ax=ax, cmap=cm.viridis)
+                ax.set_title(
+                    f"Case {case_num}\nFire Area: {row['firearea']:.1f}\n"
+                    f"x_ign: {x_ign:.1f}, y_ign: {y_ign:.1f}"
+                )
             else:
                 print(f"No time of arrival file found for case {case_num}.")
         
@@ -319,7 +389,7 @@ def plot_top_fire_area_cases(num_cases):
 # get all of the fire cases for which there is 0 fire area and plot the distribution of their x and y ignition points
 def plot_zero_fire_cases(firearea_threshold=0.2):
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Plotting cases with zero fire area from {input_file}:')
     
@@ -342,7 +412,7 @@ def plot_zero_fire_cases(firearea_threshold=0.2):
 # plot fire area against each input parameter
 def plot_fire_area_vs_inputs():
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Plotting fire area against each input parameter from {input_file}:')
     
@@ -363,7 +433,7 @@ def plot_fire_area_vs_inputs():
 # get the maximum fuel model for which there is fire area
 def max_fuel_model_fire_area():
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Finding maximum fuel model with fire area from {input_file}:')
     
@@ -376,9 +446,9 @@ def max_fuel_model_fire_area():
         return None
     
 # plot the distribution of a given variable for all cases with fire area under a given threshold
-def plot_var_dist_for_firearea_underthreshold(variable='yign', threshold=0.2):
+def plot_var_dist_for_firearea_underthreshold(variable='yign', threshold=0.2, kde_sample=None):
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Plotting distribution of {variable} for cases with fire area under {threshold} from {input_file}:')
     
@@ -387,7 +457,7 @@ def plot_var_dist_for_firearea_underthreshold(variable='yign', threshold=0.2):
         print(f"Number of cases with fire area <= {threshold}: {len(filtered_cases)}")
         
         plt.figure(figsize=(10, 6))
-        sns.histplot(filtered_cases[variable], kde=True)
+        hist_with_kde(filtered_cases[variable], kde_sample)
         plt.title(f'Distribution of {variable} for Cases with Fire Area <= {threshold}')
         plt.xlabel(variable)
         plt.ylabel('Frequency')
@@ -400,7 +470,7 @@ def plot_var_dist_for_firearea_underthreshold(variable='yign', threshold=0.2):
 # check how many cases there are with model < 16
 def check_model_distribution(model_threshold=16):
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Checking distribution of fuel model < {model_threshold} from {input_file}:')
     
@@ -424,7 +494,7 @@ def check_model_distribution(model_threshold=16):
 # averag fire area for each fuel model
 def average_fire_area_per_fuel_model():
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Calculating average fire area per fuel model from {input_file}:')
     
@@ -448,7 +518,7 @@ def average_fire_area_per_fuel_model():
 # print all cases for which fuel model is less than 16
 def print_cases_with_fuel_model_less_than(model_threshold=16):
     input_file = 'input_tracking.txt'
-    df = pd.read_csv(input_file)
+    df = load_results(input_file)
 
     print(f'Printing cases with fuel model < {model_threshold} from {input_file}:')
     
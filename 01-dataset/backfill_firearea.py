@@ -0,0 +1,86 @@
+# this script backfills the firearea column of input_tracking.txt for an existing campaign.
+# It replaces the manual reconstruction (getfireareas.ipynb, backups/fireareas10000.txt and
+# splicing lines back into input_tracking.txt by index): every ./cases/case_<run> directory is
+# scanned in parallel with a process pool, the burned area (acres) is computed from its
+# time_of_arrival_*.tif the same way case_summary.py computes it, and the areas are joined to the
+# tracking table by run number.
+# The table is written to a temporary file and moved into place, so an interrupted backfill never
+# leaves a half-written input_tracking.txt. firearea stays the last column.
+#
+# Usage:
+#   python3 backfill_firearea.py [--cases_dir ./cases] [--tracking input_tracking.txt] [--workers 8]
+
+import os
+import sys
+import glob
+import shutil
+import argparse
+import tempfile
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from case_summary import read_raster, summarize_arrays
+
+# burned area in acres of one case (burned_area of its case summary), or None if it has no
+# time_of_arrival raster
+def case_fire_area(case_dir):
+    run = int(os.path.basename(os.path.normpath(case_dir)).split('_')[-1])
+    toa, cellsize = read_raster(case_dir, 'time_of_arrival')
+    if toa is None:
+        return run, None
+    return run, summarize_arrays(run, toa, cellsize=cellsize)['burned_area']
+
+def compute_fire_areas(cases_dir='./cases', workers=None):
+    case_dirs = [d for d in glob.glob(f"{cases_dir}/case_*") if os.path.isdir(d)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = dict(pool.map(case_fire_area, case_dirs, chunksize=64))
+    return {run: area for run, area in results.items() if area is not None}
+
+# write the table next to the target and atomically replace it, keeping the target's permissions
+# (mkstemp creates the temporary file readable by its owner only)
+def write_atomic(df, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix='.txt')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            df.to_csv(f, index=False)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def backfill_fire_areas(cases_dir='./cases', tracking_file='input_tracking.txt', workers=None, overwrite=False):
+    # read everything as text so untouched values are written back exactly as they were
+    df = pd.read_csv(tracking_file, dtype=str, keep_default_na=False)
+    areas = compute_fire_areas(cases_dir, workers)
+
+    if 'firearea' not in df.columns:
+        df['firearea'] = ''
+    else:
+        # keep firearea as the last column
+        df = df[[c for c in df.columns if c != 'firearea'] + ['firearea']]
+
+    runs = df['run'].astype(int)
+    new_values = runs.map(lambda run: f"{areas[run]:.1f}" if run in areas else None)
+    fill = new_values.notna() & (overwrite | (df['firearea'] == ''))
+    df.loc[fill, 'firearea'] = new_values[fill]
+
+    missing = sorted(set(runs) - set(areas))
+    write_atomic(df, tracking_file)
+    print(f"Computed fire areas of {len(areas)} cases, filled {int(fill.sum())} rows of {tracking_file}")
+    if missing:
+        print(f"{len(missing)} runs have no case directory with a time_of_arrival raster, e.g. {missing[:10]}")
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill firearea in the tracking file from ./cases")
+    parser.add_argument("--cases_dir", default='./cases', help="Directory with case_<run> subdirectories")
+    parser.add_argument("--tracking", default='input_tracking.txt', help="Tracking file to update")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--overwrite", action="store_true", help="Recompute rows that already have a firearea")
+    args = parser.parse_args()
+
+    backfill_fire_areas(args.cases_dir, args.tracking, args.workers, args.overwrite)
+    sys.exit(0)
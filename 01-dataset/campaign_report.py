@@ -0,0 +1,107 @@
+# this script renders the post-campaign QA figures of analysis_fcns.py headless (Agg backend), so it
+# can run unattended on the cluster after 0N-run.sh. Each figure is rendered in its own worker
+# process; the figures are saved as PNGs together with the text the functions print, and collected
+# in an index.html. KDEs of the input distributions are estimated on a random subsample (--kde_sample).
+#
+# Usage (from the campaign directory, i.e. next to input_tracking.txt and ./cases):
+#   python3 campaign_report.py [--out report] [--figures input_distribution top_fire_area_cases ...] [--workers 4]
+
+import matplotlib
+matplotlib.use('Agg')
+
+import io
+import os
+import sys
+import html
+import argparse
+import warnings
+import traceback
+import contextlib
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+import analysis_fcns
+
+KDE_SAMPLE = 5000
+
+# report figures: name -> (analysis_fcns function, keyword arguments)
+REPORT_FIGURES = {
+    'input_distribution': ('plot_input_distribution', {'kde_sample': KDE_SAMPLE}),
+    'input_vs_run': ('plot_input_vs_run', {}),
+    'toa_first_cases': ('plot_all_cases_raster', {'pattern': 'time_of_arrival_*.tif', 'num_cases': 5, 'preview_size': 64}),
+    'top_fire_area_cases': ('plot_top_fire_area_cases', {'num_cases': 15, 'preview_size': 64}),
+    'zero_fire_cases': ('plot_zero_fire_cases', {}),
+    'fire_area_vs_inputs': ('plot_fire_area_vs_inputs', {}),
+    'fire_area_correlation': ('fire_area_correlation', {'stats_file': 'param_stats.json'}),
+    'low_fire_area_yign': ('plot_var_dist_for_firearea_underthreshold', {'variable': 'yign', 'kde_sample': KDE_SAMPLE}),
+    'fuel_model_distribution': ('check_model_distribution', {}),
+    'fire_area_per_fuel_model': ('average_fire_area_per_fuel_model', {}),
+}
+
+# render one figure in a worker: returns (name, png file or None, printed text, error or None)
+def render_figure(name, out_dir, kde_sample=KDE_SAMPLE, dpi=100):
+    function_name, kwargs = REPORT_FIGURES[name]
+    kwargs = dict(kwargs)
+    if 'kde_sample' in kwargs:
+        kwargs['kde_sample'] = kde_sample
+
+    log = io.StringIO()
+    png, error = None, None
+    try:
+        with contextlib.redirect_stdout(log), warnings.catch_warnings():
+            # plt.show() is a no-op under Agg and only warns
+            warnings.simplefilter('ignore', UserWarning)
+            getattr(analysis_fcns, function_name)(**kwargs)
+        if plt.get_fignums():
+            png = f'{name}.png'
+            plt.figure(plt.get_fignums()[-1]).savefig(os.path.join(out_dir, png), dpi=dpi)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        plt.close('all')
+    return name, png, log.getvalue(), error
+
+def write_index(out_dir, results):
+    parts = ['<html><head><meta charset="utf-8"><title>Campaign report</title></head><body>',
+             f'<h1>Campaign report: {html.escape(os.getcwd())}</h1>']
+    for name, png, text, error in results:
+        parts.append(f'<h2>{html.escape(name)}</h2>')
+        if png:
+            parts.append(f'<img src="{png}" style="max-width:100%">')
+        if text:
+            parts.append(f'<pre>{html.escape(text)}</pre>')
+        if error:
+            parts.append(f'<pre style="color:red">{html.escape(error)}</pre>')
+    parts.append('</body></html>')
+    with open(os.path.join(out_dir, 'index.html'), 'w') as f:
+        f.write('\n'.join(parts))
+
+def build_report(out_dir='report', figures=None, workers=None, kde_sample=KDE_SAMPLE, dpi=100):
+    figures = figures or list(REPORT_FIGURES)
+    unknown = [name for name in figures if name not in REPORT_FIGURES]
+    if unknown:
+        raise ValueError(f"Unknown report figures {unknown}, choose from {list(REPORT_FIGURES)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers or min(len(figures), os.cpu_count())) as pool:
+        futures = [pool.submit(render_figure, name, out_dir, kde_sample, dpi) for name in figures]
+        results = [future.result() for future in futures]
+
+    write_index(out_dir, results)
+    failed = [name for name, _, _, error in results if error]
+    print(f"Rendered {len(results) - len(failed)} of {len(results)} figures to {out_dir}/index.html")
+    if failed:
+        print(f"Failed figures: {failed}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the campaign QA figures headless into a PNG/HTML bundle")
+    parser.add_argument("--out", default='report', help="Output directory")
+    parser.add_argument("--figures", nargs="+", default=None, help=f"Figures to render (default: all of {list(REPORT_FIGURES)})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per figure)")
+    parser.add_argument("--kde_sample", type=int, default=KDE_SAMPLE, help="Max values per KDE estimate")
+    parser.add_argument("--dpi", type=int, default=100, help="PNG resolution")
+    args = parser.parse_args()
+
+    results = build_report(args.out, args.figures, args.workers, args.kde_sample, args.dpi)
+    sys.exit(1 if any(error for _, _, _, error in results) else 0)
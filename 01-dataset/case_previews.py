@@ -0,0 +1,125 @@
+# this script keeps a preview cache of the case rasters, so plotting grids of TOA/flin/vs over
+# hundreds of cases does not decode the full GeoTIFFs each time. At ingest every case gets small
+# overviews (32x32 and 64x64 block means of the burned cells, NaN where nothing burned) of its
+# time_of_arrival, flin and vs rasters, appended as float32 arrays to one compressed
+# case_previews.npz per campaign (key <variable>_<size>_<run>, e.g. time_of_arrival_64_12).
+#
+# Usage (called from 0N-run.sh through case_summary.py --previews):
+#   python3 case_previews.py <case_dir> [<case_dir> ...]    -> adds previews to case_previews.npz
+#   python3 case_previews.py --all ./cases                  -> rewrites case_previews.npz
+
+import os
+import sys
+import glob
+import zipfile
+import argparse
+import numpy as np
+import rasterio
+
+PREVIEW_FILE = 'case_previews.npz'
+PREVIEW_SIZES = (32, 64)
+PREVIEW_VARIABLES = ('time_of_arrival', 'flin', 'vs')
+
+def preview_key(variable, size, run):
+    return f"{variable}_{size}_{int(run)}"
+
+# block mean of the valid cells down to at most size x size, nodata = -9999 or NaN
+def block_reduce(data, size):
+    data = np.where(data == -9999, np.nan, data.astype(np.float32))
+    height, width = data.shape
+    factor = max(1, int(np.ceil(max(height, width) / size)))
+    rows, cols = int(np.ceil(height / factor)), int(np.ceil(width / factor))
+    padded = np.full((rows * factor, cols * factor), np.nan, dtype=np.float32)
+    padded[:height, :width] = data
+    blocks = padded.reshape(rows, factor, cols, factor)
+
+    valid = ~np.isnan(blocks)
+    counts = valid.sum(axis=(1, 3))
+    sums = np.where(valid, blocks, 0).sum(axis=(1, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan).astype(np.float32)
+
+# previews of one case from its final rasters: {key: array}
+def previews_from_arrays(run, arrays, sizes=PREVIEW_SIZES):
+    return {preview_key(variable, size, run): block_reduce(data, size)
+            for variable, data in arrays.items() if data is not None for size in sizes}
+
+def read_case_rasters(case_dir):
+    arrays = {}
+    for variable in PREVIEW_VARIABLES:
+        files = sorted(glob.glob(f"{case_dir}/{variable}_*.tif"))
+        if files:
+            with rasterio.open(files[-1]) as src:
+                arrays[variable] = src.read(1)
+    return arrays
+
+def case_previews(case_dir, sizes=PREVIEW_SIZES):
+    run = int(os.path.basename(os.path.normpath(case_dir)).split('_')[-1])
+    return previews_from_arrays(run, read_case_rasters(case_dir), sizes)
+
+def write_preview(zf, key, array):
+    with zf.open(f"{key}.npy", mode='w', force_zip64=True) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+# add arrays to the campaign npz. New keys are appended without rewriting the file; previews that are
+# already stored unchanged are skipped, and a changed preview (rerun case) rebuilds the archive
+# so every key stays a single member
+def append_previews(previews, preview_file=PREVIEW_FILE):
+    stored = {}
+    if os.path.exists(preview_file):
+        with np.load(preview_file) as npz:
+            stored = {key: npz[key] for key in npz.files if key in previews}
+    changed = {key for key, array in stored.items() if not np.array_equal(array, previews[key], equal_nan=True)}
+
+    if changed:
+        tmp_file = f"{preview_file}.tmp"
+        with zipfile.ZipFile(preview_file) as src, \
+             zipfile.ZipFile(tmp_file, mode='w', compression=zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename[:-len('.npy')] not in changed:
+                    dst.writestr(info, src.read(info))
+            for key in changed:
+                write_preview(dst, key, previews[key])
+        os.replace(tmp_file, preview_file)
+
+    new = {key: array for key, array in previews.items() if key not in stored}
+    if new:
+        with zipfile.ZipFile(preview_file, mode='a', compression=zipfile.ZIP_DEFLATED) as zf:
+            for key, array in new.items():
+                write_preview(zf, key, array)
+
+def build_previews(cases_dir='./cases', preview_file=PREVIEW_FILE, sizes=PREVIEW_SIZES):
+    case_dirs = sorted(glob.glob(f"{cases_dir}/case_*"), key=lambda d: int(d.split('_')[-1]))
+    if os.path.exists(preview_file):
+        os.remove(preview_file)
+    for case_dir in case_dirs:
+        append_previews(case_previews(case_dir, sizes), preview_file)
+    print(f"Wrote previews of {len(case_dirs)} cases to {preview_file}")
+
+# previews of several runs from one open of the cache; runs without a preview are left out
+def load_previews(runs, variable='time_of_arrival', size=64, preview_file=PREVIEW_FILE):
+    if not os.path.exists(preview_file):
+        return {}
+    with np.load(preview_file) as npz:
+        keys = set(npz.files)
+        return {int(run): npz[preview_key(variable, size, run)] for run in runs
+                if preview_key(variable, size, run) in keys}
+
+def load_preview(run, variable='time_of_arrival', size=64, preview_file=PREVIEW_FILE):
+    return load_previews([run], variable, size, preview_file).get(int(run))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the downsampled preview cache of case rasters")
+    parser.add_argument("case_dirs", nargs="*", help="Case directories to add to the cache")
+    parser.add_argument("--all", dest="cases_dir", help="Rebuild the cache from every case in this directory")
+    parser.add_argument("--previews", default=PREVIEW_FILE, help="Preview cache file")
+    args = parser.parse_args()
+
+    if args.cases_dir:
+        build_previews(args.cases_dir, args.previews)
+    else:
+        previews = {}
+        for case_dir in args.case_dirs:
+            previews.update(case_previews(case_dir))
+        append_previews(previews, args.previews)
+    sys.exit(0)
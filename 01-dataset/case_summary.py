@@ -0,0 +1,121 @@
+# this script records a per-case summary when a run finishes, so analyses can query
+# case_summaries.csv instead of reopening the flin, time_of_arrival and vs GeoTIFFs:
+#   burned cell count and area (acres, like firearea), TOA max, flin and vs min/max/mean over
+#   burned cells, the burned bounding box (rows/cols) and the final perimeter length (m).
+#
+# Usage (called from 0N-run.sh):
+#   python3 case_summary.py <case_dir> [<case_dir> ...]     -> appends rows to case_summaries.csv
+#       [--previews case_previews.npz]                      -> and the case previews to the cache
+#       [--param_stats param_stats.json]                    -> and the runs to the parameter statistics
+#   python3 case_summary.py --all ./cases                   -> rewrites case_summaries.csv
+
+import os
+import sys
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+import rasterio
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from raster_window import bbox_window
+
+SUMMARY_FILE = 'case_summaries.csv'
+SUMMARY_COLUMNS = ['run', 'burned_cells', 'burned_area', 'toa_max',
+                   'flin_min', 'flin_max', 'flin_mean', 'vs_min', 'vs_max', 'vs_mean',
+                   'row_min', 'row_max', 'col_min', 'col_max', 'perimeter']
+
+# length of the boundary between burned and unburned cells (including the domain edge), in meters
+def perimeter_length(burned, cellsize=30.0):
+    padded = np.pad(burned, 1, constant_values=False)
+    edges = np.count_nonzero(padded[1:, :] != padded[:-1, :]) + np.count_nonzero(padded[:, 1:] != padded[:, :-1])
+    return edges * cellsize
+
+# summary of one case from its final toa (and optional flin/vs) arrays, nodata = -9999 or NaN
+def summarize_arrays(run, toa, flin=None, vs=None, cellsize=30.0):
+    burned = (toa != -9999) & ~np.isnan(toa)
+    summary = {'run': int(run), 'burned_cells': int(burned.sum()),
+               'burned_area': round(float(burned.sum()) * cellsize * cellsize / 4047, 1)}
+    summary['toa_max'] = float(toa[burned].max()) if burned.any() else np.nan
+
+    for name, data in (('flin', flin), ('vs', vs)):
+        values = data[burned] if data is not None and burned.any() else np.array([])
+        summary[f'{name}_min'] = float(values.min()) if values.size else np.nan
+        summary[f'{name}_max'] = float(values.max()) if values.size else np.nan
+        summary[f'{name}_mean'] = float(values.mean()) if values.size else np.nan
+
+    rows, cols = np.nonzero(burned)
+    summary.update(row_min=int(rows.min()) if rows.size else -1, row_max=int(rows.max()) if rows.size else -1,
+                   col_min=int(cols.min()) if cols.size else -1, col_max=int(cols.max()) if cols.size else -1)
+    summary['perimeter'] = perimeter_length(burned, cellsize)
+    return summary
+
+def read_raster(case_dir, prefix):
+    files = sorted(glob.glob(f"{case_dir}/{prefix}_*.tif"))
+    if not files:
+        return None, None
+    with rasterio.open(files[-1]) as src:
+        return src.read(1).astype(np.float64), abs(src.transform.a)
+
+# summary of one case directory (./cases/case_<run>)
+def summarize_case(case_dir):
+    run = int(os.path.basename(os.path.normpath(case_dir)).split('_')[-1])
+    toa, cellsize = read_raster(case_dir, 'time_of_arrival')
+    if toa is None:
+        raise FileNotFoundError(f"No time_of_arrival file found in {case_dir}")
+    flin, _ = read_raster(case_dir, 'flin')
+    vs, _ = read_raster(case_dir, 'vs')
+    return summarize_arrays(run, toa, flin, vs, cellsize)
+
+# append summary rows, writing the header for a new file
+def append_summaries(summaries, summary_file=SUMMARY_FILE):
+    df = pd.DataFrame(summaries, columns=SUMMARY_COLUMNS)
+    df.to_csv(summary_file, mode='a', index=False, header=not os.path.exists(summary_file), float_format='%.6g')
+
+# rasterio Window of a case's burned bounding box grown by `padding` cells, for windowed reads
+# (see read_window in ../functions/raster_window.py). Returns None if the run has no summary and an
+# empty window if nothing burned. With padding the window may extend past the domain; loaders clip it
+# or fill the outside with nodata (pad_nodata).
+def burned_window(run, summary_file=SUMMARY_FILE, padding=0):
+    if not os.path.exists(summary_file):
+        return None
+    from results_table import load_results
+    summaries = load_results(summary_file)
+    rows = summaries[summaries['run'] == int(run)]
+    if not len(rows):
+        return None
+    return bbox_window(rows.iloc[-1], padding)
+
+def summarize_all(cases_dir='./cases', summary_file=SUMMARY_FILE):
+    case_dirs = sorted(glob.glob(f"{cases_dir}/case_*"), key=lambda d: int(d.split('_')[-1]))
+    summaries = [summarize_case(d) for d in case_dirs]
+    if os.path.exists(summary_file):
+        os.remove(summary_file)
+    append_summaries(summaries, summary_file)
+    print(f"Wrote summaries of {len(summaries)} cases to {summary_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record per-case summaries of ELMFIRE outputs")
+    parser.add_argument("case_dirs", nargs="*", help="Case directories to summarize and append")
+    parser.add_argument("--all", dest="cases_dir", help="Summarize every case in this directory (rewrites the file)")
+    parser.add_argument("--summary", default=SUMMARY_FILE, help="Summary CSV")
+    parser.add_argument("--previews", help="Also append the case previews to this cache (see case_previews.py)")
+    parser.add_argument("--param_stats", help="Also add the runs to these running statistics (see param_stats.py)")
+    parser.add_argument("--tracking", default='input_tracking.txt', help="Tracking file with the run parameters")
+    args = parser.parse_args()
+
+    if args.cases_dir:
+        summarize_all(args.cases_dir, args.summary)
+    else:
+        summaries = [summarize_case(d) for d in args.case_dirs]
+        append_summaries(summaries, args.summary)
+        if args.param_stats:
+            from param_stats import update_param_stats
+            update_param_stats({s['run']: s['burned_area'] for s in summaries}, args.tracking, args.param_stats)
+        if args.previews:
+            from case_previews import case_previews, append_previews
+            previews = {}
+            for case_dir in args.case_dirs:
+                previews.update(case_previews(case_dir))
+            append_previews(previews, args.previews)
+    sys.exit(0)
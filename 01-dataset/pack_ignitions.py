@@ -0,0 +1,204 @@
+# this script packs several independent fires into one ELMFIRE run.
+# Inputs are spatially uniform, so fires that never touch each other are independent and
+# each one is equivalent to a single-ignition run on its own 128x128 window. The packed
+# domain is a grid of tiles; each tile holds one case window with an ignition drawn like
+# set_params.draw_parameters draws it (anywhere in the window, see IGNITION_INNER_PERCENT),
+# and neighbouring windows are separated by a guard band sized from the predicted maximum
+# spread distance.
+#
+# Usage (called from 0N-run.sh when more than one fire per run is requested):
+#   python3 pack_ignitions.py layout <first_run> <num_fires> <tstop> <domain_size> <max_spread_m>
+#   bash 01-run.sh
+#   python3 pack_ignitions.py crop            -> writes ./cases/case_<run> for accepted fires
+#   python3 pack_ignitions.py rerun <run> <tstop> <domain_size>   (single ignition rerun)
+#   python3 pack_ignitions.py max_spread <first_run> <last_run> [<max_spread_m>]
+#                                             -> prints the largest spread observed so far
+#
+# A fire whose burned area enters the guard band around its window (or is reached by a
+# neighbour's fire) is rejected and listed in packing_reruns.txt; 0N-run.sh reruns those
+# parameter sets as normal single-ignition runs so the dataset is not biased toward small fires.
+
+import os
+import sys
+import glob
+import json
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from set_params import (draw_parameters, draw_ignition, update_run_script, set_ignitions, write_tracking_row,
+                        IGNITION_INNER_PERCENT)
+
+LAYOUT_FILE = 'packing_layout.json'
+RERUN_FILE = 'packing_reruns.txt'
+CELLSIZE = 30.0
+OUTPUT_PATTERNS = ['time_of_arrival_*.tif', 'flin_*.tif', 'vs_*.tif']
+
+# number of guard cells needed between two case windows whose ignitions are in the central
+# inner_percent of the window
+def guard_band_cells(max_spread_m, domain_size=3840.0, cellsize=CELLSIZE, inner_percent=IGNITION_INNER_PERCENT,
+                     max_guard_cells=None):
+    # an ignition in the central inner_percent of its window is at least this far from the window edge
+    edge_distance = 0.5 * domain_size * (1.0 - inner_percent)
+    guard = int(np.ceil(max(0.0, max_spread_m - edge_distance) / cellsize))
+    guard += guard % 2  # split evenly on both sides of a window
+    if max_guard_cells is not None:
+        guard = min(guard, max_guard_cells - max_guard_cells % 2)
+    return guard
+
+# predicted maximum spread distance from completed cases: the largest distance from the
+# ignition point to a burned cell over the cases in cases_dir (optionally only the given runs)
+def max_spread_from_cases(cases_dir='./cases', tracking_file='input_tracking.txt', quantile=1.0, runs=None):
+    import pandas as pd
+    df = pd.read_csv(tracking_file)
+    if runs is not None:
+        df = df[df['run'].isin(runs)]
+    distances = []
+    for _, row in df.iterrows():
+        toa_files = glob.glob(f"{cases_dir}/case_{int(row['run'])}/time_of_arrival_*.tif")
+        if not toa_files:
+            continue
+        with rasterio.open(toa_files[0]) as src:
+            toa = src.read(1)
+            rows, cols = np.nonzero((toa != src.nodata) & ~np.isnan(toa))
+            if rows.size == 0:
+                continue
+            xs, ys = rasterio.transform.xy(src.transform, rows, cols)
+        distances.append(np.max(np.hypot(np.asarray(xs) - row['xign'], np.asarray(ys) - row['yign'])))
+    if not distances:
+        return 0.0
+    return float(np.quantile(distances, quantile))
+
+# lay out num_fires case windows on a square grid of tiles. Ignitions are drawn from the central
+# inner_percent of each window; the default matches set_params.draw_parameters, and a smaller value
+# narrows the guard bands (guard_band_cells) at the cost of never igniting near a window edge.
+def pack_layout(num_fires, guard_cells, domain_size=3840.0, cellsize=CELLSIZE,
+                inner_percent=IGNITION_INNER_PERCENT):
+    window_cells = int(round(domain_size / cellsize))
+    pitch = window_cells + guard_cells
+    tiles_per_side = int(np.ceil(np.sqrt(num_fires)))
+    packed_size = tiles_per_side * pitch * cellsize
+
+    tiles = []
+    for k in range(num_fires):
+        i, j = divmod(k, tiles_per_side)
+        row0 = i * pitch + guard_cells // 2  # rows counted from the top (north) edge
+        col0 = j * pitch + guard_cells // 2
+        # window center in packed domain coordinates (domain centered on 0, 0)
+        x_center = -packed_size / 2 + (col0 + window_cells / 2) * cellsize
+        y_center = packed_size / 2 - (row0 + window_cells / 2) * cellsize
+        xign, yign = (round(float(v), 1) for v in draw_ignition(domain_size, inner_percent))
+        tiles.append({
+            'row0': row0, 'col0': col0,
+            'xign': xign, 'yign': yign,
+            'x_global': x_center + xign, 'y_global': y_center + yign
+        })
+
+    return {
+        'window_cells': window_cells, 'guard_cells': guard_cells, 'cellsize': cellsize,
+        'domain_size': domain_size, 'packed_size': packed_size, 'tiles': tiles
+    }
+
+# find tiles whose fire left the window into the surrounding guard band. The guard band
+# between two windows is shared, so a fire crossing it marks both neighbours.
+def rejected_tiles(burned, layout):
+    n = layout['window_cells']
+    margin = max(layout['guard_cells'], 1)  # windows that touch still need one cell to detect crossings
+    rejected = []
+    for k, tile in enumerate(layout['tiles']):
+        r0, c0 = tile['row0'], tile['col0']
+        outer = burned[max(r0 - margin, 0):r0 + n + margin, max(c0 - margin, 0):c0 + n + margin]
+        inner = burned[r0:r0 + n, c0:c0 + n]
+        if outer.sum() > inner.sum():
+            rejected.append(k)
+    return rejected
+
+# write one case window of a packed raster as a standard case raster centered on 0, 0
+def write_window(src, data, row0, col0, window_cells, cellsize, out_path):
+    window = data[row0:row0 + window_cells, col0:col0 + window_cells]
+    half = window_cells * cellsize / 2
+    profile = src.profile.copy()
+    profile.update(height=window_cells, width=window_cells,
+                   transform=from_origin(-half, half, cellsize, cellsize))
+    with rasterio.open(out_path, 'w', **profile) as dst:
+        dst.write(window, 1)
+
+def layout_run(first_run, num_fires, tstop, domain_size, max_spread_m):
+    params = draw_parameters(domain_size)
+    guard = guard_band_cells(max_spread_m, domain_size)
+    layout = pack_layout(num_fires, guard, domain_size)
+    layout.update(first_run=first_run, tstop=tstop, params=params)
+
+    update_run_script(params, tstop, layout['packed_size'])
+    set_ignitions([t['x_global'] for t in layout['tiles']], [t['y_global'] for t in layout['tiles']])
+
+    with open(LAYOUT_FILE, 'w') as f:
+        json.dump(layout, f, indent=1)
+    print(f"Packed {num_fires} fires on a {layout['packed_size']:.0f} m domain (guard band: {guard} cells)")
+
+def crop_run(outputs_dir='./outputs', cases_dir='./cases', tracking_file='input_tracking.txt'):
+    with open(LAYOUT_FILE, 'r') as f:
+        layout = json.load(f)
+
+    toa_files = glob.glob(f"{outputs_dir}/time_of_arrival_*.tif")
+    if not toa_files:
+        raise FileNotFoundError(f"No time_of_arrival files found in {outputs_dir}")
+    with rasterio.open(toa_files[0]) as src:
+        toa = src.read(1)
+        burned = (toa != src.nodata) & ~np.isnan(toa)
+    rejected = rejected_tiles(burned, layout)
+
+    n = layout['window_cells']
+    for pattern in OUTPUT_PATTERNS:
+        for filepath in glob.glob(f"{outputs_dir}/{pattern}"):
+            with rasterio.open(filepath) as src:
+                data = src.read(1)
+                for k, tile in enumerate(layout['tiles']):
+                    if k in rejected:
+                        continue
+                    case_dir = f"{cases_dir}/case_{layout['first_run'] + k}"
+                    os.makedirs(case_dir, exist_ok=True)
+                    write_window(src, data, tile['row0'], tile['col0'], n, layout['cellsize'],
+                                 f"{case_dir}/{os.path.basename(filepath)}")
+
+    # rejected fires keep their parameters for the rerun, so every row is written here in run order
+    with open(RERUN_FILE, 'w') as f:
+        for k, tile in enumerate(layout['tiles']):
+            run = layout['first_run'] + k
+            if k in rejected:
+                f.write(f"{run}\n")
+            write_tracking_row(run, {**layout['params'], 'xign': tile['xign'], 'yign': tile['yign']},
+                               tracking_file)
+
+    print(f"Cropped {len(layout['tiles']) - len(rejected)} cases, {len(rejected)} rejected for rerun")
+
+# rerun a rejected fire from the packed layout as a normal single-ignition run
+# (its tracking row was already written by crop_run)
+def rerun_single(run, tstop, domain_size):
+    with open(LAYOUT_FILE, 'r') as f:
+        layout = json.load(f)
+    tile = layout['tiles'][run - layout['first_run']]
+    params = {**layout['params'], 'xign': tile['xign'], 'yign': tile['yign']}
+
+    update_run_script(params, tstop, domain_size)
+    set_ignitions([params['xign']], [params['yign']])
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('layout', 'crop', 'rerun', 'max_spread'):
+        print("Usage: python3 pack_ignitions.py layout <first_run> <num_fires> <tstop> <domain_size> <max_spread_m>")
+        print("       python3 pack_ignitions.py crop")
+        print("       python3 pack_ignitions.py rerun <run> <tstop> <domain_size>")
+        print("       python3 pack_ignitions.py max_spread <first_run> <last_run> [<max_spread_m>]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'layout':
+        layout_run(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5]), float(sys.argv[6]))
+    elif sys.argv[1] == 'crop':
+        crop_run()
+    elif sys.argv[1] == 'max_spread':
+        # running maximum: the spread of the new cases or the previous maximum, whichever is larger
+        runs = range(int(sys.argv[2]), int(sys.argv[3]) + 1)
+        previous = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+        print(f"{max(previous, max_spread_from_cases(runs=runs)):.1f}")
+    else:
+        rerun_single(int(sys.argv[2]), float(sys.argv[3]), float(sys.argv[4]))
@@ -0,0 +1,151 @@
+# this script keeps running covariance/correlation statistics of the input parameters and the fire
+# area, so fire_area_covariance / fire_area_correlation are available mid-campaign without rereading
+# the whole results table. The sufficient statistics are the count, the mean vector and the
+# co-moment matrix sum((x - mean)(x - mean)^T); a run is added with Welford's update and shards are
+# combined with Chan's parallel formula, so merging gives the same result as one pass over all runs.
+# Covariance and correlation then cost O(p^2) regardless of the number of runs. The statistics record
+# the runs they contain, so a run that is summarized again (or a shard merged twice) is not counted twice.
+#
+# Usage:
+#   0N-run.sh updates param_stats.json per completed run (case_summary.py / fused_worker.py --param_stats)
+#   python3 param_stats.py build it_scratch_fixed.txt [--stats param_stats.json]   -> from an existing table
+#   python3 param_stats.py merge shard1.json shard2.json --stats param_stats.json   -> merge shards
+#   python3 param_stats.py show [--stats param_stats.json]
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+from set_params import TRACKING_COLUMNS
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from running_moments import chan_merge, write_json_atomic
+
+STATS_FILE = 'param_stats.json'
+STATS_COLUMNS = TRACKING_COLUMNS + ['firearea']
+
+class RunningCovariance:
+    """Mergeable count, mean and co-moment matrix of the columns."""
+
+    def __init__(self, columns=STATS_COLUMNS):
+        self.columns = list(columns)
+        self.count = 0
+        self.mean = np.zeros(len(self.columns))
+        self.comoment = np.zeros((len(self.columns), len(self.columns)))
+        self.runs = []
+
+    # add rows (runs x columns) of the given runs; rows with a missing value and runs already in the
+    # statistics are skipped
+    def update(self, rows, runs=()):
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        keep = ~np.isnan(rows).any(axis=1)
+        if len(runs):
+            keep &= ~np.isin(np.asarray(runs), self.runs)
+        rows = rows[keep]
+        if not len(rows):
+            return
+        batch = RunningCovariance(self.columns)
+        batch.runs = [int(run) for run in np.asarray(runs)[keep]] if len(runs) else []
+        batch.count = len(rows)
+        batch.mean = rows.mean(axis=0)
+        centered = rows - batch.mean
+        batch.comoment = centered.T @ centered
+        self.merge(batch)
+
+    def merge(self, other):
+        if self.columns != other.columns:
+            raise ValueError(f"Cannot merge statistics of columns {other.columns} into {self.columns}")
+        overlap = set(self.runs) & set(other.runs)
+        if overlap:
+            raise ValueError(f"Runs {sorted(overlap)} are already in the statistics")
+        if other.count == 0:
+            return
+        self.count, self.mean, self.comoment = chan_merge(self.count, self.mean, self.comoment,
+                                                          other.count, other.mean, other.comoment)
+        self.runs = sorted(self.runs + other.runs)
+
+    # sample covariance (ddof=1, like DataFrame.cov)
+    def covariance(self):
+        cov = self.comoment / (self.count - 1) if self.count > 1 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def to_dict(self):
+        return {'columns': self.columns, 'count': self.count, 'runs': self.runs,
+                'mean': self.mean.tolist(), 'comoment': self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        stats = cls(d['columns'])
+        stats.count = d['count']
+        stats.mean = np.array(d['mean'], dtype=np.float64)
+        stats.comoment = np.array(d['comoment'], dtype=np.float64)
+        stats.runs = d.get('runs', [])
+        return stats
+
+def load_param_stats(stats_file=STATS_FILE):
+    if not os.path.exists(stats_file):
+        return RunningCovariance()
+    with open(stats_file, 'r') as f:
+        return RunningCovariance.from_dict(json.load(f))
+
+def save_param_stats(stats, stats_file=STATS_FILE):
+    write_json_atomic(stats.to_dict(), stats_file)
+
+# add completed runs to the statistics file; fire_areas maps run -> fire area (acres), the input
+# parameters are looked up by run in the tracking file. Runs already in the file are skipped.
+def update_param_stats(fire_areas, tracking_file='input_tracking.txt', stats_file=STATS_FILE):
+    tracking = pd.read_csv(tracking_file).set_index('run')
+    stats = load_param_stats(stats_file)
+    runs = [run for run in fire_areas if run in tracking.index]
+    rows = tracking.loc[runs, TRACKING_COLUMNS].assign(firearea=[fire_areas[run] for run in runs])
+    stats.update(rows[stats.columns].to_numpy(dtype=np.float64), runs)
+    save_param_stats(stats, stats_file)
+    return stats
+
+# statistics of a complete results table with a firearea column (e.g. it_scratch_fixed.txt)
+def stats_from_table(table_file):
+    df = pd.read_csv(table_file)
+    stats = RunningCovariance()
+    stats.update(df[stats.columns].to_numpy(dtype=np.float64), df['run'].to_numpy())
+    return stats
+
+# merge shards; a shard whose runs are all in the shards before it (merged twice) is skipped, one that
+# partly overlaps them raises ValueError
+def merge_param_stats(paths, stats_file=STATS_FILE):
+    merged = None
+    for path in paths:
+        stats = load_param_stats(path)
+        if merged is None:
+            merged = stats
+        elif not stats.runs or not set(stats.runs) <= set(merged.runs):
+            merged.merge(stats)
+    save_param_stats(merged, stats_file)
+    return merged
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Running covariance of the input parameters and fire area")
+    parser.add_argument("command", choices=['build', 'merge', 'show'])
+    parser.add_argument("files", nargs="*", help="Results table (build) or statistics files (merge)")
+    parser.add_argument("--stats", default=STATS_FILE, help="Statistics file to write or show")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        stats = stats_from_table(args.files[0])
+        save_param_stats(stats, args.stats)
+    elif args.command == 'merge':
+        stats = merge_param_stats(args.files, args.stats)
+    else:
+        stats = load_param_stats(args.stats)
+
+    print(f"{stats.count} runs")
+    print(stats.correlation()['firearea'].drop('firearea').to_string())
+    sys.exit(0)
@@ -0,0 +1,57 @@
+# this script provides one shared loader for the results tables (input_tracking.txt,
+# it_scratch_fixed.txt, ...) used by analysis_fcns.py and the notebooks.
+# The CSV is parsed once into a typed table and cached next to it as <file>.parquet, so later
+# sessions read the columnar file instead of parsing the CSV. Within a process the table is
+# memoized, and both caches are invalidated when the CSV's modification time or size changes.
+
+import os
+import pandas as pd
+
+from set_params import TRACKING_COLUMNS, FLOAT_COLUMNS
+
+# in-process cache: absolute path -> (mtime_ns, size, DataFrame)
+_tables = {}
+
+# typed columns: run and the integer parameters as int32, the float parameters and firearea as
+# float64; other columns (transform, split, stratum, summary values, ...) keep the types read_csv gave them
+def typed_table(df):
+    for column in df.columns:
+        if column == 'run' or (column in TRACKING_COLUMNS and column not in FLOAT_COLUMNS):
+            if df[column].notna().all():
+                df[column] = pd.to_numeric(df[column]).astype('int64' if column == 'run' else 'int32')
+                continue
+        if column in TRACKING_COLUMNS or column == 'firearea':
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    return df
+
+def parquet_path(csv_path):
+    return csv_path + '.parquet'
+
+# read the columnar cache if it is strictly newer than the CSV, otherwise parse the CSV and rewrite it
+def read_table(csv_path):
+    cache = parquet_path(csv_path)
+    try:
+        if os.path.exists(cache) and os.stat(cache).st_mtime_ns > os.stat(csv_path).st_mtime_ns:
+            return pd.read_parquet(cache)
+    except ImportError:
+        pass  # no parquet engine installed, fall back to the CSV
+
+    df = typed_table(pd.read_csv(csv_path))
+    try:
+        df.to_parquet(cache, index=False)
+    except (ImportError, OSError):
+        pass
+    return df
+
+# load a results table; returns a copy so callers can modify it freely
+def load_results(csv_path='input_tracking.txt'):
+    path = os.path.abspath(csv_path)
+    stat = os.stat(path)
+    cached = _tables.get(path)
+    if cached is None or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+        cached = (stat.st_mtime_ns, stat.st_size, read_table(path))
+        _tables[path] = cached
+    return cached[2].copy()
+
+def clear_cache():
+    _tables.clear()
@@ -5,23 +5,30 @@
 # the parameters are set in 01-run.sh and elmfire.data.in
 # the parameters are set according to the ranges in input_ranges.txt
 
+import os
 import sys
 import numpy as np
 import re
 
-def set_parameters():
-    # Get run number from command line argument
-    if len(sys.argv) < 2:
-        print("Usage: python set_params.py <run_number>")
-        sys.exit(1)
-    run_number = sys.argv[1]
-    tstop = float(sys.argv[2]) if len(sys.argv) > 2 else 22100.0  # Default simulation stop time
-    domain_size = float(sys.argv[3]) if len(sys.argv) > 3 else 3840.0  # Default domain size
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from elmfire_namelist import ElmfireNamelist
+# columns of input_tracking.txt after the run number, with their formats
+from tracking_columns import TRACKING_COLUMNS, FLOAT_COLUMNS
+
+# fraction of the window (centered on 0, 0) that ignitions are drawn from. Single runs, packed fires
+# (pack_ignitions.py) and translated fires (translate_ignitions.py) all draw from the whole window
+# so every run mode gives the same ignition distribution.
+IGNITION_INNER_PERCENT = 1.0
+
+# ignition point drawn uniformly over the central inner_percent of a domain_size window
+def draw_ignition(domain_size=3840.0, inner_percent=IGNITION_INNER_PERCENT):
+    inner_half = 0.5 * domain_size * inner_percent
+    return np.random.uniform(-inner_half, inner_half), np.random.uniform(-inner_half, inner_half)
 
+def draw_parameters(domain_size=3840.0):
     # Generate random parameters
     fuel_model = np.random.randint(1, 41)  # [1, 40]
-    x_ign = np.random.uniform(-domain_size/2, domain_size/2)  # Middle 50% of domain [-1920, 1920]
-    y_ign = np.random.uniform(-domain_size/2, domain_size/2)  # Middle 50% of domain [-1920, 1920]
+    x_ign, y_ign = draw_ignition(domain_size)  # whole domain [-1920, 1920]
     slope = np.random.randint(0, 46)  # [0, 45]
     aspect = np.random.randint(0, 361)  # [0, 360]
 
@@ -47,8 +54,19 @@ def set_parameters():
     live_herbaceous = np.random.uniform(30.0, 100.0) # [30, 100]
     live_woody = np.random.uniform(30.0, 100.0) # [30, 100]
 
+    # rounded the same way they are written to 01-run.sh and input_tracking.txt
+    params = {
+        'xign': x_ign, 'yign': y_ign, 'fuel': fuel_model, 'slp': slope, 'asp': aspect,
+        'ws': wind_speed, 'wd': wind_direction, 'm1': m1_moisture, 'm10': m10_moisture,
+        'm100': m100_moisture, 'cc': canopy_cover, 'ch': canopy_height,
+        'cbh': canopy_base_height, 'cbd': canopy_bulk_density,
+        'lhc': live_herbaceous, 'lwc': live_woody
+    }
+    return {k: round(float(v), 1) if k in FLOAT_COLUMNS else int(v) for k, v in params.items()}
+
+def update_run_script(params, tstop, domain_size, script_path='01-run.sh'):
     # Modify 01-run.sh
-    with open('01-run.sh', 'r') as f:
+    with open(script_path, 'r') as f:
         bash_content = f.read()
 
     # write in domain size
@@ -56,42 +74,56 @@ def set_parameters():
     bash_content = re.sub(r'SIMULATION_TSTOP=[0-9.-]+', f'SIMULATION_TSTOP={tstop}', bash_content)
 
     # Float rasters
-    bash_content = re.sub(r'FLOAT_VAL\[1\]=[0-9.-]+', f'FLOAT_VAL[1]={wind_speed:.1f}', bash_content)
-    bash_content = re.sub(r'FLOAT_VAL\[2\]=[0-9.-]+', f'FLOAT_VAL[2]={wind_direction:.1f}', bash_content)
-    bash_content = re.sub(r'FLOAT_VAL\[3\]=[0-9.-]+', f'FLOAT_VAL[3]={m1_moisture:.1f}', bash_content)
-    bash_content = re.sub(r'FLOAT_VAL\[4\]=[0-9.-]+', f'FLOAT_VAL[4]={m10_moisture:.1f}', bash_content)
-    bash_content = re.sub(r'FLOAT_VAL\[5\]=[0-9.-]+', f'FLOAT_VAL[5]={m100_moisture:.1f}', bash_content)
+    bash_content = re.sub(r'FLOAT_VAL\[1\]=[0-9.-]+', f'FLOAT_VAL[1]={params["ws"]:.1f}', bash_content)
+    bash_content = re.sub(r'FLOAT_VAL\[2\]=[0-9.-]+', f'FLOAT_VAL[2]={params["wd"]:.1f}', bash_content)
+    bash_content = re.sub(r'FLOAT_VAL\[3\]=[0-9.-]+', f'FLOAT_VAL[3]={params["m1"]:.1f}', bash_content)
+    bash_content = re.sub(r'FLOAT_VAL\[4\]=[0-9.-]+', f'FLOAT_VAL[4]={params["m10"]:.1f}', bash_content)
+    bash_content = re.sub(r'FLOAT_VAL\[5\]=[0-9.-]+', f'FLOAT_VAL[5]={params["m100"]:.1f}', bash_content)
 
     # Integer rasters
-    bash_content = re.sub(r'INT_VAL\[1\]=\d+', f'INT_VAL[1]={slope}', bash_content)
-    bash_content = re.sub(r'INT_VAL\[2\]=\d+', f'INT_VAL[2]={aspect}', bash_content)
-    bash_content = re.sub(r'INT_VAL\[4\]=\d+', f'INT_VAL[4]={fuel_model}', bash_content)
-    bash_content = re.sub(r'INT_VAL\[5\]=\d+', f'INT_VAL[5]={canopy_cover}', bash_content)
-    bash_content = re.sub(r'INT_VAL\[6\]=\d+', f'INT_VAL[6]={canopy_height}', bash_content)
-    bash_content = re.sub(r'INT_VAL\[7\]=\d+', f'INT_VAL[7]={canopy_base_height}', bash_content)
-    bash_content = re.sub(r'INT_VAL\[8\]=\d+', f'INT_VAL[8]={canopy_bulk_density}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[1\]=\d+', f'INT_VAL[1]={params["slp"]}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[2\]=\d+', f'INT_VAL[2]={params["asp"]}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[4\]=\d+', f'INT_VAL[4]={params["fuel"]}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[5\]=\d+', f'INT_VAL[5]={params["cc"]}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[6\]=\d+', f'INT_VAL[6]={params["ch"]}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[7\]=\d+', f'INT_VAL[7]={params["cbh"]}', bash_content)
+    bash_content = re.sub(r'INT_VAL\[8\]=\d+', f'INT_VAL[8]={params["cbd"]}', bash_content)
 
     # Live moisture content
-    bash_content = re.sub(r'LH_MOISTURE_CONTENT=[0-9.-]+', f'LH_MOISTURE_CONTENT={live_herbaceous:.1f}', bash_content)
-    bash_content = re.sub(r'LW_MOISTURE_CONTENT=[0-9.-]+', f'LW_MOISTURE_CONTENT={live_woody:.1f}', bash_content)
+    bash_content = re.sub(r'LH_MOISTURE_CONTENT=[0-9.-]+', f'LH_MOISTURE_CONTENT={params["lhc"]:.1f}', bash_content)
+    bash_content = re.sub(r'LW_MOISTURE_CONTENT=[0-9.-]+', f'LW_MOISTURE_CONTENT={params["lwc"]:.1f}', bash_content)
 
-    with open('01-run.sh', 'w') as f:
+    with open(script_path, 'w') as f:
         f.write(bash_content)
 
-    # Modify elmfire.data.in
-    with open('elmfire.data.in', 'r') as f:
-        config_content = f.read()
+# set the ignition points in elmfire.data.in (one or more ignitions at t=0)
+def set_ignitions(x_ign, y_ign, config_path='elmfire.data.in'):
+    config = ElmfireNamelist.read(config_path)
+    config.set('NUM_IGNITIONS', len(x_ign))
+    config.set_array('X_IGN', [round(float(x), 1) for x in x_ign])
+    config.set_array('Y_IGN', [round(float(y), 1) for y in y_ign])
+    config.set_array('T_IGN', [0.0] * len(x_ign))
+    config.write(config_path)
 
-    config_content = re.sub(r'X_IGN\(1\)\s*=\s*[0-9.-]+', f'X_IGN(1)      = {x_ign:.1f}', config_content)
-    config_content = re.sub(r'Y_IGN\(1\)\s*=\s*[0-9.-]+', f'Y_IGN(1)      = {y_ign:.1f}', config_content)
+def write_tracking_row(run_number, params, tracking_file='input_tracking.txt'):
+    # write the run number and parameters to a new line like a csv in input_tracking.txt
+    values = [f"{params[c]:.1f}" if c in FLOAT_COLUMNS else str(params[c]) for c in TRACKING_COLUMNS]
+    with open(tracking_file, 'a') as f:
+        f.write(f"{run_number}," + ",".join(values) + "\n")
 
-    with open('elmfire.data.in', 'w') as f:
-        f.write(config_content)
+def set_parameters():
+    # Get run number from command line argument
+    if len(sys.argv) < 2:
+        print("Usage: python set_params.py <run_number>")
+        sys.exit(1)
+    run_number = sys.argv[1]
+    tstop = float(sys.argv[2]) if len(sys.argv) > 2 else 22100.0  # Default simulation stop time
+    domain_size = float(sys.argv[3]) if len(sys.argv) > 3 else 3840.0  # Default domain size
 
-    # write the run number and parameters to a new line like a csv in input_tracking.txt
-    with open('input_tracking.txt', 'a') as f:
-        f.write(f"{run_number},{x_ign:.1f},{y_ign:.1f},{fuel_model},{slope},{aspect},{wind_speed:.1f},{wind_direction:.1f},"
-                f"{m1_moisture:.1f},{m10_moisture:.1f},{m100_moisture:.1f},{canopy_cover},{canopy_height},"
-                f"{canopy_base_height},{canopy_bulk_density},{live_herbaceous:.1f},{live_woody:.1f}\n")
+    params = draw_parameters(domain_size)
+    update_run_script(params, tstop, domain_size)
+    set_ignitions([params['xign']], [params['yign']])
+    write_tracking_row(run_number, params)
 
-set_parameters()
\ No newline at end of file
+if __name__ == "__main__":
+    set_parameters()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for backfilling firearea into the tracking file.
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pytest
+import rasterio
+from pathlib import Path
+from rasterio.transform import from_origin
+from backfill_firearea import backfill_fire_areas
+
+TRACKING = """run,xign,firearea,yign,ws
+3,30.0,,-60.0,12.50
+1,-30.0,,60.0,3.0
+2,0.0,7.0,0.0,1e1
+4,15.0,,15.0,0.0
+"""
+
+def write_case(cases_dir, run, burned_cells):
+    toa = np.full((4, 4), -9999.0, dtype=np.float32)
+    toa.flat[:burned_cells] = 60.0
+    case_dir = Path(cases_dir) / f'case_{run}'
+    case_dir.mkdir(parents=True)
+    with rasterio.open(case_dir / 'time_of_arrival_0000001_0003600.tif', 'w', driver='GTiff', height=4, width=4,
+                       count=1, dtype='float32', transform=from_origin(-60, 60, 30, 30), nodata=-9999.0) as dst:
+        dst.write(toa, 1)
+
+def make_campaign(temp_dir):
+    cases_dir = Path(temp_dir) / 'cases'
+    for run, burned_cells in ((1, 9), (2, 2), (3, 16)):
+        write_case(cases_dir, run, burned_cells)
+    tracking = Path(temp_dir) / 'input_tracking.txt'
+    tracking.write_text(TRACKING)
+    os.chmod(tracking, 0o644)
+    return str(cases_dir), str(tracking)
+
+def test_areas_joined_by_run():
+    """Areas go to the row of their run, other values stay verbatim and firearea is last."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir, tracking = make_campaign(temp_dir)
+        backfill_fire_areas(cases_dir, tracking, workers=2)
+        lines = Path(tracking).read_text().splitlines()
+        assert lines == ['run,xign,yign,ws,firearea',
+                         '3,30.0,-60.0,12.50,3.6',   # 16 cells of 900 m2
+                         '1,-30.0,60.0,3.0,2.0',     # 9 cells
+                         '2,0.0,0.0,1e1,7.0',        # already filled
+                         '4,15.0,15.0,0.0,']         # no case directory
+        assert sorted(os.listdir(temp_dir)) == ['cases', 'input_tracking.txt']
+        assert os.stat(tracking).st_mode & 0o777 == 0o644
+
+        backfill_fire_areas(cases_dir, tracking, workers=2, overwrite=True)
+        assert pd.read_csv(tracking).set_index('run').loc[2, 'firearea'] == 0.4
+
+def test_interrupted_write_keeps_the_table(monkeypatch):
+    """A failure while writing leaves the old tracking file and no temporary file behind."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir, tracking = make_campaign(temp_dir)
+
+        def fail(*args, **kwargs):
+            raise KeyboardInterrupt
+        monkeypatch.setattr(pd.DataFrame, 'to_csv', fail)
+        with pytest.raises(KeyboardInterrupt):
+            backfill_fire_areas(cases_dir, tracking, workers=1)
+
+        assert Path(tracking).read_text() == TRACKING
+        assert sorted(os.listdir(temp_dir)) == ['cases', 'input_tracking.txt']
+
+if __name__ == "__main__":
+    test_areas_joined_by_run()
+    print("✓ test_areas_joined_by_run")
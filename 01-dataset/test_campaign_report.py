@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless campaign report.
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pytest
+import rasterio
+from pathlib import Path
+from rasterio.transform import from_origin
+
+pytest.importorskip('matplotlib')
+pytest.importorskip('seaborn')
+from campaign_report import build_report, REPORT_FIGURES
+from set_params import TRACKING_COLUMNS
+from param_stats import stats_from_table, save_param_stats
+
+def make_campaign(campaign_dir, num_runs=40):
+    """Tracking file with fire areas, its running statistics and the final TOA raster of every case."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({c: rng.uniform(0, 30, num_runs).round(1) for c in TRACKING_COLUMNS})
+    df['fuel'] = rng.choice([1, 2, 101, 102, 165], num_runs)
+    df['firearea'] = rng.exponential(50.0, num_runs).round(1)
+    df.insert(0, 'run', range(1, num_runs + 1))
+    df.to_csv(Path(campaign_dir) / 'input_tracking.txt', index=False)
+    save_param_stats(stats_from_table(str(Path(campaign_dir) / 'input_tracking.txt')),
+                     str(Path(campaign_dir) / 'param_stats.json'))
+
+    for run in range(1, num_runs + 1):
+        toa = np.full((16, 16), -9999.0, dtype=np.float32)
+        toa[6:6 + run % 5, 6:10] = 60.0 * run
+        case_dir = Path(campaign_dir) / 'cases' / f'case_{run}'
+        case_dir.mkdir(parents=True)
+        with rasterio.open(case_dir / 'time_of_arrival_0000001_0003600.tif', 'w', driver='GTiff', height=16,
+                           width=16, count=1, dtype='float32', transform=from_origin(-240, 240, 30, 30),
+                           nodata=-9999.0) as dst:
+            dst.write(toa, 1)
+
+def test_report_renders_index():
+    """Figures are rendered headless to PNGs and collected in index.html."""
+    figures = ['input_distribution', 'fire_area_correlation', 'fuel_model_distribution', 'toa_first_cases',
+               'top_fire_area_cases']
+    with tempfile.TemporaryDirectory() as temp_dir:
+        make_campaign(temp_dir)
+        cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            results = build_report('report', figures, workers=2, kde_sample=100)
+            index = Path('report/index.html').read_text()
+            pngs = sorted(os.listdir('report'))
+        finally:
+            os.chdir(cwd)
+
+    assert [name for name, _, _, _ in results] == figures
+    errors = {name: error for name, _, _, error in results if error}
+    assert not errors, errors
+    for name, png, _, _ in results:
+        assert png == f'{name}.png' and png in pngs
+        assert f'<h2>{name}</h2>' in index and f'<img src="{png}"' in index
+
+def test_unknown_figure_is_rejected():
+    with pytest.raises(ValueError, match='Unknown report figures'):
+        build_report('report', ['not_a_figure'])
+    assert 'input_distribution' in REPORT_FIGURES
+
+if __name__ == "__main__":
+    for test in [test_report_renders_index, test_unknown_figure_is_rejected]:
+        test()
+        print(f"✓ {test.__name__}")
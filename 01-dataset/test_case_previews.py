@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-campaign raster preview cache.
+"""
+
+import zipfile
+import numpy as np
+import rasterio
+import tempfile
+from pathlib import Path
+from rasterio.transform import from_origin
+from case_previews import block_reduce, case_previews, append_previews, load_previews, load_preview
+
+def write_tif(data, path, nodata=-9999.0):
+    with rasterio.open(path, 'w', driver='GTiff', height=data.shape[0], width=data.shape[1], count=1,
+                       dtype=data.dtype, transform=from_origin(-960, 960, 30, 30), nodata=nodata) as dst:
+        dst.write(data, 1)
+
+def test_block_reduce():
+    """Blocks average their burned cells; fully unburned blocks are NaN."""
+    data = np.full((128, 128), -9999, dtype=np.float32)
+    data[:2, :2] = [[1, 2], [3, -9999]]
+    preview = block_reduce(data, 64)
+    assert preview.shape == (64, 64) and preview.dtype == np.float32
+    assert preview[0, 0] == 2.0 and np.isnan(preview[1:, :]).all()
+    assert block_reduce(np.ones((100, 100)), 32).shape == (25, 25)
+
+def test_preview_cache_round_trip():
+    """Previews appended at ingest are read back by run, variable and size."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        preview_file = str(Path(temp_dir) / 'case_previews.npz')
+        for run in (1, 2):
+            case_dir = Path(temp_dir) / f'case_{run}'
+            case_dir.mkdir()
+            write_tif(np.full((64, 64), float(run), dtype=np.float32), case_dir / 'time_of_arrival_0000001_0000060.tif')
+            append_previews(case_previews(str(case_dir)), preview_file)
+
+        previews = load_previews([1, 2, 3], 'time_of_arrival', 32, preview_file)
+        assert sorted(previews) == [1, 2]
+        assert previews[2].shape == (32, 32) and (previews[2] == 2.0).all()
+        assert load_preview(1, 'time_of_arrival', 64, preview_file).shape == (64, 64)
+        assert load_preview(1, 'flin', 64, preview_file) is None
+
+def test_rerun_case_replaces_its_previews():
+    """Adding a case again keeps one member per key; a changed case replaces its previews."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        preview_file = str(Path(temp_dir) / 'case_previews.npz')
+        case_dirs = []
+        for run in (1, 2):
+            case_dir = Path(temp_dir) / f'case_{run}'
+            case_dir.mkdir()
+            write_tif(np.full((64, 64), float(run), dtype=np.float32), case_dir / 'time_of_arrival_0000001_0000060.tif')
+            case_dirs.append(case_dir)
+            append_previews(case_previews(str(case_dir)), preview_file)
+        size = Path(preview_file).stat().st_size
+
+        append_previews(case_previews(str(case_dirs[0])), preview_file)
+        assert Path(preview_file).stat().st_size == size
+
+        write_tif(np.full((64, 64), 5.0, dtype=np.float32), case_dirs[0] / 'time_of_arrival_0000001_0000060.tif')
+        append_previews(case_previews(str(case_dirs[0])), preview_file)
+        with zipfile.ZipFile(preview_file) as zf:
+            names = zf.namelist()
+        assert len(names) == len(set(names)) == 4
+        assert (load_preview(1, 'time_of_arrival', 64, preview_file) == 5.0).all()
+        assert (load_preview(2, 'time_of_arrival', 64, preview_file) == 2.0).all()
+        assert sorted(Path(temp_dir).iterdir()) == sorted([Path(preview_file)] + case_dirs)
+
+if __name__ == "__main__":
+    for test in [test_block_reduce, test_preview_cache_round_trip, test_rerun_case_replaces_its_previews]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-case summaries and windowed reads bounded to the burned extent.
+"""
+
+import numpy as np
+import rasterio
+import tempfile
+from pathlib import Path
+from rasterio.transform import from_origin
+from case_summary import summarize_arrays, append_summaries, burned_window
+from raster_window import read_window
+
+def write_tif(data, path, nodata=-9999.0):
+    with rasterio.open(path, 'w', driver='GTiff', height=data.shape[0], width=data.shape[1], count=1,
+                       dtype=data.dtype, transform=from_origin(-150, 150, 30, 30), nodata=nodata) as dst:
+        dst.write(data, 1)
+
+def test_summarize_arrays():
+    """Counts, extremes and the bounding box cover the burned cells only."""
+    toa = np.full((10, 10), -9999, dtype=np.float32)
+    toa[2:4, 5:8] = [[10.0, 20.0, 30.0], [40.0, 50.0, 60.0]]
+    flin = np.where(toa > 0, toa / 10, 0.0)
+    summary = summarize_arrays(3, toa, flin=flin)
+    assert summary['burned_cells'] == 6 and summary['toa_max'] == 60.0
+    assert summary['flin_min'] == 1.0 and summary['flin_max'] == 6.0 and np.isnan(summary['vs_mean'])
+    assert (summary['row_min'], summary['row_max'], summary['col_min'], summary['col_max']) == (2, 3, 5, 7)
+    assert summary['perimeter'] == 10 * 30.0
+
+def test_burned_window_reads():
+    """The summary bbox gives a window; reads clip it or pad it with nodata."""
+    toa = np.full((10, 10), -9999, dtype=np.float32)
+    toa[0:3, 4:6] = 60.0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tif = Path(temp_dir) / 'time_of_arrival_0000001_0000060.tif'
+        write_tif(toa, tif)
+        summary_file = str(Path(temp_dir) / 'case_summaries.csv')
+        append_summaries([summarize_arrays(7, toa), summarize_arrays(8, np.full((10, 10), -9999.0))], summary_file)
+
+        with rasterio.open(tif) as src:
+            data, window = read_window(src)
+            assert window is None and np.array_equal(data, toa)
+
+            data, _ = read_window(src, burned_window(7, summary_file))
+            assert np.array_equal(data, toa[0:3, 4:6])
+
+            # padding past the north edge is clipped unless nodata padding is requested
+            window = burned_window(7, summary_file, padding=1)
+            data, clipped = read_window(src, window)
+            assert np.array_equal(data, toa[0:4, 3:7])
+            assert src.window_transform(clipped) * (0, 0) == (-60.0, 150.0)
+            padded, _ = read_window(src, window, pad_nodata=True)
+            assert padded.shape == (5, 4)
+            assert (padded[0] == -9999).all() and np.array_equal(padded[1:], toa[0:4, 3:7])
+
+            assert read_window(src, burned_window(8, summary_file))[0].size == 0
+        assert burned_window(9, summary_file) is None
+
+if __name__ == "__main__":
+    for test in [test_summarize_arrays, test_burned_window_reads]:
+        test()
+        print(f"✓ {test.__name__}")
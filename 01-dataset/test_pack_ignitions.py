@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for packing several fires into one run: guard band, layout geometry and rejection.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import rasterio
+from pathlib import Path
+from rasterio.transform import from_origin
+from pack_ignitions import (guard_band_cells, pack_layout, rejected_tiles, layout_run, crop_run, rerun_single,
+                            max_spread_from_cases, LAYOUT_FILE, RERUN_FILE)
+from set_params import TRACKING_COLUMNS
+from elmfire_namelist import ElmfireNamelist
+
+HERE = Path(__file__).resolve().parent
+
+def test_guard_band_cells():
+    """Only spread beyond the inner-ignition edge distance needs guard cells, split evenly."""
+    # ignitions anywhere in the window (the default, like set_params) can sit on its edge
+    assert guard_band_cells(900.0) == 30
+    assert guard_band_cells(930.0) == 32      # 31 cells, rounded up to even
+    assert guard_band_cells(3840.0, max_guard_cells=41) == 40
+    # ignitions in the central 50% of a 3840 m window are at least 960 m from its edge
+    assert guard_band_cells(900.0, inner_percent=0.5) == 0
+    assert guard_band_cells(960.0, inner_percent=0.5) == 0
+    assert guard_band_cells(990.0, inner_percent=0.5) == 2
+    assert guard_band_cells(1050.0, inner_percent=0.5) == 4      # 3 cells -> 4
+    assert guard_band_cells(3840.0, inner_percent=0.5) == 96
+    assert guard_band_cells(1000.0, domain_size=1920.0, inner_percent=0.0) == 2
+
+def test_pack_layout_geometry():
+    """Windows sit on a regular grid, separated by the guard band, ignitions anywhere in their window."""
+    np.random.seed(0)
+    layout = pack_layout(5, guard_cells=4)
+    n, cellsize = layout['window_cells'], layout['cellsize']
+    assert n == 128 and len(layout['tiles']) == 5
+    assert layout['packed_size'] == 3 * (128 + 4) * 30.0  # 5 fires need a 3 x 3 grid
+
+    origins = sorted((t['row0'], t['col0']) for t in layout['tiles'])
+    assert origins[:4] == [(2, 2), (2, 134), (2, 266), (134, 2)]
+    for tile in layout['tiles']:
+        assert abs(tile['xign']) <= 1920.0 and abs(tile['yign']) <= 1920.0
+        # the global ignition maps back to the ignition offset from its window center
+        col = (tile['x_global'] + layout['packed_size'] / 2) / cellsize - tile['col0']
+        row = (layout['packed_size'] / 2 - tile['y_global']) / cellsize - tile['row0']
+        assert np.isclose((col - n / 2) * cellsize, tile['xign'])
+        assert np.isclose((n / 2 - row) * cellsize, tile['yign'])
+
+    # same distribution as set_params.draw_parameters, or an explicit inner fraction
+    np.random.seed(0)
+    ignitions = np.array([[t['xign'], t['yign']] for t in pack_layout(400, guard_cells=4)['tiles']])
+    assert np.abs(ignitions).max() > 1700.0
+    inner = pack_layout(100, guard_cells=4, inner_percent=0.5)['tiles']
+    assert max(max(abs(t['xign']), abs(t['yign'])) for t in inner) <= 960.0
+
+def test_fire_crossing_the_guard_band_is_rejected():
+    """A tile is rejected when burned cells lie in the band around its window, not inside it."""
+    layout = pack_layout(4, guard_cells=4)
+    size = int(round(layout['packed_size'] / layout['cellsize']))
+    n = layout['window_cells']
+    burned = np.zeros((size, size), dtype=bool)
+
+    # tile 0 burns only inside its window
+    t0 = layout['tiles'][0]
+    burned[t0['row0'] + 10:t0['row0'] + n - 1, t0['col0'] + 10:t0['col0'] + 20] = True
+    assert rejected_tiles(burned, layout) == []
+
+    # tile 3 burns into the guard band on its north edge, which it shares with tile 1
+    t3 = layout['tiles'][3]
+    burned[t3['row0'] - 1:t3['row0'] + 5, t3['col0'] + 50] = True
+    assert rejected_tiles(burned, layout) == [1, 3]
+
+    # a fire bridging the band between tiles 0 and 1 marks both
+    t1 = layout['tiles'][1]
+    burned[t0['row0'] + 60, t0['col0'] + n - 5:t1['col0'] + 5] = True
+    assert rejected_tiles(burned, layout) == [0, 1, 3]
+
+    # tile 2 burning up to, but not into, the band around it is kept
+    t2 = layout['tiles'][2]
+    burned[t2['row0'] + n - 1, t2['col0']:t2['col0'] + n] = True
+    assert 2 not in rejected_tiles(burned, layout)
+
+def test_layout_run_writes_packed_domain():
+    """layout_run sizes the run script to the packed domain and sets one ignition per fire."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shutil.copy(HERE / '01-run.sh', temp_dir)
+        shutil.copy(HERE / 'elmfire.data.in', temp_dir)
+        cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            np.random.seed(1)
+            layout_run(11, 4, 3600.0, 3840.0, max_spread_m=90.0)
+            with open(LAYOUT_FILE) as f:
+                layout = json.load(f)
+            script = Path('01-run.sh').read_text()
+            config = ElmfireNamelist.read('elmfire.data.in')
+        finally:
+            os.chdir(cwd)
+
+    assert layout['guard_cells'] == 4 and layout['first_run'] == 11   # 90 m of spread from the window edge
+    assert f"DOMAINSIZE={layout['packed_size']}" in script
+    assert 'SIMULATION_TSTOP=3600.0' in script
+    assert int(config.get('NUM_IGNITIONS')) == 4
+    assert np.allclose(config.get_array('X_IGN'), [round(t['x_global'], 1) for t in layout['tiles']])
+
+def test_tracking_rows_in_run_order():
+    """Rejected fires get their tracking rows with the accepted ones, in run order."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shutil.copy(HERE / '01-run.sh', temp_dir)
+        shutil.copy(HERE / 'elmfire.data.in', temp_dir)
+        cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            np.random.seed(3)
+            layout_run(21, 4, 3600.0, 3840.0, max_spread_m=90.0)
+            with open(LAYOUT_FILE) as f:
+                layout = json.load(f)
+            size = int(round(layout['packed_size'] / layout['cellsize']))
+            toa = np.full((size, size), -9999.0, dtype=np.float32)
+            # the fire of tile 1 burns into the guard band on its west edge
+            t1 = layout['tiles'][1]
+            toa[t1['row0'] + 5, t1['col0'] - 1:t1['col0'] + 5] = 60.0
+            os.makedirs('outputs')
+            half = layout['packed_size'] / 2
+            with rasterio.open('outputs/time_of_arrival_0000001_0003600.tif', 'w', driver='GTiff', height=size,
+                               width=size, count=1, dtype='float32', nodata=-9999.0,
+                               transform=from_origin(-half, half, 30, 30)) as dst:
+                dst.write(toa, 1)
+            Path('input_tracking.txt').write_text('run,' + ','.join(TRACKING_COLUMNS) + '\n')
+            crop_run()
+            tracking = pd.read_csv('input_tracking.txt')
+            reruns = Path(RERUN_FILE).read_text().split()
+            rerun_single(22, 3600.0, 3840.0)
+            assert pd.read_csv('input_tracking.txt').equals(tracking)
+        finally:
+            os.chdir(cwd)
+
+    assert reruns == ['21', '22']   # the band west of tile 1 is shared with tile 0
+    assert tracking['run'].tolist() == [21, 22, 23, 24]
+    assert tracking['xign'].tolist() == [t['xign'] for t in layout['tiles']]
+
+def test_max_spread_from_cases():
+    """The spread of a case is the largest distance from its ignition to a burned cell."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir = Path(temp_dir) / 'cases'
+        for run, burned_cell in [(1, (2, 2)), (2, (0, 3)), (3, None)]:
+            toa = np.full((4, 4), -9999.0, dtype=np.float32)
+            toa[1, 1] = 0.0
+            if burned_cell:
+                toa[burned_cell] = 60.0
+            (cases_dir / f'case_{run}').mkdir(parents=True)
+            with rasterio.open(cases_dir / f'case_{run}' / 'time_of_arrival_0000001_0003600.tif', 'w',
+                               driver='GTiff', height=4, width=4, count=1, dtype='float32',
+                               transform=from_origin(-60, 60, 30, 30), nodata=-9999.0) as dst:
+                dst.write(toa, 1)
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        # the ignition is at the center of cell (1, 1)
+        pd.DataFrame({'run': [1, 2, 3], 'xign': -15.0, 'yign': 15.0}).to_csv(tracking, index=False)
+
+        assert np.isclose(max_spread_from_cases(str(cases_dir), str(tracking)), np.hypot(60.0, 30.0))
+        assert np.isclose(max_spread_from_cases(str(cases_dir), str(tracking), runs=[1]), np.hypot(30.0, 30.0))
+        assert max_spread_from_cases(str(cases_dir), str(tracking), runs=[4]) == 0.0
+
+if __name__ == "__main__":
+    for test in [test_guard_band_cells, test_pack_layout_geometry, test_fire_crossing_the_guard_band_is_rejected,
+                 test_layout_run_writes_packed_domain, test_tracking_rows_in_run_order, test_max_spread_from_cases]:
+        test()
+        print(f"✓ {test.__name__}")
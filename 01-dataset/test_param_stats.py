@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the running covariance of input parameters and fire area.
+"""
+
+import numpy as np
+import pandas as pd
+import tempfile
+from pathlib import Path
+from param_stats import RunningCovariance, STATS_COLUMNS, update_param_stats, load_param_stats, merge_param_stats
+
+def random_table(num_runs, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(num_runs, len(STATS_COLUMNS))) * 10 + 100, columns=STATS_COLUMNS)
+    df.insert(0, 'run', np.arange(1, num_runs + 1))
+    return df
+
+def test_running_matches_pandas():
+    """Run-by-run updates give the same covariance and correlation as the full table."""
+    df = random_table(50)
+    stats = RunningCovariance()
+    for _, row in df.iterrows():
+        stats.update(row[STATS_COLUMNS].to_numpy())
+    assert stats.count == 50
+    assert np.allclose(stats.covariance(), df[STATS_COLUMNS].cov())
+    assert np.allclose(stats.correlation(), df[STATS_COLUMNS].corr())
+
+def test_merge_shards_and_tracking_update():
+    """Shards updated from the tracking file merge to the statistics of all runs."""
+    df = random_table(40, seed=1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracking = str(Path(temp_dir) / 'input_tracking.txt')
+        df.drop(columns='firearea').to_csv(tracking, index=False)
+        areas = dict(zip(df['run'], df['firearea']))
+        shards = []
+        for i, runs in enumerate([range(1, 11), range(11, 41)]):
+            shard = str(Path(temp_dir) / f'param_stats_{i}.json')
+            for run in runs:
+                update_param_stats({run: areas[run]}, tracking, shard)
+            shards.append(shard)
+
+        merged = merge_param_stats(shards, str(Path(temp_dir) / 'param_stats.json'))
+        assert merged.count == 40
+        assert np.allclose(merged.covariance(), df[STATS_COLUMNS].cov())
+        assert np.allclose(load_param_stats(str(Path(temp_dir) / 'param_stats.json')).correlation(),
+                           df[STATS_COLUMNS].corr())
+
+def test_runs_are_counted_once():
+    """A run summarized again or a shard merged twice does not change the statistics."""
+    df = random_table(20, seed=2)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracking = str(Path(temp_dir) / 'input_tracking.txt')
+        df.drop(columns='firearea').to_csv(tracking, index=False)
+        areas = dict(zip(df['run'], df['firearea']))
+        shard = str(Path(temp_dir) / 'param_stats_0.json')
+        update_param_stats({run: areas[run] for run in range(1, 21)}, tracking, shard)
+        update_param_stats({run: areas[run] for run in range(5, 11)}, tracking, shard)
+        stats = load_param_stats(shard)
+        assert stats.count == 20 and stats.runs == list(range(1, 21))
+        assert np.allclose(stats.covariance(), df[STATS_COLUMNS].cov())
+
+        merged = merge_param_stats([shard, shard], str(Path(temp_dir) / 'param_stats.json'))
+        assert merged.count == 20
+        assert sorted(f.name for f in Path(temp_dir).iterdir()) == ['input_tracking.txt', 'param_stats.json',
+                                                                      'param_stats_0.json']
+
+if __name__ == "__main__":
+    for test in [test_running_matches_pandas, test_merge_shards_and_tracking_update, test_runs_are_counted_once]:
+        test()
+        print(f"✓ {test.__name__}")
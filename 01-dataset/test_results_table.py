@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached, typed results-table loader.
+"""
+
+import os
+import tempfile
+import pandas as pd
+from pathlib import Path
+from results_table import load_results, parquet_path, clear_cache
+
+TABLE = """run,xign,yign,fuel,slp,asp,ws,wd,m1,m10,m100,cc,ch,cbh,cbd,lhc,lwc,source_run,transform,firearea
+1,30.0,-60.0,102,10,90,12.5,180.0,5.0,6.0,7.0,20,2,1,10,60.0,70.0,1,identity,12.3
+2,-30.0,60.0,165,0,0,3.0,270.0,9.0,8.0,7.0,0,0,0,0,50.0,90.0,1,rot90,
+"""
+
+def test_round_trip_keeps_types():
+    """Parameters are typed, strings survive and the Parquet cache holds the same table."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = str(Path(temp_dir) / 'input_tracking_augmented.txt')
+        Path(csv_path).write_text(TABLE)
+        clear_cache()
+        df = load_results(csv_path)
+        assert str(df['run'].dtype) == 'int64' and str(df['fuel'].dtype) == 'int32'
+        assert str(df['ws'].dtype) == 'float64' and str(df['firearea'].dtype) == 'float64'
+        assert list(df['transform']) == ['identity', 'rot90']
+        assert df['firearea'].isna().tolist() == [False, True]
+
+        assert os.path.exists(parquet_path(csv_path))
+        clear_cache()
+        cached = load_results(csv_path)
+        pd.testing.assert_frame_equal(cached, df)
+
+        # callers get copies
+        cached['ws'] = 0.0
+        assert load_results(csv_path)['ws'].tolist() == [12.5, 3.0]
+
+def test_cache_invalidated_when_csv_changes():
+    """Appending a run invalidates both the in-process and the Parquet cache."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = str(Path(temp_dir) / 'input_tracking.txt')
+        Path(csv_path).write_text("run,xign,fuel\n1,30.0,102\n")
+        clear_cache()
+        assert len(load_results(csv_path)) == 1
+
+        with open(csv_path, 'a') as f:
+            f.write("2,60.0,165\n")
+        assert load_results(csv_path)['run'].tolist() == [1, 2]
+
+        # a fresh process reads the Parquet file only if it is newer than the CSV
+        clear_cache()
+        stat = os.stat(csv_path)
+        os.utime(parquet_path(csv_path), ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+        Path(csv_path).write_text("run,xign,fuel\n1,30.0,102\n2,60.0,165\n3,90.0,101\n")
+        assert load_results(csv_path)['run'].tolist() == [1, 2, 3]
+
+if __name__ == "__main__":
+    for test in [test_round_trip_keeps_types, test_cache_invalidated_when_csv_changes]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for synthesizing cases by translating one centered run: domain size, crop origins,
+ignition snapping and the exact-equivalence flag.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import rasterio
+from pathlib import Path
+from rasterio.transform import from_origin
+from translate_ignitions import (enlarged_domain_size, crop_origin, is_exact, setup_run,
+                                 synthesize_cases, LAYOUT_FILE, FLAGS_FILE)
+
+HERE = Path(__file__).resolve().parent
+
+def test_enlarged_domain_size():
+    """The enlarged domain adds the largest ignition offset (in whole cells) on every side."""
+    # 128 cells plus 64 cells (1920 m) on each side for ignitions anywhere in the window
+    assert enlarged_domain_size(3840.0) == 256 * 30.0
+    # 32 cells (960 m) for ignitions in the central 50%
+    assert enlarged_domain_size(3840.0, inner_percent=0.5) == 192 * 30.0
+    assert enlarged_domain_size(3840.0, inner_percent=0.0) == 3840.0
+    # 990 m windows round the 495 m offset up to 17 cells
+    assert enlarged_domain_size(990.0) == (33 + 34) * 30.0
+
+def test_crop_origin():
+    """A centered crop for (0, 0); east shifts the window west, north shifts it south."""
+    assert crop_origin(0.0, 0.0, 192, 128) == (32, 32)
+    assert crop_origin(30.0, 0.0, 192, 128) == (32, 31)
+    assert crop_origin(0.0, 30.0, 192, 128) == (33, 32)
+    assert crop_origin(960.0, -960.0, 192, 128) == (0, 0)
+    assert crop_origin(-960.0, 960.0, 192, 128) == (64, 64)
+    # offsets that are not whole cells round to the nearest cell
+    assert crop_origin(44.0, 16.0, 192, 128) == crop_origin(30.0, 30.0, 192, 128)
+
+def test_is_exact():
+    """A fire is exact only if it stays off the border ring of its window."""
+    burned = np.zeros((10, 10), dtype=bool)
+    burned[4:6, 4:6] = True
+    assert is_exact(burned, 2, 2, 6)
+    assert not is_exact(burned, 4, 4, 6)   # touches the border ring
+    assert not is_exact(burned, 0, 0, 5)   # burns outside the window
+
+def test_setup_snaps_ignitions_to_cells():
+    """Ignitions are whole cells drawn over the whole window, and the run uses the enlarged domain."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shutil.copy(HERE / '01-run.sh', temp_dir)
+        shutil.copy(HERE / 'elmfire.data.in', temp_dir)
+        cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            np.random.seed(2)
+            setup_run(5, 20, 3600.0, 3840.0)
+            with open(LAYOUT_FILE) as f:
+                layout = json.load(f)
+            script = Path('01-run.sh').read_text()
+        finally:
+            os.chdir(cwd)
+
+    assert layout['enlarged_size'] == 7680.0 and 'DOMAINSIZE=7680.0' in script
+    assert [case['run'] for case in layout['cases']] == list(range(5, 25))
+    for case in layout['cases']:
+        for value in (case['xign'], case['yign']):
+            assert value % 30.0 == 0 and abs(value) <= 1920.0
+    assert max(max(abs(case['xign']), abs(case['yign'])) for case in layout['cases']) > 960.0
+
+def test_synthesized_cases_and_flags():
+    """Each crop shows the fire at its ignition point; fires cut by the crop are not exact."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outputs_dir = Path(temp_dir) / 'outputs'
+        outputs_dir.mkdir()
+        # a fire from the center of the enlarged domain burning 60 cells east
+        toa = np.full((192, 192), -9999.0, dtype=np.float32)
+        toa[96, 96:156] = np.arange(60, dtype=np.float32)
+        with rasterio.open(outputs_dir / 'time_of_arrival_0000001_0003600.tif', 'w', driver='GTiff',
+                           height=192, width=192, count=1, dtype='float32',
+                           transform=from_origin(-2880, 2880, 30, 30), nodata=-9999.0) as dst:
+            dst.write(toa, 1)
+
+        cases = [{'run': 1, 'xign': 0.0, 'yign': 0.0}, {'run': 2, 'xign': -960.0, 'yign': 300.0},
+                 {'run': 3, 'xign': 960.0, 'yign': 0.0}]
+        params = {'fuel': 102, 'slp': 0, 'asp': 0, 'ws': 10.0, 'wd': 90.0, 'm1': 5.0, 'm10': 6.0,
+                  'm100': 7.0, 'cc': 0, 'ch': 0, 'cbh': 0, 'cbd': 0, 'lhc': 60.0, 'lwc': 70.0}
+        layout = {'domain_size': 3840.0, 'enlarged_size': 5760.0, 'cellsize': 30.0, 'tstop': 3600.0,
+                  'params': params, 'cases': cases}
+        cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            Path(LAYOUT_FILE).write_text(json.dumps(layout))
+            Path('input_tracking.txt').write_text("run,xign,yign,fuel,slp,asp,ws,wd,m1,m10,m100,cc,ch,cbh,cbd,lhc,lwc\n")
+            synthesize_cases()
+            flags = pd.read_csv(FLAGS_FILE)
+            tracking = pd.read_csv('input_tracking.txt')
+            crops = {}
+            for case in cases:
+                with rasterio.open(f"cases/case_{case['run']}/time_of_arrival_0000001_0003600.tif") as src:
+                    crops[case['run']] = (src.read(1), src.transform)
+        finally:
+            os.chdir(cwd)
+
+    # the ignition cell of every crop sits at the (snapped) ignition point of its case
+    for case in cases:
+        data, transform = crops[case['run']]
+        rows, cols = np.nonzero(data == 0.0)
+        x, y = rasterio.transform.xy(transform, rows[0], cols[0], offset='ul')
+        assert (x, y) == (case['xign'], case['yign'])
+        assert data.shape == (128, 128)
+
+    assert flags['exact'].tolist() == [1, 1, 0]      # run 3 burns past the east edge of its crop
+    assert flags['source_run'].tolist() == [1, 1, 1]
+    assert tracking['xign'].tolist() == [0.0, -960.0, 960.0]
+
+if __name__ == "__main__":
+    for test in [test_enlarged_domain_size, test_crop_origin, test_is_exact,
+                 test_setup_snaps_ignitions_to_cells, test_synthesized_cases_and_flags]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,123 @@
+# this script reuses one ELMFIRE run for many ignition points.
+# With spatially constant rasters, a fire ignited at (x, y) is a shifted copy of a fire
+# ignited at the domain center. Each parameter set is simulated once on an enlarged domain
+# with a centered ignition, and the requested xign/yign cases are synthesized by shifting
+# and cropping the time_of_arrival, flin and vs rasters into standard case windows.
+#
+# Usage (called from 0N-run.sh in translate mode):
+#   python3 translate_ignitions.py setup <first_run> <num_cases> <tstop> <domain_size>
+#   bash 01-run.sh
+#   python3 translate_ignitions.py synthesize      -> writes ./cases/case_<run>
+#
+# Ignition points are snapped to whole cells so the shift is exact. Every synthesized case
+# gets an exact-equivalence flag in translation_flags.txt: a case is exact when the fire
+# stays inside the interior of its crop window. If the fire reaches the crop boundary, a
+# single run on the standard domain would have been cut off by the domain edge, so the
+# crop can differ from it near the boundary.
+
+import os
+import sys
+import glob
+import json
+import numpy as np
+import rasterio
+
+from set_params import (draw_parameters, draw_ignition, update_run_script, set_ignitions, write_tracking_row,
+                        IGNITION_INNER_PERCENT)
+from pack_ignitions import write_window, CELLSIZE, OUTPUT_PATTERNS
+
+LAYOUT_FILE = 'translation_layout.json'
+FLAGS_FILE = 'translation_flags.txt'
+
+# size of the enlarged domain that contains the crop window for every ignition offset in the central
+# inner_percent of the window
+def enlarged_domain_size(domain_size=3840.0, cellsize=CELLSIZE, inner_percent=IGNITION_INNER_PERCENT):
+    window_cells = int(round(domain_size / cellsize))
+    max_offset_cells = int(np.ceil(0.5 * domain_size * inner_percent / cellsize))
+    return (window_cells + 2 * max_offset_cells) * cellsize
+
+# crop window (row0, col0) in the enlarged raster for an ignition at (xign, yign) in case coordinates
+def crop_origin(xign, yign, enlarged_cells, window_cells, cellsize=CELLSIZE):
+    shift_col = int(round(xign / cellsize))
+    shift_row = int(round(yign / cellsize))
+    row0 = (enlarged_cells - window_cells) // 2 + shift_row
+    col0 = (enlarged_cells - window_cells) // 2 - shift_col
+    return row0, col0
+
+# a case is exact if the fire does not touch the border ring of its window or burn outside it
+def is_exact(burned, row0, col0, window_cells):
+    interior = burned[row0 + 1:row0 + window_cells - 1, col0 + 1:col0 + window_cells - 1]
+    return bool(interior.sum() == burned.sum())
+
+# ignitions are drawn like set_params.draw_parameters draws them (the whole window by default); a
+# smaller inner_percent shrinks the enlarged domain at the cost of never igniting near a window edge
+def setup_run(first_run, num_cases, tstop, domain_size, inner_percent=IGNITION_INNER_PERCENT):
+    params = draw_parameters(domain_size)
+    cases = []
+    for k in range(num_cases):
+        # snap to whole cells so the translated case matches a run ignited at that point
+        xign, yign = (round(v / CELLSIZE) * CELLSIZE for v in draw_ignition(domain_size, inner_percent))
+        cases.append({'run': first_run + k, 'xign': float(xign), 'yign': float(yign)})
+
+    enlarged_size = enlarged_domain_size(domain_size, CELLSIZE, inner_percent)
+    update_run_script(params, tstop, enlarged_size)
+    set_ignitions([0.0], [0.0])
+
+    layout = {'domain_size': domain_size, 'enlarged_size': enlarged_size, 'cellsize': CELLSIZE,
+              'tstop': tstop, 'params': params, 'cases': cases}
+    with open(LAYOUT_FILE, 'w') as f:
+        json.dump(layout, f, indent=1)
+    print(f"Simulating {num_cases} ignition points from one centered run on a {enlarged_size:.0f} m domain")
+
+def synthesize_cases(outputs_dir='./outputs', cases_dir='./cases', tracking_file='input_tracking.txt'):
+    with open(LAYOUT_FILE, 'r') as f:
+        layout = json.load(f)
+
+    cellsize = layout['cellsize']
+    window_cells = int(round(layout['domain_size'] / cellsize))
+    enlarged_cells = int(round(layout['enlarged_size'] / cellsize))
+
+    toa_files = glob.glob(f"{outputs_dir}/time_of_arrival_*.tif")
+    if not toa_files:
+        raise FileNotFoundError(f"No time_of_arrival files found in {outputs_dir}")
+    with rasterio.open(toa_files[0]) as src:
+        toa = src.read(1)
+        burned = (toa != src.nodata) & ~np.isnan(toa)
+
+    origins = [crop_origin(case['xign'], case['yign'], enlarged_cells, window_cells, cellsize)
+               for case in layout['cases']]
+
+    for pattern in OUTPUT_PATTERNS:
+        for filepath in glob.glob(f"{outputs_dir}/{pattern}"):
+            with rasterio.open(filepath) as src:
+                data = src.read(1)
+                for case, (row0, col0) in zip(layout['cases'], origins):
+                    case_dir = f"{cases_dir}/case_{case['run']}"
+                    os.makedirs(case_dir, exist_ok=True)
+                    write_window(src, data, row0, col0, window_cells, cellsize,
+                                 f"{case_dir}/{os.path.basename(filepath)}")
+
+    new_file = not os.path.exists(FLAGS_FILE)
+    num_exact = 0
+    with open(FLAGS_FILE, 'a') as f:
+        if new_file:
+            f.write("run,source_run,exact\n")
+        for case, (row0, col0) in zip(layout['cases'], origins):
+            exact = is_exact(burned, row0, col0, window_cells)
+            num_exact += exact
+            f.write(f"{case['run']},{layout['cases'][0]['run']},{int(exact)}\n")
+            write_tracking_row(case['run'], {**layout['params'], 'xign': case['xign'], 'yign': case['yign']},
+                               tracking_file)
+
+    print(f"Synthesized {len(layout['cases'])} cases ({num_exact} exact)")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('setup', 'synthesize'):
+        print("Usage: python3 translate_ignitions.py setup <first_run> <num_cases> <tstop> <domain_size>")
+        print("       python3 translate_ignitions.py synthesize")
+        sys.exit(1)
+
+    if sys.argv[1] == 'setup':
+        setup_run(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5]))
+    else:
+        synthesize_cases()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Consolidated, chunked store for all postprocessed ELMFIRE cases.
+
+The per-case .npy files in elmfire_sims are gathered into one HDF5 file with a
+dataset per variable of shape (case, time, h, w). Datasets are chunked along
+(case, time) and compressed with Blosc/Zstd when hdf5plugin is installed
+(gzip otherwise), so any case/time window can be read without decompressing
+whole cases. The case parameters from input_tracking.txt are stored as columns
+of the 'params' group, aligned with the case axis. Augmented cases (see
+elmfire_augment.py) are only included when the augmented tracking file is given.
+
+Layout:
+    /case          (case,)               run number of each case
+    /timesteps     (time,)               seconds of each timestep
+    /<variable>    (case, time, h, w)    e.g. toa, burnscar, flin, vs
+    /params/<col>  (case,)               tracking columns (NaN if missing)
+"""
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List
+from elmfire_postprocessor import load_case_arrays
+from elmfire_augment import AUGMENTED_DIR
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+def compression_options(codec: str = 'zstd', level: int = 5) -> Dict:
+    """h5py dataset keyword arguments for the requested codec."""
+    if codec in ('zstd', 'lz4') and hdf5plugin is not None:
+        return dict(hdf5plugin.Blosc(cname=codec, clevel=level, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    if codec == 'none':
+        return {}
+    if codec in ('zstd', 'lz4'):
+        print(f"hdf5plugin not installed, falling back to gzip instead of {codec}")
+    return {'compression': 'gzip', 'compression_opts': min(level, 9), 'shuffle': True}
+
+def processed_case_numbers(output_base_dir: str = './elmfire_sims') -> List[int]:
+    """Sorted run numbers of the cases saved in elmfire_sims."""
+    return sorted(int(d.name.split('_')[-1]) for d in Path(output_base_dir).glob('case_*') if d.is_dir())
+
+def case_base_dirs(output_base_dir: str = './elmfire_sims',
+                   augmented_tracking_file: str = None,
+                   augmented_dir: str = AUGMENTED_DIR) -> Dict[int, str]:
+    """Base directory of every case to read, by run number.
+
+    The processed cases in output_base_dir, plus the augmented cases listed in
+    augmented_tracking_file (written by elmfire_augment.py) if it is given.
+    """
+    dirs = {case_num: output_base_dir for case_num in processed_case_numbers(output_base_dir)}
+    if augmented_tracking_file:
+        augmented = pd.read_csv(augmented_tracking_file)
+        for run in augmented.loc[augmented['transform'] != 'identity', 'run'].astype(int):
+            if (Path(augmented_dir) / f"case_{run}").is_dir():
+                dirs[run] = augmented_dir
+    return dict(sorted(dirs.items()))
+
+def write_case_store(store_path: str = 'elmfire_cases.h5',
+                     output_base_dir: str = './elmfire_sims',
+                     tracking_file: str = 'input_tracking.txt',
+                     timestep_minutes: int = 15,
+                     time_chunk: int = 16,
+                     codec: str = 'zstd',
+                     level: int = 5,
+                     augmented_tracking_file: str = None,
+                     augmented_dir: str = AUGMENTED_DIR):
+    """Write every processed case into one chunked, compressed HDF5 store.
+
+    With augmented_tracking_file the augmented cases are added and their
+    parameters are taken from that file.
+    """
+    if h5py is None:
+        raise ImportError("h5py is required to write the case store (pip install h5py hdf5plugin)")
+
+    base_dirs = case_base_dirs(output_base_dir, augmented_tracking_file, augmented_dir)
+    case_nums = list(base_dirs)
+    if not case_nums:
+        raise FileNotFoundError(f"No processed cases found in {output_base_dir}")
+    tracking_file = augmented_tracking_file or tracking_file
+
+    first = load_case_arrays(case_nums[0], base_dirs[case_nums[0]])
+    variables = sorted(first)
+    num_timesteps = len(first[variables[0]])
+    height, width = first[variables[0]][0].shape
+    time_chunk = min(time_chunk, num_timesteps)
+    options = compression_options(codec, level)
+
+    tracking = pd.read_csv(tracking_file) if Path(tracking_file).exists() else pd.DataFrame(columns=['run'])
+    params = tracking.drop_duplicates('run', keep='last').set_index('run').reindex(case_nums)
+
+    print(f"Writing {len(case_nums)} cases x {num_timesteps} timesteps of {variables} to {store_path}")
+    with h5py.File(store_path, 'w') as store:
+        store.attrs['timestep_minutes'] = timestep_minutes
+        store.create_dataset('case', data=np.array(case_nums, dtype=np.int64))
+        store.create_dataset('timesteps', data=np.arange(num_timesteps, dtype=np.int64) * timestep_minutes * 60)
+
+        datasets = {}
+        for variable in variables:
+            dtype = first[variable][0].dtype
+            datasets[variable] = store.create_dataset(
+                variable,
+                shape=(len(case_nums), num_timesteps, height, width),
+                dtype=dtype,
+                chunks=(1, time_chunk, height, width),
+                fillvalue=-9999 if np.issubdtype(dtype, np.floating) else 0,
+                **options
+            )
+
+        for column in params.columns:
+            values = pd.to_numeric(params[column], errors='coerce').to_numpy(dtype=np.float64)
+            store.create_dataset(f'params/{column}', data=values)
+
+        for i, case_num in enumerate(case_nums):
+            arrays = first if i == 0 else load_case_arrays(case_num, base_dirs[case_num])
+            for variable in variables:
+                array_list = arrays.get(variable, [])
+                if len(array_list) != num_timesteps:
+                    print(f"  Warning: case {case_num} has {len(array_list)} {variable} timesteps, "
+                          f"expected {num_timesteps}; left as fill value")
+                    continue
+                datasets[variable][i] = np.stack(array_list)
+
+    print(f"Saved case store to {store_path}")
+
+def read_case_window(store_path: str,
+                     variable: str,
+                     cases=slice(None),
+                     times=slice(None)) -> np.ndarray:
+    """Read a (case, time, h, w) window of one variable; only the touched chunks are decompressed."""
+    with h5py.File(store_path, 'r') as store:
+        return store[variable][cases, times]
+
+def load_store_params(store_path: str) -> pd.DataFrame:
+    """Case parameters of the store as a DataFrame indexed like the case axis."""
+    with h5py.File(store_path, 'r') as store:
+        columns = {'run': store['case'][:]}
+        columns.update({column: store['params'][column][:] for column in store.get('params', {})})
+    return pd.DataFrame(columns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consolidate processed ELMFIRE cases into one HDF5 store")
+    parser.add_argument("--output_dir", default='./elmfire_sims', help="Processed cases directory")
+    parser.add_argument("--tracking", default='input_tracking.txt', help="Parameter tracking file")
+    parser.add_argument("--augmented_tracking", help="Also store the augmented cases listed in this file")
+    parser.add_argument("--augmented_dir", default=AUGMENTED_DIR, help="Augmented cases directory")
+    parser.add_argument("--store", default='elmfire_cases.h5', help="HDF5 store to write")
+    parser.add_argument("--time_chunk", type=int, default=16, help="Timesteps per chunk")
+    parser.add_argument("--codec", default='zstd', choices=['zstd', 'lz4', 'gzip', 'none'], help="Compression codec")
+    parser.add_argument("--level", type=int, default=5, help="Compression level")
+    args = parser.parse_args()
+
+    write_case_store(args.store, args.output_dir, args.tracking,
+                     time_chunk=args.time_chunk, codec=args.codec, level=args.level,
+                     augmented_tracking_file=args.augmented_tracking, augmented_dir=args.augmented_dir)
+    sys.exit(0)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Streaming per-channel normalization statistics for ELMFIRE outputs.
+
+RunningStats accumulates count, mean and variance (Welford, merged with Chan's
+parallel formula), min, max and a fixed-bin histogram for percentiles. The
+histogram bins are fixed per channel, so statistics from parallel workers or
+shards merge exactly: merging is the same as one pass over all the values.
+The postprocessor updates the statistics as each case is written and merges
+them into channel_stats.json next to the processed cases, so batches
+accumulate in one file. The file records which cases it contains, and cases
+already in it are not counted again when they are reprocessed. Fused workers
+run concurrently, so each writes its case to its own partial file in
+channel_stats_partial/, and combine_partial_stats merges those into
+channel_stats.json at the end of the campaign.
+
+Statistics are taken over burned cells (TOA != -9999) of the final state of
+each case.
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import numpy as np
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from running_moments import chan_merge, write_json_atomic
+
+NODATA_VALUE = -9999
+STATS_FILE = 'channel_stats.json'
+PARTIAL_DIR = 'channel_stats_partial'
+
+# fixed histogram bin edges per channel; values outside the edges are clipped into the end bins
+CHANNEL_BINS = {
+    'toa': np.linspace(0.0, 259200.0, 1025),
+    'flin': np.concatenate([[0.0], np.logspace(-2, 6, 1024)]),
+    'vs': np.concatenate([[0.0], np.logspace(-3, 3, 1024)]),
+}
+
+class RunningStats:
+    """Mergeable count/mean/variance/min/max and fixed-bin histogram of one channel."""
+
+    def __init__(self, bin_edges: np.ndarray):
+        self.bin_edges = np.asarray(bin_edges, dtype=np.float64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.hist = np.zeros(len(self.bin_edges) - 1, dtype=np.int64)
+
+    def update(self, values: np.ndarray):
+        """Add a batch of values (one case) to the statistics."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        batch = RunningStats(self.bin_edges)
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        clipped = np.clip(values, self.bin_edges[0], self.bin_edges[-1])
+        batch.hist = np.histogram(clipped, bins=self.bin_edges)[0].astype(np.int64)
+        self.merge(batch)
+
+    def merge(self, other: 'RunningStats'):
+        """Combine with statistics accumulated elsewhere (Chan et al. parallel update)."""
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Cannot merge statistics with different histogram bins")
+        if other.count == 0:
+            return
+        count, mean, m2 = chan_merge(self.count, self.mean, self.m2, other.count, other.mean, other.m2)
+        self.count, self.mean, self.m2 = count, float(mean), float(m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hist += other.hist
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / self.count)) if self.count else float('nan')
+
+    def percentile(self, q: float) -> float:
+        """Approximate percentile from the histogram (linear within a bin)."""
+        if self.count == 0:
+            return float('nan')
+        cumulative = np.cumsum(self.hist)
+        target = q / 100.0 * self.count
+        i = int(np.searchsorted(cumulative, target))
+        i = min(i, len(self.hist) - 1)
+        below = cumulative[i - 1] if i > 0 else 0
+        fraction = (target - below) / self.hist[i] if self.hist[i] else 0.0
+        value = self.bin_edges[i] + fraction * (self.bin_edges[i + 1] - self.bin_edges[i])
+        return float(np.clip(value, self.min, self.max))
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count, 'mean': self.mean, 'std': self.std, 'm2': self.m2,
+            'min': self.min if self.count else None, 'max': self.max if self.count else None,
+            'percentiles': {str(q): self.percentile(q) for q in (1, 5, 25, 50, 75, 95, 99)},
+            'bin_edges': self.bin_edges.tolist(), 'hist': self.hist.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'RunningStats':
+        stats = cls(np.array(d['bin_edges']))
+        stats.count = d['count']
+        stats.mean = d['mean']
+        stats.m2 = d['m2']
+        stats.min = d['min'] if d['min'] is not None else np.inf
+        stats.max = d['max'] if d['max'] is not None else -np.inf
+        stats.hist = np.array(d['hist'], dtype=np.int64)
+        return stats
+
+def new_channel_stats(channels: List[str] = None) -> Dict[str, RunningStats]:
+    channels = channels or list(CHANNEL_BINS)
+    return {channel: RunningStats(CHANNEL_BINS[channel]) for channel in channels}
+
+def update_channel_stats(stats: Dict[str, RunningStats], arrays_dict: Dict[str, List[np.ndarray]]):
+    """Update the statistics with the burned cells of the final timestep of one case."""
+    if 'toa' not in arrays_dict or not arrays_dict['toa']:
+        return
+    burned = arrays_dict['toa'][-1] != NODATA_VALUE
+    for channel, running in stats.items():
+        if arrays_dict.get(channel):
+            running.update(arrays_dict[channel][-1][burned])
+
+def save_channel_stats(stats: Dict[str, RunningStats], path: str, cases: List[str] = ()):
+    """Write the statistics of the given cases to path."""
+    write_json_atomic({'cases': sorted(set(cases)),
+                       'channels': {channel: running.to_dict() for channel, running in stats.items()}}, path)
+
+def read_stats_file(path: str) -> Tuple[Dict[str, RunningStats], List[str]]:
+    """Statistics and the names of the cases they contain."""
+    with open(path, 'r') as f:
+        d = json.load(f)
+    if 'channels' not in d:
+        # files written before the cases were recorded
+        return {channel: RunningStats.from_dict(c) for channel, c in d.items()}, []
+    return {channel: RunningStats.from_dict(c) for channel, c in d['channels'].items()}, d['cases']
+
+def load_channel_stats(path: str) -> Dict[str, RunningStats]:
+    return read_stats_file(path)[0]
+
+def stats_file_cases(path: str) -> List[str]:
+    """Names of the cases already in a statistics file (none if it does not exist)."""
+    return read_stats_file(path)[1] if os.path.exists(path) else []
+
+def merge_into_stats_file(stats: Dict[str, RunningStats], path: str, cases: List[str]) -> Dict[str, RunningStats]:
+    """Merge the statistics of cases into the file at path (created if missing) and return the combined statistics.
+
+    Each postprocessing call adds its cases to what is already there, so batches
+    accumulate. Cases already in the file would be counted twice, so they are
+    refused; callers leave them out (see stats_file_cases).
+    """
+    merged, included = read_stats_file(path) if os.path.exists(path) else ({}, [])
+    overlap = set(cases) & set(included)
+    if overlap:
+        raise ValueError(f"{path} already contains {sorted(overlap)}")
+    for channel, running in stats.items():
+        if channel in merged:
+            merged[channel].merge(running)
+        else:
+            merged[channel] = running
+    save_channel_stats(merged, path, list(included) + list(cases))
+    return merged
+
+def merge_stats_files(paths: List[str], output_path: str) -> Dict[str, RunningStats]:
+    """Merge statistics files from parallel workers or shards into one.
+
+    A file whose cases are all in the files before it (e.g. a case that was
+    processed again) is skipped; a file that only partly overlaps them cannot
+    be merged without counting cases twice and raises ValueError.
+    """
+    merged, included = {}, set()
+    for path in paths:
+        stats, cases = read_stats_file(path)
+        if cases and set(cases) <= included:
+            continue
+        if set(cases) & included:
+            raise ValueError(f"{path} overlaps the cases of the files before it")
+        included.update(cases)
+        for channel, running in stats.items():
+            if channel in merged:
+                merged[channel].merge(running)
+            else:
+                merged[channel] = running
+    save_channel_stats(merged, output_path, included)
+    return merged
+
+def partial_stats_path(output_base_dir: str, case_name: str) -> str:
+    """Partial statistics file of one case, written by a fused worker."""
+    return os.path.join(output_base_dir, PARTIAL_DIR, f"{case_name}.json")
+
+def combine_partial_stats(output_base_dir: str, stats_file: str = STATS_FILE) -> Dict[str, RunningStats]:
+    """Merge the partial files of fused workers into stats_file in output_base_dir and remove them."""
+    path = os.path.join(output_base_dir, stats_file)
+    partials = sorted(glob.glob(partial_stats_path(output_base_dir, '*')))
+    merged = merge_stats_files(([path] if os.path.exists(path) else []) + partials, path)
+    for partial in partials:
+        os.remove(partial)
+    return merged
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge or print per-channel statistics files")
+    parser.add_argument("files", nargs="*", help="channel_stats.json files")
+    parser.add_argument("--merge", help="Write the merged statistics to this file")
+    parser.add_argument("--combine", metavar="OUTPUT_DIR",
+                        help="Merge the partial files of fused workers into channel_stats.json in OUTPUT_DIR")
+    args = parser.parse_args()
+
+    if args.combine:
+        stats = combine_partial_stats(args.combine)
+    elif args.merge:
+        stats = merge_stats_files(args.files, args.merge)
+    else:
+        stats = load_channel_stats(args.files[0])
+    for channel, running in stats.items():
+        d = running.to_dict()
+        print(f"{channel}: count={d['count']} mean={d['mean']:.3f} std={d['std']:.3f} "
+              f"min={d['min']} max={d['max']} p50={d['percentiles']['50']:.3f}")
+    sys.exit(0)
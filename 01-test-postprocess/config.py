@@ -13,7 +13,7 @@ TIMESTEP_MINUTES = 15                    # Timestep interval in minutes
 MAX_TIME_HOURS = 72.0                    # Maximum simulation time in hours (72hr = 259200s)
 
 # Variables to Process
-# Available options: 'toa', 'burnscar', 'flin', 'vs'
+# Available options: 'toa', 'burnscar', 'flin', 'vs', 'vegetation', 'fire_front', 'scar'
 VARIABLES = [
     'toa',           # Time of arrival
     'burnscar',     # Binary burn scar (derived from TOA)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Symmetry-based augmentation of postprocessed ELMFIRE cases.
+
+The landscapes are spatially uniform, so rotating or reflecting the grid is
+equivalent to rotating the wind direction (wd) and aspect (asp). Each of the
+8 dihedral transforms is applied to every timestep of every variable in a
+case, and the recorded wd, asp and ignition point are rewritten to match.
+Augmented cases are saved to their own directory (elmfire_sims_augmented) and
+listed as new rows of an augmented tracking file. Their run numbers are
+reserved: transform index * AUGMENTED_RUN_OFFSET + source run, so they never
+collide with the runs a growing campaign hands out. Consumers (case_store,
+flat_dataset, shard_export) only read augmented cases when they are given the
+augmented tracking file.
+
+Directions are degrees clockwise from north, and row 0 of a raster is north.
+"""
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Tuple
+from elmfire_postprocessor import load_case_arrays, save_case_arrays
+
+AUGMENTED_DIR = './elmfire_sims_augmented'
+AUGMENTED_RUN_OFFSET = 10_000_000
+
+# (name, number of 90 degree counterclockwise rotations, left-right flip first)
+DIHEDRAL_TRANSFORMS = [
+    ('identity', 0, False),
+    ('rot90', 1, False),
+    ('rot180', 2, False),
+    ('rot270', 3, False),
+    ('flip', 0, True),
+    ('flip_rot90', 1, True),
+    ('flip_rot180', 2, True),
+    ('flip_rot270', 3, True),
+]
+
+def augmented_run(source_run: int, transform: str) -> int:
+    """Reserved run number of an augmented case."""
+    index = [name for name, _, _ in DIHEDRAL_TRANSFORMS].index(transform)
+    return index * AUGMENTED_RUN_OFFSET + int(source_run)
+
+def transform_array(array: np.ndarray, k: int, flip: bool) -> np.ndarray:
+    """Apply a dihedral transform to the last two (row, column) axes."""
+    if flip:
+        array = np.flip(array, axis=-1)
+    return np.rot90(array, k, axes=(-2, -1))
+
+def transform_direction(degrees: float, k: int, flip: bool) -> float:
+    """Direction (clockwise from north) after the same transform as transform_array."""
+    if flip:
+        degrees = -degrees
+    return float((degrees - 90.0 * k) % 360.0)
+
+def transform_point(x: float, y: float, k: int, flip: bool) -> Tuple[float, float]:
+    """Point relative to the domain center (x east, y north) after the transform."""
+    if flip:
+        x = -x
+    for _ in range(k % 4):
+        x, y = -y, x
+    return x, y
+
+def augment_case(arrays_dict: Dict[str, List[np.ndarray]],
+                 row: Dict,
+                 k: int,
+                 flip: bool) -> Tuple[Dict[str, List[np.ndarray]], Dict]:
+    """Transform all timesteps of a case and the matching tracking row."""
+    new_arrays = {
+        variable: [np.ascontiguousarray(transform_array(a, k, flip)) for a in array_list]
+        for variable, array_list in arrays_dict.items()
+    }
+
+    new_row = dict(row)
+    new_row['wd'] = round(transform_direction(row['wd'], k, flip), 1)
+    new_row['asp'] = int(round(transform_direction(row['asp'], k, flip))) % 360
+    new_row['xign'], new_row['yign'] = transform_point(row['xign'], row['yign'], k, flip)
+    return new_arrays, new_row
+
+def augment_all_cases(tracking_file: str = 'input_tracking.txt',
+                      output_base_dir: str = './elmfire_sims',
+                      augmented_tracking_file: str = 'input_tracking_augmented.txt',
+                      transforms: List[str] = None,
+                      timestep_minutes: int = 15,
+                      augmented_dir: str = AUGMENTED_DIR):
+    """Write augmented copies of every processed case and an augmented tracking file.
+
+    The augmented tracking file holds the original rows followed by one new row
+    per augmented case, with 'source_run' and 'transform' columns added. The
+    augmented arrays go to augmented_dir, never into output_base_dir.
+    Rerunning is idempotent: (source_run, transform) pairs already listed in an
+    existing augmented tracking file are kept and not written again, so only
+    new cases or transforms are added.
+    """
+    transforms = transforms or [name for name, _, _ in DIHEDRAL_TRANSFORMS if name != 'identity']
+    selected = [t for t in DIHEDRAL_TRANSFORMS if t[0] in transforms]
+
+    df = pd.read_csv(tracking_file)
+    processed = {int(d.name.split('_')[-1]) for d in Path(output_base_dir).glob('case_*') if d.is_dir()}
+    df = df[df['run'].isin(processed)]
+
+    previous = []
+    if Path(augmented_tracking_file).exists():
+        existing = pd.read_csv(augmented_tracking_file)
+        previous = existing[existing['transform'] != 'identity'].to_dict('records')
+    done = {(int(row['source_run']), row['transform']) for row in previous}
+
+    rows = [{**row, 'source_run': int(row['run']), 'transform': 'identity'} for row in df.to_dict('records')]
+    rows += previous
+
+    print(f"Augmenting {len(df)} cases with transforms: {[t[0] for t in selected]}"
+          f" ({len(done)} augmented cases already exist)")
+    for row in df.to_dict('records'):
+        todo = [t for t in selected if (int(row['run']), t[0]) not in done]
+        if not todo:
+            continue
+        arrays_dict = load_case_arrays(int(row['run']), output_base_dir)
+        for name, k, flip in todo:
+            new_arrays, new_row = augment_case(arrays_dict, row, k, flip)
+            run = augmented_run(row['run'], name)
+            new_row.update(run=run, source_run=int(row['run']), transform=name)
+            save_case_arrays(f"case_{run}", new_arrays, timestep_minutes, augmented_dir)
+            rows.append(new_row)
+
+    pd.DataFrame(rows).to_csv(augmented_tracking_file, index=False, float_format='%.1f')
+    print(f"Wrote {len(rows)} rows to {augmented_tracking_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dihedral augmentation of processed ELMFIRE cases")
+    parser.add_argument("--tracking", default='input_tracking.txt', help="Parameter tracking file")
+    parser.add_argument("--output_dir", default='./elmfire_sims', help="Processed cases directory")
+    parser.add_argument("--augmented_tracking", default='input_tracking_augmented.txt',
+                        help="Tracking file to write with the augmented rows")
+    parser.add_argument("--augmented_dir", default=AUGMENTED_DIR, help="Directory for the augmented cases")
+    parser.add_argument("--transforms", nargs="+", help="Subset of transforms (default: all 7 non-identity)")
+    args = parser.parse_args()
+
+    augment_all_cases(args.tracking, args.output_dir, args.augmented_tracking, args.transforms,
+                      augmented_dir=args.augmented_dir)
+    sys.exit(0)
@@ -3,26 +3,56 @@
 ELMFIRE Output Postprocessor - Simplified Version
 
 This script processes ELMFIRE simulation outputs to create timestep-based numpy arrays
-for time of arrival, burn scar, flame length intensity (flin), and spread rate (vs).
+for time of arrival, burn scar, flame length intensity (flin), and spread rate (vs),
+and the vegetation / fire_front / scar burn fraction channels of Burge et al.
 """
 
 import os
 import sys
 import glob
+import json
 import numpy as np
+import pandas as pd
 import rasterio
 import argparse
+from rasterio.windows import Window
 from pathlib import Path
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
+from channel_stats import (STATS_FILE, new_channel_stats, update_channel_stats, merge_into_stats_file,
+                           stats_file_cases)
 
-def load_tif_as_array(filepath: str) -> np.ndarray:
-    """Load a GeoTIFF file as a numpy array."""
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from raster_window import bbox_window, read_window
+
+def load_tif_as_array(filepath: str, window: Window = None, pad_nodata: bool = False) -> np.ndarray:
+    """Load a GeoTIFF file as a numpy array.
+
+    If window is given only that region is read, e.g. the burned extent from
+    case_summary.burned_window. Parts of the window outside the raster are
+    clipped, or filled with -9999 if pad_nodata is set.
+    """
     with rasterio.open(filepath) as src:
-        data = src.read(1)
+        data, _ = read_window(src, window, pad_nodata)
         if src.nodata is not None:
             data = np.where(data == src.nodata, -9999, data)
         return data
 
+def load_tif_in_domain(filepath: str, window: Window) -> np.ndarray:
+    """Load a GeoTIFF at full size but read only window (the burned extent); other cells are -9999.
+
+    Equal to load_tif_as_array(filepath) wherever a cell inside the window
+    burned, which is all the timestep expansion looks at.
+    """
+    with rasterio.open(filepath) as src:
+        array = np.full((src.height, src.width), -9999, dtype=src.dtypes[0])
+        data, window = read_window(src, window)
+        if src.nodata is not None:
+            data = np.where(data == src.nodata, -9999, data)
+        row0, col0 = int(window.row_off), int(window.col_off)
+        array[row0:row0 + data.shape[0], col0:col0 + data.shape[1]] = data
+        return array
+
 def burnscar_creation(toa_array: np.ndarray, timestep_seconds: float) -> np.ndarray:
     """Create burn scar array based on time of arrival."""
     burnscar = np.where(
@@ -51,11 +81,52 @@ def var_sim_from_toa(toa_array: np.ndarray,
         )
     return result
 
+def ignition_pixel(xign: float, yign: float, shape: Tuple[int, int], cellsize: float = 30.0) -> Tuple[int, int]:
+    """(row, col) of an ignition point given in meters from the domain center (row 0 is north)."""
+    height, width = shape
+    row = int(np.floor(height / 2 - yign / cellsize))
+    col = int(np.floor(width / 2 + xign / cellsize))
+    return row, col
+
+def crop_array(array: np.ndarray,
+               trim: int = 0,
+               center: Tuple[int, int] = None,
+               size: int = None) -> np.ndarray:
+    """Trim a border of `trim` cells, then optionally cut a size x size window around center.
+
+    center is a (row, col) in the untrimmed array. Parts of the window outside
+    the domain are filled with -9999 so the center stays in the middle.
+    """
+    if trim:
+        array = array[trim:array.shape[0] - trim, trim:array.shape[1] - trim]
+    if size is None:
+        return array
+
+    height, width = array.shape
+    row, col = (height // 2, width // 2) if center is None else (center[0] - trim, center[1] - trim)
+    row0, col0 = row - size // 2, col - size // 2
+    window = np.full((size, size), -9999, dtype=array.dtype)
+    r0, r1 = max(row0, 0), min(row0 + size, height)
+    c0, c1 = max(col0, 0), min(col0 + size, width)
+    if r0 < r1 and c0 < c1:
+        window[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = array[r0:r1, c0:c1]
+    return window
+
 def timesteps_from_toa_one_case(case_dir: str, 
                                variables: List[str] = ['toa', 'burnscar'],
                                timestep_minutes: int = 15,
-                               max_time_hours: float = 72.0) -> Dict[str, List[np.ndarray]]:
-    """Create timestep-based simulation arrays for one case."""
+                               max_time_hours: float = 72.0,
+                               trim: int = 0,
+                               crop_size: int = None,
+                               ignition: Tuple[float, float] = None,
+                               window: Window = None) -> Dict[str, List[np.ndarray]]:
+    """Create timestep-based simulation arrays for one case.
+
+    The rasters are trimmed / cropped (see crop_array) before the timestep
+    expansion; ignition is (xign, yign) in meters for an ignition-centered crop.
+    If window is the burned extent of the case (from its summary), only that
+    part of each raster is read.
+    """
     case_path = Path(case_dir)
     case_num = case_path.name.split('_')[-1]
     
@@ -69,43 +140,68 @@ def timesteps_from_toa_one_case(case_dir: str,
     
     # Load time of arrival (required for all variables)
     # print the toa_array
-    toa_array = load_tif_as_array(toa_files[0])
+    load = load_tif_as_array if window is None else lambda filepath: load_tif_in_domain(filepath, window)
+    toa_array = load(toa_files[0])
     
     # Load other variable arrays if needed
     variable_arrays = {'toa': toa_array}
     
     if 'flin' in variables and flin_files:
-        variable_arrays['flin'] = load_tif_as_array(flin_files[0])
+        variable_arrays['flin'] = load(flin_files[0])
     
     if 'vs' in variables and vs_files:
-        variable_arrays['vs'] = load_tif_as_array(vs_files[0])
+        variable_arrays['vs'] = load(vs_files[0])
+    
+    return timesteps_from_arrays(variable_arrays, variables, timestep_minutes, max_time_hours,
+                                 trim, crop_size, ignition, case_num)
+
+def timesteps_from_arrays(variable_arrays: Dict[str, np.ndarray],
+                          variables: List[str] = ['toa', 'burnscar'],
+                          timestep_minutes: int = 15,
+                          max_time_hours: float = 72.0,
+                          trim: int = 0,
+                          crop_size: int = None,
+                          ignition: Tuple[float, float] = None,
+                          case_num: str = '') -> Dict[str, List[np.ndarray]]:
+    """Timestep expansion of final rasters already in memory ('toa' plus optional 'flin'/'vs')."""
+    toa_array = variable_arrays['toa']
+    
+    # Crop before expanding to timesteps so discarded cells are never expanded
+    if trim or crop_size:
+        center = ignition_pixel(ignition[0], ignition[1], toa_array.shape) if ignition is not None else None
+        variable_arrays = {name: crop_array(array, trim, center, crop_size) for name, array in variable_arrays.items()}
+        toa_array = variable_arrays['toa']
     
     # Generate timesteps
     timestep_seconds = timestep_minutes * 60
     max_time_seconds = max_time_hours * 3600
     timesteps = np.arange(0, max_time_seconds + timestep_seconds, timestep_seconds)
     
+    # Burned mask for every timestep in one vectorized pass: (timesteps, h, w)
+    burned = (toa_array != -9999) & (toa_array <= timesteps[:, np.newaxis, np.newaxis])
+    
     # Process each variable
     results = {}
     
     for variable in variables:
-        results[variable] = []
+        if variable == 'burnscar':
+            stack = burned.astype(np.int8)
+        elif variable == 'scar':
+            # burn fraction channels (Burge et al.); cells burn entirely, so fractions are 0 or 1
+            stack = burned.astype(np.float32)
+        elif variable == 'vegetation':
+            stack = (~burned).astype(np.float32)
+        elif variable == 'fire_front':
+            # cells whose TOA falls in (t - dt, t]
+            stack = (burned & (toa_array > timesteps[:, np.newaxis, np.newaxis] - timestep_seconds)).astype(np.float32)
+        elif variable in variable_arrays:
+            stack = np.where(burned, variable_arrays[variable], -9999)
+        else:
+            print(f"Warning: Variable '{variable}' not available for case {case_num}")
+            results[variable] = []
+            continue
         
-        for ts in timesteps:
-            if variable == 'burnscar':
-                array = burnscar_creation(toa_array, ts)
-            elif variable in variable_arrays:
-                array = var_sim_from_toa(
-                    toa_array, 
-                    variable_arrays[variable], 
-                    ts, 
-                    variable
-                )
-            else:
-                print(f"Warning: Variable '{variable}' not available for case {case_num}")
-                continue
-            
-            results[variable].append(array)
+        results[variable] = list(stack)
     
     return results
 
@@ -133,15 +229,45 @@ def save_case_arrays(case_dir: str,
     
     print(f"  Saved {len([item for sublist in arrays_dict.values() for item in sublist])} files to {output_dir}")
 
+def load_case_arrays(case_num, output_base_dir: str = './elmfire_sims') -> Dict[str, List[np.ndarray]]:
+    """Load the arrays saved by save_case_arrays for one case, ordered by timestep."""
+    case_dir = Path(output_base_dir) / f"case_{case_num}"
+    if not case_dir.exists():
+        raise FileNotFoundError(f"No output directory found for case {case_num}")
+    
+    files = {}
+    for filepath in case_dir.glob(f"case_{case_num}_*.npy"):
+        variable, timestep = filepath.stem[len(f"case_{case_num}_"):].rsplit('_', 1)
+        files.setdefault(variable, []).append((int(timestep), filepath))
+    
+    return {variable: [np.load(fp) for _, fp in sorted(entries)] for variable, entries in files.items()}
+
 def create_sims_from_toa_all_cases(cases_dir: str = './cases',
                                   variables: List[str] = ['toa', 'burnscar'],
                                   timestep_minutes: int = 15,
                                   max_time_hours: float = 72.0,
-                                  output_base_dir: str = './elmfire_sims'):
-    """Process all cases and save to elmfire_sims."""
+                                  output_base_dir: str = './elmfire_sims',
+                                  stats_file: str = STATS_FILE,
+                                  trim: int = 0,
+                                  crop_size: int = None,
+                                  center_on_ignition: bool = False,
+                                  tracking_file: str = 'input_tracking.txt',
+                                  summary_file: str = None):
+    """Process all cases and save to elmfire_sims.
+
+    Per-channel statistics (toa, flin, vs over burned cells) are accumulated as
+    each case is written and merged into stats_file in output_base_dir; cases
+    the file already contains are reprocessed but not counted again.
+    With center_on_ignition, crop_size windows are centered on the xign/yign
+    of each run in tracking_file.
+    With summary_file (case_summaries.csv from 01-dataset/case_summary.py) only
+    the burned extent recorded for each run is read from its rasters.
+    """
     cases_path = Path(cases_dir)
     output_path = Path(output_base_dir)
     
+    if center_on_ignition and crop_size is None:
+        raise ValueError("center_on_ignition needs a crop_size")
     if not cases_path.exists():
         raise FileNotFoundError(f"Cases directory not found: {cases_dir}")
     
@@ -163,33 +289,78 @@ def create_sims_from_toa_all_cases(cases_dir: str = './cases',
     print(f"Output: {output_base_dir}")
     print("-" * 50)
     
+    ignitions = {}
+    if center_on_ignition:
+        tracking = pd.read_csv(tracking_file)
+        ignitions = {int(row.run): (row.xign, row.yign) for row in tracking.itertuples()}
+        print(f"Cropping {crop_size}x{crop_size} windows centered on the ignitions in {tracking_file}")
+    
+    windows = {}
+    if summary_file:
+        summaries = pd.read_csv(summary_file).drop_duplicates('run', keep='last')
+        windows = {int(row['run']): bbox_window(row) for _, row in summaries.iterrows()}
+        print(f"Reading the burned extents in {summary_file}")
+    
+    stats = new_channel_stats([v for v in variables if v in ('toa', 'flin', 'vs')])
+    included = set(stats_file_cases(str(output_path / stats_file))) if stats_file else set()
+    stats_cases = []
     success_count = 0
     for case_dir in case_dirs:
         try:
             print(f"Processing {case_dir.name}...")
+            if center_on_ignition and int(case_dir.name.split('_')[-1]) not in ignitions:
+                print(f"  Warning: {case_dir.name} is not in {tracking_file}, cropping around the domain center")
             
             # Generate arrays for this case
             arrays_dict = timesteps_from_toa_one_case(
                 str(case_dir), 
                 variables, 
                 timestep_minutes, 
-                max_time_hours
+                max_time_hours,
+                trim,
+                crop_size,
+                ignitions.get(int(case_dir.name.split('_')[-1])),
+                windows.get(int(case_dir.name.split('_')[-1]))
             )
             
             # Save arrays to files
             save_case_arrays(str(case_dir), arrays_dict, timestep_minutes, output_base_dir)
+            if case_dir.name not in included:
+                update_channel_stats(stats, arrays_dict)
+                stats_cases.append(case_dir.name)
             success_count += 1
             
         except Exception as e:
             print(f"  Error processing {case_dir.name}: {e}")
             continue
     
+    if stats_file:
+        merge_into_stats_file(stats, str(output_path / stats_file), stats_cases)
+    
     print("-" * 50)
     print(f"Processing complete! {success_count}/{len(case_dirs)} cases successful")
     print(f"Results saved to: {output_base_dir}")
 
-def verify_case_outputs(case_dir: str, timestep_minutes: int = 15, output_base_dir: str = './elmfire_sims'):
-    """Verify outputs for a single case."""
+def read_npy_header(filepath) -> Tuple[tuple, np.dtype]:
+    """Shape and dtype of a .npy file from its header, without reading the data."""
+    with open(filepath, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return shape, dtype
+
+def verify_case_outputs(case_dir: str,
+                        timestep_minutes: int = 15,
+                        output_base_dir: str = './elmfire_sims',
+                        variables: List[str] = None,
+                        max_time_hours: float = None):
+    """Verify outputs for a single case from the .npy headers only.
+
+    If variables / max_time_hours are given, missing variables and timesteps
+    are reported under "issues".
+    """
     case_path = Path(case_dir)
     case_num = case_path.name.split('_')[-1]
     npy_dir = Path(output_base_dir) / f"case_{case_num}"
@@ -203,53 +374,116 @@ def verify_case_outputs(case_dir: str, timestep_minutes: int = 15, output_base_d
         return f"No .npy files found for case {case_num}"
     
     # Group files by variable
-    variables = {}
+    timesteps_by_variable = {}
     shapes = set()
+    dtypes = {}
     
     for filepath in npy_files:
-        print(filepath)  # Debugging line to see file paths
         parts = filepath.stem.split('_')
         if len(parts) >= 4:
-            variable = parts[2]
-            timestep = int(parts[3])
-            
-            if variable not in variables:
-                variables[variable] = []
-            variables[variable].append(timestep)
+            # variable names may contain underscores (fire_front)
+            variable, timestep = filepath.stem[len(f"case_{case_num}_"):].rsplit('_', 1)
+            timesteps_by_variable.setdefault(variable, []).append(int(timestep))
             
-            # Check array shape
-            array = np.load(filepath)
-            shapes.add(array.shape)
+            # Check array shape and dtype
+            shape, dtype = read_npy_header(filepath)
+            shapes.add(shape)
+            dtypes.setdefault(variable, set()).add(str(dtype))
+    
+    issues = []
+    if len(shapes) > 1:
+        issues.append(f"inconsistent shapes {sorted(shapes)}")
+    issues += [f"{var} has mixed dtypes {sorted(d)}" for var, d in dtypes.items() if len(d) > 1]
+    if variables is not None:
+        issues += [f"missing variable {var}" for var in variables if var not in timesteps_by_variable]
+    if max_time_hours is not None:
+        expected = set(range(0, int(max_time_hours * 3600) + 1, timestep_minutes * 60))
+        for var, times in timesteps_by_variable.items():
+            missing = expected - set(times)
+            if missing:
+                issues.append(f"{var} missing {len(missing)} timesteps (first {min(missing)})")
     
     return {
         "case": case_num,
-        "variables": list(variables.keys()),
-        "file_counts": {var: len(times) for var, times in variables.items()},
+        "variables": list(timesteps_by_variable.keys()),
+        "file_counts": {var: len(times) for var, times in timesteps_by_variable.items()},
         "shapes": list(shapes),
-        "total_files": len(npy_files)
+        "dtypes": {var: sorted(d) for var, d in dtypes.items()},
+        "total_files": len(npy_files),
+        "issues": issues,
+        "ok": not issues
     }
 
+def verify_all_cases(output_base_dir: str = './elmfire_sims',
+                     variables: List[str] = None,
+                     timestep_minutes: int = 15,
+                     max_time_hours: float = 72.0,
+                     report_file: str = 'verify_report.json',
+                     workers: int = 16) -> Dict:
+    """Verify every processed case in parallel and write a JSON report."""
+    case_dirs = sorted((d for d in Path(output_base_dir).glob('case_*') if d.is_dir()),
+                       key=lambda d: int(d.name.split('_')[-1]))
+    
+    def verify(case_dir):
+        result = verify_case_outputs(str(case_dir), timestep_minutes, output_base_dir, variables, max_time_hours)
+        if isinstance(result, str):
+            result = {"case": case_dir.name.split('_')[-1], "issues": [result], "ok": False}
+        return result
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(verify, case_dirs))
+    
+    shapes = {tuple(shape) for r in results for shape in r.get("shapes", [])}
+    report = {
+        "output_base_dir": str(output_base_dir),
+        "num_cases": len(results),
+        "num_failed": sum(not r["ok"] for r in results),
+        "shapes": [list(shape) for shape in sorted(shapes)],
+        "cases": results
+    }
+    if len(shapes) > 1:
+        report["issues"] = [f"cases have different shapes {sorted(shapes)}"]
+    
+    if report_file:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=1, default=list)
+    print(f"Verified {report['num_cases']} cases: {report['num_failed']} with issues")
+    return report
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="ELMFIRE Output Postprocessor")
     parser.add_argument("--case_dir", type=str, help="Path to a single case directory")
-    parser.add_argument("--variables", nargs="+", help="Variables to process (e.g. toa burnscar flin vs)")
+    parser.add_argument("--variables", nargs="+", help="Variables to process (e.g. toa burnscar flin vs vegetation fire_front scar)")
     parser.add_argument("--verify", action="store_true", help="Verify existing outputs")
     parser.add_argument("--help_only", action="store_true", help="Show help and exit")
+    parser.add_argument("--trim", type=int, default=0, help="Border cells to trim (e.g. 1 for 128 -> 126)")
+    parser.add_argument("--crop_size", type=int, help="Size of a square crop window in cells")
+    parser.add_argument("--center_on_ignition", action="store_true",
+                        help="Center the crop window on xign/yign from input_tracking.txt")
+    parser.add_argument("--summary", help="Read only the burned extents recorded in this case_summaries.csv")
 
     args = parser.parse_args()
+    process_options = dict(trim=args.trim, crop_size=args.crop_size, center_on_ignition=args.center_on_ignition,
+                           summary_file=args.summary)
 
     if args.help_only:
         parser.print_help()
         sys.exit(0)
 
     if args.verify:
-        print("Verifying outputs...")
-        cases_path = Path('./cases')
-        case_dirs = sorted([d for d in cases_path.iterdir() if d.is_dir() and d.name.startswith('case_')])
-        for case_dir in case_dirs[:5]:
-            verification = verify_case_outputs(str(case_dir))
-            print(f"Case {case_dir.name}: {verification}")
-        sys.exit(0)
+        # check the variables the default processing writes unless others are given
+        variables = args.variables if args.variables else ['toa', 'burnscar', 'flin', 'vs']
+        print(f"Verifying outputs of variables: {variables}")
+        report = verify_all_cases(
+            output_base_dir='./elmfire_sims',
+            variables=variables,
+            timestep_minutes=15,
+            max_time_hours=72.0
+        )
+        for result in report["cases"]:
+            if not result["ok"]:
+                print(f"Case {result['case']}: {result['issues']}")
+        sys.exit(0 if report["num_failed"] == 0 else 1)
 
     # If a case_dir is specified
     if args.case_dir:
@@ -262,7 +496,8 @@ if __name__ == "__main__":
             args.case_dir,
             variables=variables,
             timestep_minutes=15,
-            max_time_hours=72.0
+            max_time_hours=72.0,
+            **process_options
         )
         print("Done.")
         sys.exit(0)
@@ -275,7 +510,8 @@ if __name__ == "__main__":
             variables=args.variables,
             timestep_minutes=15,
             max_time_hours=72.0,
-            output_base_dir='./elmfire_sims'
+            output_base_dir='./elmfire_sims',
+            **process_options
         )
         sys.exit(0)
 
@@ -285,6 +521,7 @@ if __name__ == "__main__":
         variables=['toa', 'burnscar', 'flin', 'vs'],
         timestep_minutes=15,
         max_time_hours=72.0,
-        output_base_dir='./elmfire_sims'
+        output_base_dir='./elmfire_sims',
+        **process_options
     )
     
\ No newline at end of file
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped flat export of postprocessed ELMFIRE cases for random-access training.
+
+Every variable is written as one large uncompressed .npy file of shape
+(total timesteps, h, w), with the timesteps of all cases laid end to end.
+An index JSON records each case's offset into that axis, its number of
+timesteps and its valid timestep range (from the first burned timestep to the
+last timestep where the fire still changes). FlatCaseDataset opens the files
+with np.load(mmap_mode='r'), so data-loader workers share pages through the OS
+cache and a (case, t) sample is a view with no decompression or unpickling.
+
+Files written for a prefix such as ./flat/elmfire:
+    elmfire_<variable>.npy     (total timesteps, h, w)
+    elmfire_index.json         variables, shape and per-case offsets
+"""
+
+import sys
+import json
+import argparse
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Tuple
+from elmfire_postprocessor import load_case_arrays
+from case_store import case_base_dirs
+from elmfire_augment import AUGMENTED_DIR
+
+def valid_timestep_range(arrays: List[np.ndarray], fill_value=-9999) -> Tuple[int, int]:
+    """(first, last + 1) timesteps where the fire exists and is still changing."""
+    first = next((t for t, a in enumerate(arrays) if np.any(a != fill_value)), len(arrays))
+    last = first
+    for t in range(first + 1, len(arrays)):
+        if not np.array_equal(arrays[t], arrays[t - 1]):
+            last = t
+    return first, min(last + 1, len(arrays))
+
+def export_flat_dataset(prefix: str = './flat/elmfire',
+                        output_base_dir: str = './elmfire_sims',
+                        variables: List[str] = None,
+                        timestep_minutes: int = 15,
+                        augmented_tracking_file: str = None,
+                        augmented_dir: str = AUGMENTED_DIR):
+    """Write all processed cases into per-variable memmappable .npy files plus an offset index.
+
+    The augmented cases are exported too when augmented_tracking_file is given.
+    """
+    base_dirs = case_base_dirs(output_base_dir, augmented_tracking_file, augmented_dir)
+    case_nums = list(base_dirs)
+    if not case_nums:
+        raise FileNotFoundError(f"No processed cases found in {output_base_dir}")
+
+    # first pass: timestep counts and valid ranges, so the files can be allocated once
+    cases = []
+    offset = 0
+    shape = dtypes = None
+    for case_num in case_nums:
+        arrays = load_case_arrays(case_num, base_dirs[case_num])
+        variables = variables or sorted(arrays)
+        if shape is None:
+            shape = arrays[variables[0]][0].shape
+            dtypes = {variable: arrays[variable][0].dtype for variable in variables}
+        num_timesteps = len(arrays[variables[0]])
+        reference = 'toa' if 'toa' in arrays else variables[0]
+        fill_value = 0 if reference == 'burnscar' else -9999
+        start, stop = valid_timestep_range(arrays[reference], fill_value)
+        cases.append({'case': case_num, 'offset': offset, 'num_timesteps': num_timesteps,
+                      'valid_start': start, 'valid_stop': stop})
+        offset += num_timesteps
+
+    prefix_path = Path(prefix)
+    prefix_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"Exporting {len(cases)} cases ({offset} timesteps) of {variables} to {prefix}_*.npy")
+
+    outputs = {
+        variable: np.lib.format.open_memmap(f"{prefix}_{variable}.npy", mode='w+',
+                                            dtype=dtypes[variable], shape=(offset,) + tuple(shape))
+        for variable in variables
+    }
+
+    # second pass: copy each case into its slice of the flat files
+    for entry in cases:
+        arrays = load_case_arrays(entry['case'], base_dirs[entry['case']])
+        for variable in variables:
+            outputs[variable][entry['offset']:entry['offset'] + entry['num_timesteps']] = np.stack(arrays[variable])
+
+    for memmap in outputs.values():
+        memmap.flush()
+    del outputs
+
+    index = {'variables': variables, 'shape': list(shape), 'timestep_minutes': timestep_minutes, 'cases': cases}
+    with open(f"{prefix}_index.json", 'w') as f:
+        json.dump(index, f, indent=1)
+    print(f"Saved index to {prefix}_index.json")
+
+class FlatCaseDataset:
+    """Random access to (case, t) samples of a flat export through read-only memory maps."""
+
+    def __init__(self, prefix: str, variables: List[str] = None, valid_only: bool = True):
+        with open(f"{prefix}_index.json", 'r') as f:
+            self.index = json.load(f)
+        self.variables = variables or self.index['variables']
+        self.arrays = {variable: np.load(f"{prefix}_{variable}.npy", mmap_mode='r') for variable in self.variables}
+        self.cases = {entry['case']: entry for entry in self.index['cases']}
+
+        # global row of every sample, restricted to the valid timestep ranges if requested
+        ranges = [(entry['offset'] + entry['valid_start'], entry['offset'] + entry['valid_stop']) if valid_only
+                  else (entry['offset'], entry['offset'] + entry['num_timesteps'])
+                  for entry in self.index['cases']]
+        self.rows = np.concatenate([np.arange(start, stop) for start, stop in ranges] or [np.array([], dtype=int)])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i: int) -> Dict[str, np.ndarray]:
+        row = self.rows[i]
+        return {variable: array[row] for variable, array in self.arrays.items()}
+
+    def sample(self, case_num: int, t: int) -> Dict[str, np.ndarray]:
+        """Arrays of one case at timestep t (views into the memory maps)."""
+        entry = self.cases[case_num]
+        if not 0 <= t < entry['num_timesteps']:
+            raise IndexError(f"Timestep {t} out of range for case {case_num}")
+        return {variable: array[entry['offset'] + t] for variable, array in self.arrays.items()}
+
+    def case(self, case_num: int) -> Dict[str, np.ndarray]:
+        """All timesteps of one case as (time, h, w) views."""
+        entry = self.cases[case_num]
+        rows = slice(entry['offset'], entry['offset'] + entry['num_timesteps'])
+        return {variable: array[rows] for variable, array in self.arrays.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export processed ELMFIRE cases as memory-mapped flat files")
+    parser.add_argument("--output_dir", default='./elmfire_sims', help="Processed cases directory")
+    parser.add_argument("--prefix", default='./flat/elmfire', help="Prefix of the flat files to write")
+    parser.add_argument("--variables", nargs="+", help="Variables to export (default: all)")
+    parser.add_argument("--augmented_tracking", help="Also export the augmented cases listed in this file")
+    parser.add_argument("--augmented_dir", default=AUGMENTED_DIR, help="Augmented cases directory")
+    args = parser.parse_args()
+
+    export_flat_dataset(args.prefix, args.output_dir, args.variables,
+                        augmented_tracking_file=args.augmented_tracking, augmented_dir=args.augmented_dir)
+    sys.exit(0)
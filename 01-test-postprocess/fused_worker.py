@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Fused postprocessing of one ELMFIRE run straight from its raw .bil outputs.
+
+Normally 01-run.sh converts every .bil to a DEFLATE-compressed GeoTIFF and
+elmfire_postprocessor.py rereads those TIFFs later. This worker is run right
+after ELMFIRE exits instead: it reads the .bil/.hdr rasters with numpy,
+expands them to timesteps in memory (timesteps_from_arrays), writes only the
+case arrays to elmfire_sims and deletes the raw outputs.
+
+Used by 0N-run.sh when FUSED_POSTPROCESS=1, in which case 01-run.sh skips the
+GeoTIFF conversion and leaves the .bil/.hdr files in ./outputs.
+"""
+
+import os
+import sys
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01-dataset'))
+
+from elmfire_postprocessor import timesteps_from_arrays, save_case_arrays
+from channel_stats import STATS_FILE, new_channel_stats, update_channel_stats, save_channel_stats, partial_stats_path
+
+# output file prefix of each variable used by the postprocessor
+BIL_VARIABLES = {'toa': 'time_of_arrival', 'flin': 'flin', 'vs': 'vs'}
+
+def read_bil_header(hdr_path: str) -> Dict[str, str]:
+    """Keys of an ESRI .hdr file, upper-cased."""
+    header = {}
+    with open(hdr_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2:
+                header[parts[0].upper()] = parts[1]
+    return header
+
+def read_bil(bil_path: str) -> np.ndarray:
+    """Read a single-band .bil raster with numpy, with nodata replaced by -9999."""
+    header = read_bil_header(os.path.splitext(bil_path)[0] + '.hdr')
+    nbits = int(header.get('NBITS', 32))
+    pixeltype = header.get('PIXELTYPE', 'FLOAT').upper()
+    kind = 'f' if pixeltype == 'FLOAT' else ('i' if pixeltype.startswith('SIGNED') else 'u')
+    byteorder = '>' if header.get('BYTEORDER', 'I').upper() == 'M' else '<'
+    dtype = np.dtype(f"{byteorder}{kind}{nbits // 8}")
+
+    data = np.fromfile(bil_path, dtype=dtype).reshape(int(header['NROWS']), int(header['NCOLS']))
+    data = data.astype(dtype.newbyteorder('='))
+    if 'NODATA' in header:
+        data = np.where(data == dtype.type(float(header['NODATA'])), -9999, data).astype(data.dtype)
+    return data
+
+def find_bil(outputs_dir: str, prefix: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(outputs_dir, f'{prefix}_*.bil')))
+
+def fused_postprocess(outputs_dir: str,
+                      case_name: str,
+                      variables: List[str] = ['toa', 'burnscar', 'flin', 'vs'],
+                      timestep_minutes: int = 15,
+                      max_time_hours: float = 72.0,
+                      output_base_dir: str = './elmfire_sims',
+                      keep_raw: bool = False,
+                      summary_file: str = None,
+                      preview_file: str = None,
+                      param_stats_file: str = None,
+                      tracking_file: str = 'input_tracking.txt',
+                      stats_file: str = STATS_FILE,
+                      trim: int = 0,
+                      crop_size: int = None,
+                      center_on_ignition: bool = False):
+    """Postprocess the raw outputs of one run into case arrays, then remove them.
+
+    Does the same work per case as create_sims_from_toa_all_cases: the same
+    trim / crop_size / center_on_ignition cropping (the ignition is the run's
+    xign/yign in tracking_file). Workers run concurrently, so the per-channel
+    statistics of the case go to its own partial file; channel_stats.py
+    --combine merges them into stats_file in output_base_dir.
+
+    If summary_file is given, the per-case summary (case_summary.py) is appended to it,
+    and if preview_file is given the raster previews (case_previews.py) are appended to it.
+    If param_stats_file is given, the run's parameters (from tracking_file) and fire area are
+    added to the running parameter statistics (param_stats.py).
+    """
+    if center_on_ignition and crop_size is None:
+        raise ValueError("center_on_ignition needs a crop_size")
+    variable_arrays = {}
+    for variable, prefix in BIL_VARIABLES.items():
+        if variable != 'toa' and variable not in variables:
+            continue
+        files = find_bil(outputs_dir, prefix)
+        if files:
+            # the last dump holds the final state of the run
+            variable_arrays[variable] = read_bil(files[-1])
+
+    if 'toa' not in variable_arrays:
+        raise FileNotFoundError(f"No time_of_arrival .bil files found in {outputs_dir}")
+
+    ignition = None
+    if center_on_ignition:
+        tracking = pd.read_csv(tracking_file).set_index('run')
+        row = tracking.loc[int(case_name.split('_')[-1])]
+        ignition = (row['xign'], row['yign'])
+
+    arrays_dict = timesteps_from_arrays(variable_arrays, variables, timestep_minutes, max_time_hours,
+                                        trim, crop_size, ignition, case_name.split('_')[-1])
+    save_case_arrays(case_name, arrays_dict, timestep_minutes, output_base_dir)
+    if stats_file:
+        stats = new_channel_stats([v for v in variables if v in ('toa', 'flin', 'vs')])
+        update_channel_stats(stats, arrays_dict)
+        partial = partial_stats_path(output_base_dir, case_name)
+        os.makedirs(os.path.dirname(partial), exist_ok=True)
+        save_channel_stats(stats, partial, [case_name])
+
+    if summary_file or preview_file or param_stats_file:
+        # summaries and previews use all raw rasters, so read flin/vs even if they are not processed
+        raw = {variable: read_bil(find_bil(outputs_dir, prefix)[-1]).astype(np.float64)
+               for variable, prefix in BIL_VARIABLES.items() if find_bil(outputs_dir, prefix)}
+    if summary_file or param_stats_file:
+        from case_summary import summarize_arrays, append_summaries
+        summary = summarize_arrays(case_name.split('_')[-1], raw['toa'], raw.get('flin'), raw.get('vs'))
+    if summary_file:
+        append_summaries([summary], summary_file)
+    if param_stats_file:
+        from param_stats import update_param_stats
+        update_param_stats({summary['run']: summary['burned_area']}, tracking_file, param_stats_file)
+    if preview_file:
+        from case_previews import previews_from_arrays, append_previews
+        append_previews(previews_from_arrays(case_name.split('_')[-1],
+                                             {BIL_VARIABLES[variable]: data for variable, data in raw.items()}),
+                        preview_file)
+
+    if not keep_raw:
+        for pattern in ('*.bil', '*.hdr', '*.csv'):
+            for filepath in glob.glob(os.path.join(outputs_dir, pattern)):
+                os.remove(filepath)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Postprocess raw ELMFIRE .bil outputs of one run")
+    parser.add_argument("outputs_dir", help="ELMFIRE outputs directory of the run")
+    parser.add_argument("--case", required=True, help="Case name, e.g. case_12")
+    parser.add_argument("--output_dir", default='./elmfire_sims', help="Processed cases directory")
+    parser.add_argument("--variables", nargs="+", default=['toa', 'burnscar', 'flin', 'vs'],
+                        help="Variables to process")
+    parser.add_argument("--timestep", type=int, default=15, help="Timestep in minutes")
+    parser.add_argument("--max_time", type=float, default=72.0, help="Max time in hours")
+    parser.add_argument("--keep_raw", action="store_true", help="Do not delete the .bil/.hdr outputs")
+    parser.add_argument("--summary", help="Append the per-case summary to this CSV")
+    parser.add_argument("--previews", help="Append the raster previews to this cache")
+    parser.add_argument("--param_stats", help="Add the run to these running parameter statistics")
+    parser.add_argument("--tracking", default='input_tracking.txt', help="Tracking file with the run parameters")
+    parser.add_argument("--trim", type=int, default=0, help="Border cells to trim (e.g. 1 for 128 -> 126)")
+    parser.add_argument("--crop_size", type=int, help="Size of a square crop window in cells")
+    parser.add_argument("--center_on_ignition", action="store_true",
+                        help="Center the crop window on xign/yign from the tracking file")
+    args = parser.parse_args()
+
+    fused_postprocess(args.outputs_dir, args.case, args.variables, args.timestep, args.max_time,
+                      args.output_dir, args.keep_raw, args.summary, args.previews, args.param_stats,
+                      args.tracking, trim=args.trim, crop_size=args.crop_size,
+                      center_on_ignition=args.center_on_ignition)
+    sys.exit(0)
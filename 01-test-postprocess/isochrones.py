@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Opt-in isochrone generation for a whole campaign.
+
+Replaces the per-run `gdal_contour -i 3600` call of 01-run.sh (now only run
+with GDAL_ISOCHRONES=1). Contours of the time of arrival are computed in
+process with vectorized marching squares, for all cases in one batch, and
+written to a single Parquet table per campaign with one row per
+(case, level): the contour as a WKT MULTILINESTRING of marching-squares
+segments in map coordinates (meters, domain centered on 0,0).
+
+The final TOA of a case is read from its time_of_arrival GeoTIFF in ./cases,
+or, for fused campaigns that never write GeoTIFFs, from the last toa array of
+the case in ./elmfire_sims (coordinates are then centered on that array,
+which differs from the domain if it was cropped). Cases are contoured in
+parallel worker processes.
+
+Unburned cells (TOA = -9999) are treated as later than every level, so the
+contours close along the fire boundary.
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from elmfire_postprocessor import load_tif_as_array
+
+# edge pairs crossed by the contour for each corner code tl*8 + tr*4 + br*2 + bl
+# (edges: 0 top, 1 right, 2 bottom, 3 left); saddles 5 and 10 give two segments
+SEGMENT_TABLE = {
+    1: [(3, 2)], 2: [(2, 1)], 3: [(3, 1)], 4: [(0, 1)], 5: [(3, 0), (2, 1)],
+    6: [(0, 2)], 7: [(3, 0)], 8: [(3, 0)], 9: [(0, 2)], 10: [(0, 1), (3, 2)],
+    11: [(0, 1)], 12: [(3, 1)], 13: [(2, 1)], 14: [(3, 2)],
+}
+
+def marching_squares(field: np.ndarray, level: float) -> np.ndarray:
+    """(n, 2, 2) array of contour segments [[row, col], [row, col]] at one level, in cell-center units."""
+    tl, tr = field[:-1, :-1], field[:-1, 1:]
+    bl, br = field[1:, :-1], field[1:, 1:]
+    code = ((tl >= level) * 8 + (tr >= level) * 4 + (br >= level) * 2 + (bl >= level)).astype(np.int8)
+    rows, cols = np.indices(code.shape)
+
+    def crossing(v0, v1):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (level - v0) / (v1 - v0)
+        return np.clip(np.nan_to_num(t, nan=0.5), 0.0, 1.0)
+
+    # crossing point on each edge of every cell as (row, col)
+    edges = [
+        np.stack([rows, cols + crossing(tl, tr)], axis=-1),          # top
+        np.stack([rows + crossing(tr, br), cols + 1], axis=-1),      # right
+        np.stack([rows + 1, cols + crossing(bl, br)], axis=-1),      # bottom
+        np.stack([rows + crossing(tl, bl), cols], axis=-1),          # left
+    ]
+
+    segments = []
+    for case, pairs in SEGMENT_TABLE.items():
+        mask = code == case
+        if not mask.any():
+            continue
+        for a, b in pairs:
+            segments.append(np.stack([edges[a][mask], edges[b][mask]], axis=1))
+    return np.concatenate(segments) if segments else np.zeros((0, 2, 2))
+
+def toa_isochrones(toa: np.ndarray, interval: float = 3600.0,
+                   cellsize: float = 30.0) -> List[Tuple[float, np.ndarray]]:
+    """(level, segments in map coordinates) for every multiple of interval up to the last arrival time."""
+    burned = toa != -9999
+    if not burned.any():
+        return []
+    max_toa = float(toa[burned].max())
+    field = np.where(burned, toa, max_toa + interval).astype(np.float64)
+
+    height, width = toa.shape
+    contours = []
+    for level in interval * np.arange(1, np.floor(max_toa / interval) + 1):
+        # contour of the burned region at `level` is where TOA crosses it; >= level is unburned
+        segments = marching_squares(field, level)
+        if len(segments) == 0:
+            continue
+        x = (segments[..., 1] + 0.5 - width / 2) * cellsize
+        y = (height / 2 - segments[..., 0] - 0.5) * cellsize
+        contours.append((float(level), np.stack([x, y], axis=-1)))
+    return contours
+
+def segments_to_wkt(segments: np.ndarray) -> str:
+    lines = ", ".join(f"({x0:.2f} {y0:.2f}, {x1:.2f} {y1:.2f})" for (x0, y0), (x1, y1) in segments)
+    return f"MULTILINESTRING ({lines})"
+
+def case_number(path: Path) -> int:
+    return int(path.name.split('_')[-1])
+
+def final_toa_sources(cases_dir: str = './cases', sims_dir: str = None) -> Dict[int, str]:
+    """Final TOA file of every case: its GeoTIFF in cases_dir, else its last toa array in sims_dir.
+
+    sims_dir is only read when it is given (fused campaigns have no GeoTIFFs).
+    """
+    sources = {}
+    for root, pattern in ((sims_dir, 'case_*_toa_*.npy'), (cases_dir, 'time_of_arrival_*.tif')):
+        if root is None or not Path(root).is_dir():
+            continue
+        for case_dir in Path(root).iterdir():
+            if not (case_dir.is_dir() and case_dir.name.startswith('case_')):
+                continue
+            # the last timestep (npy) or the last time_of_arrival raster holds every arrival time
+            files = sorted(case_dir.glob(pattern), key=lambda f: int(f.stem.split('_')[-1]))
+            if files:
+                sources[case_number(case_dir)] = str(files[-1])
+    return dict(sorted(sources.items()))
+
+def load_final_toa(filepath: str) -> np.ndarray:
+    return np.load(filepath) if filepath.endswith('.npy') else load_tif_as_array(filepath)
+
+def isochrones_for_case(case: int, filepath: str, interval: float = 3600.0,
+                        cellsize: float = 30.0) -> List[dict]:
+    """Table rows of one case (runs in a worker process)."""
+    return [{'case': case, 'toa_seconds': level, 'num_segments': len(segments),
+             'geometry': segments_to_wkt(segments)}
+            for level, segments in toa_isochrones(load_final_toa(filepath), interval, cellsize)]
+
+def isochrones_for_cases(cases_dir: str = './cases',
+                         output_file: str = 'isochrones.parquet',
+                         interval: float = 3600.0,
+                         cellsize: float = 30.0,
+                         sims_dir: str = None,
+                         workers: int = None) -> pd.DataFrame:
+    """Isochrones of every case in cases_dir (and sims_dir if given), written to one Parquet table."""
+    sources = final_toa_sources(cases_dir, sims_dir)
+    if not sources:
+        searched = f"{cases_dir} or {sims_dir}" if sims_dir else cases_dir
+        print(f"Warning: no time of arrival found in {searched}, writing an empty table")
+
+    rows = []
+    if sources:
+        workers = workers or min(len(sources), os.cpu_count())
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(sources) // (4 * workers))
+            for case_rows in pool.map(isochrones_for_case, sources.keys(), sources.values(),
+                                      [interval] * len(sources), [cellsize] * len(sources), chunksize=chunksize):
+                rows.extend(case_rows)
+
+    df = pd.DataFrame(rows, columns=['case', 'toa_seconds', 'num_segments', 'geometry'])
+    df.to_parquet(output_file, index=False)
+    print(f"Wrote {len(df)} isochrones of {len(sources)} cases to {output_file}")
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute TOA isochrones of all cases into one Parquet table")
+    parser.add_argument("--cases_dir", default='./cases', help="Directory with case_# subdirectories")
+    parser.add_argument("--sims_dir",
+                        help="Processed arrays used for cases without GeoTIFFs (fused campaigns, e.g. ./elmfire_sims)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--out", default='isochrones.parquet', help="Parquet file to write")
+    parser.add_argument("--interval", type=float, default=3600.0, help="Contour interval in seconds")
+    parser.add_argument("--cellsize", type=float, default=30.0, help="Cell size in meters")
+    args = parser.parse_args()
+
+    isochrones_for_cases(args.cases_dir, args.out, args.interval, args.cellsize, args.sims_dir, args.workers)
+    sys.exit(0)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Sharded tar export of postprocessed ELMFIRE cases for streaming training.
+
+Samples are written into fixed-size tar shards (WebDataset layout): each
+sample is one (case, timestep) pair stored as members named
+<case>_<timestep>.<variable>.npy, with all members of a sample next to each
+other. The samples of several cases are interleaved at random while writing,
+so consecutive samples come from different cases. Every shard gets an index
+JSON listing its samples and the byte offset and size of each member, so a
+shard can also be read at random without scanning it. iterate_shards streams the shards sequentially through a shuffle
+buffer, which turns millions of small random reads into large sequential ones.
+
+Files written to the shard directory:
+    shard_000000.tar, shard_000000.json, ...
+"""
+
+import io
+import sys
+import json
+import random
+import tarfile
+import argparse
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterator, List
+from elmfire_postprocessor import load_case_arrays
+from case_store import case_base_dirs
+from elmfire_augment import AUGMENTED_DIR
+
+def serialize_array(array: np.ndarray) -> bytes:
+    """Array as the bytes of a .npy file."""
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+def deserialize_array(data: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+class ShardWriter:
+    """Write samples into tar shards of at most shard_bytes each."""
+
+    def __init__(self, shard_dir: str, shard_bytes: int = 1 << 30):
+        self.shard_dir = Path(shard_dir)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_bytes = shard_bytes
+        self.shard_num = -1
+        self.tar = None
+        self.index = None
+        self.size = 0
+
+    def _open_next(self):
+        self.close()
+        self.shard_num += 1
+        self.tar = tarfile.open(self.shard_dir / f"shard_{self.shard_num:06d}.tar", 'w')
+        self.index = {'samples': []}
+        self.size = 0
+
+    def write(self, key: str, arrays: Dict[str, np.ndarray]):
+        members = {variable: serialize_array(array) for variable, array in arrays.items()}
+        sample_bytes = sum(len(data) + 1024 for data in members.values())
+        if self.tar is None or (self.size > 0 and self.size + sample_bytes > self.shard_bytes):
+            self._open_next()
+
+        entry = {'key': key, 'members': {}}
+        for variable, data in members.items():
+            info = tarfile.TarInfo(f"{key}.{variable}.npy")
+            info.size = len(data)
+            self.tar.addfile(info, io.BytesIO(data))
+            # offset of the member data: tar.offset is now past the data and its block padding
+            entry['members'][variable] = [self.tar.offset - tarfile.BLOCKSIZE * ((len(data) + 511) // 512), len(data)]
+        self.index['samples'].append(entry)
+        self.size += sample_bytes
+
+    def close(self):
+        if self.tar is None:
+            return
+        self.tar.close()
+        with open(self.shard_dir / f"shard_{self.shard_num:06d}.json", 'w') as f:
+            json.dump(self.index, f)
+        self.tar = None
+
+def export_shards(shard_dir: str = './shards',
+                  output_base_dir: str = './elmfire_sims',
+                  variables: List[str] = None,
+                  shard_bytes: int = 1 << 30,
+                  seed: int = 0,
+                  augmented_tracking_file: str = None,
+                  augmented_dir: str = AUGMENTED_DIR,
+                  interleave: int = 32):
+    """Write every (case, timestep) sample of the processed cases into tar shards.
+
+    Cases are taken in shuffled order, interleave of them are kept open at a
+    time, and each sample is drawn from a random open case. Neighbouring
+    samples in a shard therefore come from many cases, not from the ~289
+    timesteps of a single one, so the shuffle buffer of iterate_shards mixes
+    cases. The augmented cases are exported too when augmented_tracking_file is
+    given.
+    """
+    base_dirs = case_base_dirs(output_base_dir, augmented_tracking_file, augmented_dir)
+    case_nums = list(base_dirs)
+    if not case_nums:
+        raise FileNotFoundError(f"No processed cases found in {output_base_dir}")
+    rng = random.Random(seed)
+    rng.shuffle(case_nums)
+    pending = iter(case_nums)
+
+    def open_case():
+        case_num = next(pending, None)
+        if case_num is None:
+            return None
+        arrays = load_case_arrays(case_num, base_dirs[case_num])
+        case_variables = variables or sorted(arrays)
+        return {'case_num': case_num, 'arrays': arrays, 'variables': case_variables,
+                'num_steps': len(arrays[case_variables[0]]), 't': 0}
+
+    open_cases = [case for case in (open_case() for _ in range(max(interleave, 1))) if case is not None]
+    writer = ShardWriter(shard_dir, shard_bytes)
+    num_samples = 0
+    while open_cases:
+        i = rng.randrange(len(open_cases))
+        case = open_cases[i]
+        if case['t'] < case['num_steps']:
+            t = case['t']
+            writer.write(f"{case['case_num']}_{t}",
+                         {variable: case['arrays'][variable][t] for variable in case['variables']})
+            case['t'] += 1
+            num_samples += 1
+        if case['t'] >= case['num_steps']:
+            # replace the finished case with the next one, or drop its slot at the end
+            next_case = open_case()
+            if next_case is None:
+                open_cases[i] = open_cases[-1]
+                open_cases.pop()
+            else:
+                open_cases[i] = next_case
+    writer.close()
+    print(f"Wrote {num_samples} samples from {len(case_nums)} cases to {writer.shard_num + 1} shards in {shard_dir}")
+
+def read_shard(shard_path: str) -> Iterator[Dict]:
+    """Stream the samples of one shard in order, reading it sequentially."""
+    sample = None
+    with tarfile.open(shard_path, 'r|') as tar:
+        for member in tar:
+            key, variable, _ = member.name.rsplit('.', 2)
+            if sample is not None and sample['key'] != key:
+                yield sample
+                sample = None
+            if sample is None:
+                sample = {'key': key}
+            sample[variable] = deserialize_array(tar.extractfile(member).read())
+    if sample is not None:
+        yield sample
+
+def read_sample(shard_path: str, key: str) -> Dict:
+    """Read one sample of a shard using its index, without scanning the tar."""
+    with open(Path(shard_path).with_suffix('.json'), 'r') as f:
+        entry = next(s for s in json.load(f)['samples'] if s['key'] == key)
+    sample = {'key': key}
+    with open(shard_path, 'rb') as f:
+        for variable, (offset, size) in entry['members'].items():
+            f.seek(offset)
+            sample[variable] = deserialize_array(f.read(size))
+    return sample
+
+def iterate_shards(shard_dir: str,
+                   buffer_size: int = 1000,
+                   seed: int = None,
+                   shards: List[str] = None) -> Iterator[Dict]:
+    """Stream samples from all shards in random shard order through a shuffle buffer."""
+    shards = shards or sorted(str(p) for p in Path(shard_dir).glob('shard_*.tar'))
+    rng = random.Random(seed)
+    shards = list(shards)
+    rng.shuffle(shards)
+
+    buffer = []
+    for shard in shards:
+        for sample in read_shard(shard):
+            if len(buffer) < buffer_size:
+                buffer.append(sample)
+                continue
+            i = rng.randrange(buffer_size)
+            yield buffer[i]
+            buffer[i] = sample
+    rng.shuffle(buffer)
+    yield from buffer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export processed ELMFIRE cases as tar shards")
+    parser.add_argument("--output_dir", default='./elmfire_sims', help="Processed cases directory")
+    parser.add_argument("--shard_dir", default='./shards', help="Directory to write the shards to")
+    parser.add_argument("--variables", nargs="+", help="Variables to export (default: all)")
+    parser.add_argument("--shard_mb", type=int, default=1024, help="Target shard size in MB")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the case order")
+    parser.add_argument("--interleave", type=int, default=32,
+                        help="Number of cases whose samples are interleaved while writing")
+    parser.add_argument("--augmented_tracking", help="Also export the augmented cases listed in this file")
+    parser.add_argument("--augmented_dir", default=AUGMENTED_DIR, help="Augmented cases directory")
+    args = parser.parse_args()
+
+    export_shards(args.shard_dir, args.output_dir, args.variables, args.shard_mb << 20, args.seed,
+                  args.augmented_tracking, args.augmented_dir, args.interleave)
+    sys.exit(0)
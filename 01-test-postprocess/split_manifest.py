@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Deterministic train/val/test split manifest for ELMFIRE cases.
+
+Related cases are kept in one split: cases of one parameter draw (the fires
+of a packed or translated run differ only in xign/yign) and the augmented
+copies of a case (source_run in input_tracking_augmented.txt) form a group
+named by its smallest source run. When the augmented file exists, the cases
+are the union of both files, so runs added to input_tracking.txt after the
+augmentation are not dropped. Each group is
+ordered by a hash of (campaign seed, group id), so its position does not
+depend on which other cases exist. Without stratification the hash
+alone picks the split (80:10:10 by default). With stratification (by fuel
+model and fire-area bin) the cases of each stratum are assigned in hash
+order to the split that is furthest below its target fraction, so every
+stratum follows the split fractions.
+
+The manifest is a small CSV (run, group, split, stratum). When it already exists,
+the recorded assignments are kept and only new cases are assigned, so splits
+stay stable as campaigns grow incrementally.
+"""
+
+import os
+import sys
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from tracking_columns import TRACKING_COLUMNS
+
+SPLITS = ['train', 'val', 'test']
+SPLIT_FRACTIONS = (0.8, 0.1, 0.1)
+MANIFEST_FILE = 'split_manifest.csv'
+
+# fire-area bin edges in acres
+FIREAREA_BINS = [0.0, 10.0, 100.0, 1000.0, np.inf]
+
+def case_hash(seed: int, case_id: int) -> float:
+    """Uniform value in [0, 1) from a hash of (campaign seed, case id)."""
+    digest = hashlib.sha256(f"{seed}:{case_id}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2.0 ** 64
+
+def hash_split(u: float, fractions=SPLIT_FRACTIONS) -> str:
+    return SPLITS[min(int(np.searchsorted(np.cumsum(fractions), u, side='right')), len(SPLITS) - 1)]
+
+def case_strata(df: pd.DataFrame, stratify: List[str]) -> pd.Series:
+    """Stratum label of every case, e.g. 'fuel=102|area=1'."""
+    labels = []
+    for column in stratify:
+        if column == 'firearea':
+            if 'firearea' not in df:
+                print("No firearea column, not stratifying by fire area")
+                continue
+            bins = np.digitize(df['firearea'].fillna(0).to_numpy(), FIREAREA_BINS[1:-1])
+            labels.append(pd.Series([f"area={b}" for b in bins], index=df.index))
+        else:
+            labels.append(f"{column}=" + df[column].astype(str))
+    if not labels:
+        return pd.Series('all', index=df.index)
+    strata = labels[0]
+    for label in labels[1:]:
+        strata = strata + '|' + label
+    return strata
+
+def assign_stratum(new_cases: List[float], counts: Dict[str, int], fractions=SPLIT_FRACTIONS,
+                   sizes: List[int] = None) -> List[str]:
+    """Assign new groups (given by their hash values, in hash order) to the most underfilled split.
+
+    sizes are the number of cases in each group (default 1); counts are in cases.
+    """
+    splits = []
+    for u, size in zip(new_cases, sizes or [1] * len(new_cases)):
+        total = sum(counts.values()) + size
+        deficits = [fraction * total - counts[split] for split, fraction in zip(SPLITS, fractions)]
+        best = max(deficits)
+        # ties go to the split the hash alone would pick, then to the earlier split
+        candidates = [split for split, d in zip(SPLITS, deficits) if np.isclose(d, best)]
+        split = hash_split(u, fractions) if hash_split(u, fractions) in candidates else candidates[0]
+        counts[split] += size
+        splits.append(split)
+    return splits
+
+def case_groups(df: pd.DataFrame) -> pd.Series:
+    """Group id of every case: the smallest source run of its parameter draw.
+
+    Augmented copies map to their source_run. Source cases with identical
+    parameters apart from the ignition point come from one draw (packed or
+    translated runs); if the table lacks parameter columns, each source run
+    is its own group.
+    """
+    source = (df['source_run'] if 'source_run' in df else df['run']).astype(int)
+    draw_columns = [c for c in TRACKING_COLUMNS if c not in ('xign', 'yign')]
+    group_of_source = {}
+    if all(c in df for c in draw_columns):
+        originals = df[df['run'].astype(int) == source]
+        draw = originals[draw_columns].astype(str).agg('|'.join, axis=1)
+        first_run = originals['run'].astype(int).groupby(draw).transform('min')
+        group_of_source = dict(zip(originals['run'].astype(int), first_run))
+    return source.map(lambda run: group_of_source.get(run, run)).astype(int)
+
+def augmented_tracking_path(tracking_file: str) -> Path:
+    """input_tracking.txt -> input_tracking_augmented.txt (written by elmfire_augment.py)."""
+    path = Path(tracking_file)
+    return path.with_name(f"{path.stem}_augmented{path.suffix}")
+
+def read_cases(tracking_file: str = 'input_tracking.txt') -> pd.DataFrame:
+    """Cases of the tracking file plus the augmented cases of its augmented version, if it exists.
+
+    Rows of input_tracking.txt take precedence (e.g. a firearea backfilled
+    after the augmentation), and runs the augmented snapshot does not know
+    yet are their own source_run.
+    """
+    df = pd.read_csv(tracking_file)
+    augmented = augmented_tracking_path(tracking_file)
+    if augmented.exists():
+        print(f"Adding the augmented cases in {augmented}")
+        df = pd.concat([pd.read_csv(augmented), df], ignore_index=True)
+    df = df.drop_duplicates('run', keep='last').reset_index(drop=True)
+    df['run'] = df['run'].astype(int)
+    if 'source_run' in df:
+        df['source_run'] = df['source_run'].fillna(df['run']).astype(int)
+    return df
+
+def build_split_manifest(tracking_file: str = 'input_tracking.txt',
+                         manifest_file: str = MANIFEST_FILE,
+                         seed: int = 0,
+                         stratify: List[str] = None,
+                         fractions=SPLIT_FRACTIONS) -> pd.DataFrame:
+    """Assign every case of the tracking file (and its augmented version) to a split and write the manifest."""
+    df = read_cases(tracking_file)
+    df['group'] = case_groups(df)
+    df['stratum'] = case_strata(df, stratify or [])
+    group_hash = {group: case_hash(seed, group) for group in df['group'].unique()}
+
+    if Path(manifest_file).exists():
+        existing = pd.read_csv(manifest_file)
+        existing = existing[existing['run'].isin(df['run'])]
+    else:
+        existing = pd.DataFrame(columns=['run', 'group', 'split', 'stratum'])
+    assigned = dict(zip(existing['run'].astype(int), existing['split']))
+
+    # new cases of a group that already has a split join it
+    group_of_run = dict(zip(df['run'], df['group']))
+    group_split = {}
+    for run, split in assigned.items():
+        group_split.setdefault(group_of_run[run], split)
+    new = df[~df['run'].isin(assigned)]
+    joined = new[new['group'].isin(group_split)]
+    assigned.update({run: group_split[group] for run, group in zip(joined['run'], joined['group'])})
+
+    # new groups, in hash order; a group's stratum is the stratum of its smallest run
+    new = new[~new['group'].isin(group_split)]
+    groups = new.sort_values('run').groupby('group').agg(stratum=('stratum', 'first'), size=('run', 'size'))
+    groups['hash'] = [group_hash[group] for group in groups.index]
+    groups = groups.sort_values('hash')
+    if stratify:
+        for stratum, in_stratum in groups.groupby('stratum'):
+            existing_splits = existing[existing['stratum'] == stratum]['split']
+            counts = {split: int((existing_splits == split).sum()) for split in SPLITS}
+            group_split.update(zip(in_stratum.index, assign_stratum(list(in_stratum['hash']), counts, fractions,
+                                                                     list(in_stratum['size']))))
+    else:
+        group_split.update({group: hash_split(u, fractions) for group, u in zip(groups.index, groups['hash'])})
+    assigned.update({run: group_split[group] for run, group in zip(new['run'], new['group'])})
+
+    df['split'] = df['run'].map(assigned)
+    manifest = df[['run', 'group', 'split', 'stratum']].sort_values('run')
+    manifest.to_csv(manifest_file, index=False)
+
+    print(f"Assigned {len(df) - len(existing)} new cases ({len(manifest)} total, "
+          f"{manifest['group'].nunique()} groups) to {manifest_file}")
+    print(pd.crosstab(manifest['stratum'], manifest['split']).reindex(columns=SPLITS, fill_value=0))
+    return manifest
+
+def load_split(split: str, manifest_file: str = MANIFEST_FILE) -> List[int]:
+    """Run numbers of one split."""
+    manifest = pd.read_csv(manifest_file)
+    return sorted(manifest.loc[manifest['split'] == split, 'run'].astype(int))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the train/val/test split manifest")
+    parser.add_argument("--tracking", default='input_tracking.txt', help="Parameter tracking file")
+    parser.add_argument("--manifest", default=MANIFEST_FILE, help="Manifest CSV to write")
+    parser.add_argument("--seed", type=int, default=0, help="Campaign seed")
+    parser.add_argument("--stratify", nargs="*", default=[], help="Columns to stratify by (e.g. fuel firearea)")
+    parser.add_argument("--fractions", nargs=3, type=float, default=list(SPLIT_FRACTIONS),
+                        help="Train/val/test fractions")
+    args = parser.parse_args()
+
+    build_split_manifest(args.tracking, args.manifest, args.seed, args.stratify, tuple(args.fractions))
+    sys.exit(0)
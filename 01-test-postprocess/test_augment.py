@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the dihedral augmentation of processed cases.
+"""
+
+import numpy as np
+import pandas as pd
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import save_case_arrays, load_case_arrays
+from elmfire_augment import (
+    DIHEDRAL_TRANSFORMS,
+    AUGMENTED_RUN_OFFSET,
+    augmented_run,
+    transform_array,
+    transform_direction,
+    transform_point,
+    augment_all_cases
+)
+
+def test_transforms_are_distinct():
+    """The 8 transforms of an asymmetric grid are all different."""
+    grid = np.arange(12, dtype=np.float32).reshape(3, 4)
+    outputs = {transform_array(grid, k, flip).tobytes() + bytes(transform_array(grid, k, flip).shape)
+               for _, k, flip in DIHEDRAL_TRANSFORMS}
+    assert len(outputs) == 8
+
+def test_direction_matches_grid():
+    """A cell in direction theta from the center moves to the transformed direction."""
+    size = 21
+    center = size // 2
+    for theta in [0.0, 30.0, 90.0, 200.0]:
+        grid = np.zeros((size, size))
+        dx = int(round(8 * np.sin(np.radians(theta))))
+        dy = int(round(8 * np.cos(np.radians(theta))))
+        grid[center - dy, center + dx] = 1  # row 0 is north
+        for _, k, flip in DIHEDRAL_TRANSFORMS:
+            row, col = np.argwhere(transform_array(grid, k, flip) == 1)[0]
+            moved = np.degrees(np.arctan2(col - center, center - row)) % 360
+            expected = transform_direction(np.degrees(np.arctan2(dx, dy)) % 360, k, flip)
+            assert np.isclose(moved, expected)
+            x, y = transform_point(dx, dy, k, flip)
+            assert (row, col) == (center - y, center + x)
+
+def test_augment_all_cases():
+    """Augmented cases are saved to their own directory and listed with rewritten wd/asp."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        augmented_dir = Path(temp_dir) / 'elmfire_sims_augmented'
+        toa = np.full((4, 4), -9999, dtype=np.float32)
+        toa[0, 1] = 0
+        save_case_arrays('case_3', {'toa': [toa, toa]}, 15, str(output_dir))
+
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        pd.DataFrame([{'run': 3, 'xign': 10.0, 'yign': 20.0, 'asp': 45, 'wd': 90.0}]).to_csv(tracking, index=False)
+        augmented = Path(temp_dir) / 'augmented.txt'
+        augment_all_cases(str(tracking), str(output_dir), str(augmented), augmented_dir=str(augmented_dir))
+
+        df = pd.read_csv(augmented)
+        assert len(df) == 8
+        assert sorted(df['run']) == [3] + [k * AUGMENTED_RUN_OFFSET + 3 for k in range(1, 8)]
+        assert augmented_run(3, 'rot90') == AUGMENTED_RUN_OFFSET + 3
+        rot90 = df[df['transform'] == 'rot90'].iloc[0]
+        assert rot90['wd'] == 0.0 and rot90['asp'] == 315
+        assert (rot90['xign'], rot90['yign']) == (-20.0, 10.0)
+
+        arrays = load_case_arrays(int(rot90['run']), str(augmented_dir))
+        assert len(arrays['toa']) == 2
+        assert arrays['toa'][1][2, 0] == 0  # north cell moved west
+
+        # a second run writes no new cases or rows
+        augment_all_cases(str(tracking), str(output_dir), str(augmented), augmented_dir=str(augmented_dir))
+        assert pd.read_csv(augmented).equals(df)
+        assert [d.name for d in output_dir.glob('case_*')] == ['case_3']
+        assert len(list(augmented_dir.glob('case_*'))) == 7
+
+if __name__ == "__main__":
+    for test in [test_transforms_are_distinct, test_direction_matches_grid, test_augment_all_cases]:
+        test()
+        print(f"✓ {test.__name__}")
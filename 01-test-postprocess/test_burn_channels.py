@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for the vegetation / fire_front / scar channels.
+"""
+
+import numpy as np
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import timesteps_from_toa_one_case, burnscar_creation, var_sim_from_toa
+from test_robust import create_test_tif, TestData
+
+def test_burn_fraction_channels():
+    """Channels match the per-timestep definitions and the loop-based helpers."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        toa = TestData.basic_toa()
+        create_test_tif(toa, Path(temp_dir) / 'time_of_arrival_0000001_0259200.tif')
+        variables = ['toa', 'burnscar', 'vegetation', 'fire_front', 'scar']
+        results = timesteps_from_toa_one_case(temp_dir, variables, 15, 1.0)
+
+        for i, ts in enumerate([0, 900, 1800, 2700, 3600]):
+            assert np.array_equal(results['burnscar'][i], burnscar_creation(toa, ts))
+            assert np.array_equal(results['toa'][i], var_sim_from_toa(toa, toa, ts, 'toa'))
+            assert np.array_equal(results['scar'][i], burnscar_creation(toa, ts))
+            assert np.array_equal(results['vegetation'][i], 1 - burnscar_creation(toa, ts))
+            front = (toa != -9999) & (toa > ts - 900) & (toa <= ts)
+            assert np.array_equal(results['fire_front'][i], front)
+
+        # cells ignited at 954s and 1800s are the front at 1800s; 2130s is the front at 2700s
+        assert results['fire_front'][2].sum() == 3
+        assert results['fire_front'][3][3, 1] == 1 and results['fire_front'][3].sum() == 1
+        assert results['fire_front'][4].sum() == 0
+
+if __name__ == "__main__":
+    test_burn_fraction_channels()
+    print("✓ test_burn_fraction_channels")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the consolidated HDF5 case store.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import save_case_arrays
+
+pytest.importorskip("h5py")
+from case_store import write_case_store, read_case_window, load_store_params
+
+def test_case_store_round_trip():
+    """Windows read from the store match the saved arrays and params align with cases."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        rng = np.random.default_rng(0)
+        toa = {run: [rng.random((4, 5)).astype(np.float32) for _ in range(6)] for run in (2, 7)}
+        for run, arrays in toa.items():
+            burnscar = [(a > 0.5).astype(np.int8) for a in arrays]
+            save_case_arrays(f'case_{run}', {'toa': arrays, 'burnscar': burnscar}, 15, str(output_dir))
+
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        pd.DataFrame({'run': [7, 2, 9], 'ws': [3.0, 1.5, 8.0]}).to_csv(tracking, index=False)
+
+        store = Path(temp_dir) / 'cases.h5'
+        write_case_store(str(store), str(output_dir), str(tracking), time_chunk=4)
+
+        window = read_case_window(str(store), 'toa', slice(1, 2), slice(2, 5))
+        assert window.shape == (1, 3, 4, 5)
+        assert np.array_equal(window[0], np.stack(toa[7][2:5]))
+        assert read_case_window(str(store), 'burnscar').dtype == np.int8
+
+        params = load_store_params(str(store))
+        assert list(params['run']) == [2, 7]
+        assert list(params['ws']) == [1.5, 3.0]
+
+if __name__ == "__main__":
+    test_case_store_round_trip()
+    print("✓ test_case_store_round_trip")
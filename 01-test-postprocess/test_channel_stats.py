@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming per-channel statistics.
+"""
+
+import numpy as np
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import create_sims_from_toa_all_cases
+from channel_stats import (CHANNEL_BINS, RunningStats, load_channel_stats, stats_file_cases,
+                           combine_partial_stats, PARTIAL_DIR)
+from test_robust import create_test_tif, TestData
+from fused_worker import fused_postprocess
+from test_fused_worker import write_bil
+
+def test_merge_matches_single_pass():
+    """Merging per-worker statistics gives the same result as one pass."""
+    rng = np.random.default_rng(0)
+    batches = [rng.exponential(50.0, size=n) for n in (10, 1000, 1)]
+
+    single = RunningStats(CHANNEL_BINS['flin'])
+    single.update(np.concatenate(batches))
+
+    workers = [RunningStats(CHANNEL_BINS['flin']) for _ in batches]
+    for worker, batch in zip(workers, batches):
+        worker.update(batch)
+    merged = workers[0]
+    for worker in workers[1:]:
+        merged.merge(worker)
+
+    assert merged.count == single.count
+    assert np.isclose(merged.mean, single.mean) and np.isclose(merged.std, single.std)
+    assert merged.min == single.min and merged.max == single.max
+    assert np.array_equal(merged.hist, single.hist)
+    assert np.isclose(single.std, np.concatenate(batches).std())
+    assert abs(single.percentile(50) - np.median(np.concatenate(batches))) < 2.0
+
+def test_stats_written_during_processing():
+    """The postprocessor saves statistics over the burned cells of every case."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir = Path(temp_dir) / 'cases'
+        for i, toa in enumerate([TestData.basic_toa(), TestData.complex_toa()]):
+            (cases_dir / f'case_{i}').mkdir(parents=True)
+            create_test_tif(toa, cases_dir / f'case_{i}' / 'time_of_arrival_0000001_0259200.tif')
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa', 'burnscar'], 15, 1.0, str(output_dir))
+
+        stats = load_channel_stats(str(output_dir / 'channel_stats.json'))
+        burned = np.concatenate([a[a != -9999] for a in [TestData.basic_toa(), TestData.complex_toa()]])
+        assert list(stats) == ['toa']
+        assert stats['toa'].count == burned.size
+        assert np.isclose(stats['toa'].mean, burned.mean())
+        assert stats['toa'].max == burned.max()
+
+def test_batches_and_fused_runs_accumulate():
+    """A second batch and combined fused runs merge into the existing statistics file, each case once."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir = Path(temp_dir) / 'cases'
+        (cases_dir / 'case_0').mkdir(parents=True)
+        create_test_tif(TestData.basic_toa(), cases_dir / 'case_0' / 'time_of_arrival_0000001_0259200.tif')
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa', 'burnscar'], 15, 1.0, str(output_dir))
+
+        outputs = Path(temp_dir) / 'outputs'
+        outputs.mkdir()
+        write_bil(TestData.complex_toa(), outputs / 'time_of_arrival_0000001_0259200.bil')
+        fused_postprocess(str(outputs), 'case_1', ['toa', 'burnscar'], 15, 1.0, str(output_dir), keep_raw=True)
+        combine_partial_stats(str(output_dir))
+
+        # reprocessing the same cases does not count them again
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa', 'burnscar'], 15, 1.0, str(output_dir))
+        fused_postprocess(str(outputs), 'case_1', ['toa', 'burnscar'], 15, 1.0, str(output_dir))
+        combine_partial_stats(str(output_dir))
+
+        stats = load_channel_stats(str(output_dir / 'channel_stats.json'))
+        burned = np.concatenate([a[a != -9999] for a in [TestData.basic_toa(), TestData.complex_toa()]])
+        assert stats['toa'].count == burned.size
+        assert np.isclose(stats['toa'].mean, burned.mean())
+        assert stats_file_cases(str(output_dir / 'channel_stats.json')) == ['case_0', 'case_1']
+        assert list((output_dir / PARTIAL_DIR).iterdir()) == []
+        assert [p.name for p in output_dir.iterdir() if p.suffix == '.tmp'] == []
+
+if __name__ == "__main__":
+    for test in [test_merge_matches_single_pass, test_stats_written_during_processing,
+                 test_batches_and_fused_runs_accumulate]:
+        test()
+        print(f"✓ {test.__name__}")
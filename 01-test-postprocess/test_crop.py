@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for border trimming and ignition-centered cropping.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import ignition_pixel, crop_array, create_sims_from_toa_all_cases, load_case_arrays
+from test_robust import create_test_tif
+
+def test_trim_and_crop_array():
+    """Trim removes the border; windows are centered and padded with nodata."""
+    array = np.arange(64, dtype=np.float32).reshape(8, 8)
+    assert np.array_equal(crop_array(array, trim=1), array[1:7, 1:7])
+    assert np.array_equal(crop_array(array, center=(3, 4), size=4), array[1:5, 2:6])
+
+    corner = crop_array(array, trim=1, center=(1, 1), size=3)
+    assert corner[1, 1] == array[1, 1]
+    assert (corner[0] == -9999).all() and (corner[:, 0] == -9999).all()
+
+    assert ignition_pixel(0.0, 0.0, (128, 128)) == (64, 64)
+    assert ignition_pixel(-1905.0, 1905.0, (128, 128)) == (0, 0)
+
+def test_ignition_centered_cases():
+    """Each case is cropped around its own ignition before timestep expansion."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        pd.DataFrame({'run': [0, 1], 'xign': [-60.0, 30.0], 'yign': [60.0, 0.0]}).to_csv(tracking, index=False)
+        for run, xign, yign in [(0, -60.0, 60.0), (1, 30.0, 0.0)]:
+            toa = np.full((16, 16), -9999, dtype=np.float32)
+            toa[ignition_pixel(xign, yign, toa.shape)] = 0.0
+            case_dir = Path(temp_dir) / 'cases' / f'case_{run}'
+            case_dir.mkdir(parents=True)
+            create_test_tif(toa, case_dir / 'time_of_arrival_0000001_0259200.tif')
+
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        create_sims_from_toa_all_cases(str(Path(temp_dir) / 'cases'), ['toa', 'burnscar'], 15, 0.5,
+                                       str(output_dir), trim=1, crop_size=5, center_on_ignition=True,
+                                       tracking_file=str(tracking))
+        for run in (0, 1):
+            burnscar = load_case_arrays(run, str(output_dir))['burnscar']
+            assert len(burnscar) == 3 and burnscar[0].shape == (5, 5)
+            assert burnscar[0][2, 2] == 1 and burnscar[0].sum() == 1
+
+def test_ignition_crop_checks(capsys):
+    """Centering without a crop size is refused; a run missing from the tracking file is reported."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir = Path(temp_dir) / 'cases'
+        (cases_dir / 'case_4').mkdir(parents=True)
+        create_test_tif(np.zeros((8, 8), dtype=np.float32), cases_dir / 'case_4' / 'time_of_arrival_0000001_0259200.tif')
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        pd.DataFrame({'run': [1], 'xign': [0.0], 'yign': [0.0]}).to_csv(tracking, index=False)
+        output_dir = str(Path(temp_dir) / 'elmfire_sims')
+
+        with pytest.raises(ValueError, match='crop_size'):
+            create_sims_from_toa_all_cases(str(cases_dir), ['toa'], 15, 0.5, output_dir, center_on_ignition=True,
+                                           tracking_file=str(tracking))
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa'], 15, 0.5, output_dir, crop_size=4,
+                                       center_on_ignition=True, tracking_file=str(tracking))
+        assert 'Warning: case_4 is not in' in capsys.readouterr().out
+        assert load_case_arrays(4, output_dir)['toa'][0].shape == (4, 4)
+
+if __name__ == "__main__":
+    for test in [test_trim_and_crop_array, test_ignition_centered_cases]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped flat dataset export.
+"""
+
+import numpy as np
+import pandas as pd
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import timesteps_from_toa_one_case, save_case_arrays
+from flat_dataset import valid_timestep_range, export_flat_dataset, FlatCaseDataset
+from elmfire_augment import augment_all_cases, AUGMENTED_RUN_OFFSET
+from test_robust import create_test_tif, TestData
+
+def test_valid_timestep_range():
+    """Leading empty timesteps and trailing unchanged ones are excluded."""
+    empty = np.full((2, 2), -9999)
+    burning = np.array([[0, -9999], [-9999, -9999]])
+    burned = np.array([[0, 900], [-9999, -9999]])
+    assert valid_timestep_range([empty, burning, burned, burned, burned]) == (1, 3)
+    assert valid_timestep_range([empty, empty]) == (2, 2)
+
+def test_flat_export_round_trip():
+    """Samples read through the memory maps match the per-case arrays."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        cases = {}
+        for run, toa in [(1, TestData.basic_toa()), (4, TestData.complex_toa())]:
+            case_dir = Path(temp_dir) / 'cases' / f'case_{run}'
+            case_dir.mkdir(parents=True)
+            create_test_tif(toa, case_dir / 'time_of_arrival_0000001_0259200.tif')
+            cases[run] = timesteps_from_toa_one_case(str(case_dir), ['toa', 'burnscar'], 15, 2.0)
+            save_case_arrays(str(case_dir), cases[run], 15, str(output_dir))
+
+        prefix = str(Path(temp_dir) / 'flat' / 'elmfire')
+        export_flat_dataset(prefix, str(output_dir))
+        dataset = FlatCaseDataset(prefix)
+
+        assert isinstance(dataset.arrays['toa'], np.memmap)
+        assert np.array_equal(dataset.sample(4, 3)['toa'], cases[4]['toa'][3])
+        assert np.array_equal(dataset.case(1)['burnscar'], np.stack(cases[1]['burnscar']))
+
+        # basic_toa stops changing after 2700s (timestep 3), complex_toa after 3600s (timestep 4)
+        assert [entry['valid_stop'] for entry in dataset.index['cases']] == [4, 5]
+        assert len(dataset) == 4 + 5
+        assert np.array_equal(dataset[4]['toa'], cases[4]['toa'][0])
+
+def test_augmented_cases_only_on_request():
+    """Augmented cases are exported only when the augmented tracking file is given."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        augmented_dir = Path(temp_dir) / 'elmfire_sims_augmented'
+        toa = np.full((4, 4), -9999, dtype=np.float32)
+        toa[0, 1] = 0
+        save_case_arrays('case_2', {'toa': [toa, toa]}, 15, str(output_dir))
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        pd.DataFrame([{'run': 2, 'xign': 0.0, 'yign': 0.0, 'asp': 0, 'wd': 0.0}]).to_csv(tracking, index=False)
+        augmented = Path(temp_dir) / 'input_tracking_augmented.txt'
+        augment_all_cases(str(tracking), str(output_dir), str(augmented), transforms=['rot90'],
+                          augmented_dir=str(augmented_dir))
+
+        plain, with_augmented = str(Path(temp_dir) / 'plain'), str(Path(temp_dir) / 'augmented')
+        export_flat_dataset(plain, str(output_dir))
+        export_flat_dataset(with_augmented, str(output_dir), augmented_tracking_file=str(augmented),
+                            augmented_dir=str(augmented_dir))
+
+        assert [entry['case'] for entry in FlatCaseDataset(plain).index['cases']] == [2]
+        dataset = FlatCaseDataset(with_augmented)
+        assert [entry['case'] for entry in dataset.index['cases']] == [2, AUGMENTED_RUN_OFFSET + 2]
+        assert dataset.sample(AUGMENTED_RUN_OFFSET + 2, 1)['toa'][2, 0] == 0
+
+if __name__ == "__main__":
+    for test in [test_valid_timestep_range, test_flat_export_round_trip, test_augmented_cases_only_on_request]:
+        test()
+        print(f"✓ {test.__name__}")
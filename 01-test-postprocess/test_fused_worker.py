@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the fused .bil postprocessing worker.
+"""
+
+import numpy as np
+import pandas as pd
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import timesteps_from_toa_one_case, load_case_arrays, create_sims_from_toa_all_cases
+from fused_worker import read_bil, fused_postprocess
+from channel_stats import combine_partial_stats
+from test_robust import create_test_tif, TestData
+
+def write_bil(data, bil_path, nodata=-9999.0, byteorder='I'):
+    """Write a float32 ESRI .bil/.hdr pair like ELMFIRE does."""
+    rows, cols = data.shape
+    data.astype('<f4' if byteorder == 'I' else '>f4').tofile(bil_path)
+    Path(bil_path).with_suffix('.hdr').write_text(
+        f"BYTEORDER      {byteorder}\nLAYOUT         BIL\nNROWS          {rows}\nNCOLS          {cols}\n"
+        f"NBANDS         1\nNBITS          32\nPIXELTYPE      FLOAT\nNODATA         {nodata}\n")
+
+def test_read_bil():
+    """Both byte orders read back with nodata mapped to -9999."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data = TestData.complex_toa()
+        data[0, 0] = -1.0
+        for byteorder in ('I', 'M'):
+            path = Path(temp_dir) / f'toa_{byteorder}.bil'
+            write_bil(data, path, nodata=-1.0, byteorder=byteorder)
+            expected = data.copy()
+            expected[0, 0] = -9999
+            assert np.array_equal(read_bil(str(path)), expected)
+
+def test_fused_matches_tif_pipeline():
+    """The fused worker writes the same arrays as the GeoTIFF path and removes raw outputs."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        toa = TestData.complex_toa()
+        flin = np.where(toa != -9999, 100.0, -9999).astype(np.float32)
+
+        tif_dir = Path(temp_dir) / 'case_5'
+        tif_dir.mkdir()
+        create_test_tif(toa, tif_dir / 'time_of_arrival_0000001_0259200.tif')
+        create_test_tif(flin, tif_dir / 'flin_0000001_0259200.tif')
+        expected = timesteps_from_toa_one_case(str(tif_dir), ['toa', 'burnscar', 'flin'], 15, 1.0)
+
+        outputs = Path(temp_dir) / 'outputs'
+        outputs.mkdir()
+        write_bil(toa, outputs / 'time_of_arrival_0000001_0259200.bil')
+        write_bil(flin, outputs / 'flin_0000001_0259200.bil')
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        summary_file = Path(temp_dir) / 'case_summaries.csv'
+        fused_postprocess(str(outputs), 'case_5', ['toa', 'burnscar', 'flin'], 15, 1.0, str(output_dir),
+                          summary_file=str(summary_file))
+
+        arrays = load_case_arrays(5, str(output_dir))
+        for variable, array_list in expected.items():
+            assert all(np.array_equal(a, b) for a, b in zip(arrays[variable], array_list))
+        assert not list(outputs.iterdir())
+
+        summary = pd.read_csv(summary_file).iloc[0]
+        burned = toa != -9999
+        assert summary['run'] == 5 and summary['burned_cells'] == burned.sum()
+        assert summary['toa_max'] == toa[burned].max() and summary['flin_mean'] == 100.0
+        assert (summary['row_min'], summary['row_max'], summary['col_min'], summary['col_max']) == (0, 4, 0, 4)
+        assert summary['perimeter'] == 30.0 * 20  # 20 cell edges between burned and unburned cells
+
+def test_fused_crop_matches_tif_pipeline():
+    """With trim / ignition-centered crop the fused worker builds the same case as the postprocessor."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        toa = TestData.complex_toa()
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        pd.DataFrame({'run': [3], 'xign': [-30.0], 'yign': [30.0]}).to_csv(tracking, index=False)
+        crop = dict(trim=1, crop_size=4, center_on_ignition=True, tracking_file=str(tracking))
+
+        cases_dir = Path(temp_dir) / 'cases'
+        (cases_dir / 'case_3').mkdir(parents=True)
+        create_test_tif(toa, cases_dir / 'case_3' / 'time_of_arrival_0000001_0259200.tif')
+        tif_output = Path(temp_dir) / 'tif_sims'
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa', 'burnscar'], 15, 1.0, str(tif_output), **crop)
+
+        outputs = Path(temp_dir) / 'outputs'
+        outputs.mkdir()
+        write_bil(toa, outputs / 'time_of_arrival_0000001_0259200.bil')
+        fused_output = Path(temp_dir) / 'fused_sims'
+        fused_postprocess(str(outputs), 'case_3', ['toa', 'burnscar'], 15, 1.0, str(fused_output), **crop)
+
+        expected, arrays = load_case_arrays(3, str(tif_output)), load_case_arrays(3, str(fused_output))
+        assert arrays['toa'][0].shape == (4, 4)
+        for variable, array_list in expected.items():
+            assert all(np.array_equal(a, b) for a, b in zip(arrays[variable], array_list))
+        combine_partial_stats(str(fused_output))
+        assert (fused_output / 'channel_stats.json').read_text() == (tif_output / 'channel_stats.json').read_text()
+
+if __name__ == "__main__":
+    for test in [test_read_bil, test_fused_matches_tif_pipeline, test_fused_crop_matches_tif_pipeline]:
+        test()
+        print(f"✓ {test.__name__}")
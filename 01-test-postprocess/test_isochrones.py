@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process isochrone generation.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import tempfile
+from pathlib import Path
+from isochrones import marching_squares, toa_isochrones, isochrones_for_cases
+from elmfire_postprocessor import timesteps_from_arrays, save_case_arrays
+from test_robust import create_test_tif
+
+def radial_toa(size=41, speed=1.0 / 60.0, cellsize=30.0, radius=15):
+    """Circular fire: TOA proportional to distance from the center, unburned outside radius."""
+    rows, cols = np.indices((size, size))
+    distance = np.hypot(rows - size // 2, cols - size // 2) * cellsize
+    return np.where(distance <= radius * cellsize, distance / speed, -9999).astype(np.float32)
+
+def test_contours_follow_toa():
+    """Segment endpoints lie where TOA crosses the level."""
+    toa = radial_toa()
+    contours = toa_isochrones(toa, interval=3600.0)
+    assert [level for level, _ in contours] == [3600.0, 7200.0, 10800.0, 14400.0, 18000.0, 21600.0, 25200.0]
+    for level, segments in contours:
+        radius = np.hypot(segments[..., 0], segments[..., 1])
+        # 1/60 m/s -> 60 m per hour; the cell-center origin is half a cell from 0,0
+        assert np.all(np.abs(radius - level / 60.0) < 30.0)
+
+def test_single_cell_is_closed():
+    """A single cell above the level is enclosed by four segments."""
+    field = np.zeros((3, 3))
+    field[1, 1] = 1.0
+    segments = marching_squares(field, 0.5)
+    assert len(segments) == 4
+    endpoints = {tuple(p) for p in segments.reshape(-1, 2)}
+    assert endpoints == {(0.5, 1.0), (1.0, 1.5), (1.5, 1.0), (1.0, 0.5)}
+
+def test_campaign_table():
+    """All cases end up in one table, and only the cases of cases_dir."""
+    pytest.importorskip("pyarrow")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for run in (1, 2):
+            case_dir = Path(temp_dir) / 'cases' / f'case_{run}'
+            case_dir.mkdir(parents=True)
+            create_test_tif(radial_toa(radius=5 * run), case_dir / 'time_of_arrival_0000001_0259200.tif')
+        # a stale processed case is only read when sims_dir is given
+        arrays = timesteps_from_arrays({'toa': radial_toa(radius=5)}, ['toa'], 60, 8.0)
+        save_case_arrays('case_9', arrays, 60, str(Path(temp_dir) / 'elmfire_sims'))
+        out = Path(temp_dir) / 'isochrones.parquet'
+        cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            isochrones_for_cases('cases', str(out))
+        finally:
+            os.chdir(cwd)
+
+        df = pd.read_parquet(out)
+        assert sorted(df['case'].unique()) == [1, 2]
+        assert df['geometry'].str.startswith('MULTILINESTRING').all()
+
+def test_fused_campaign_reads_processed_arrays(capsys):
+    """Without GeoTIFFs the last toa array of each case in elmfire_sims is contoured."""
+    pytest.importorskip("pyarrow")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sims_dir = Path(temp_dir) / 'elmfire_sims'
+        for run in (1, 2, 3):
+            arrays = timesteps_from_arrays({'toa': radial_toa(radius=5 * run)}, ['toa'], 60, 8.0)
+            save_case_arrays(f'case_{run}', arrays, 60, str(sims_dir))
+        out = Path(temp_dir) / 'isochrones.parquet'
+        df = isochrones_for_cases(str(Path(temp_dir) / 'cases'), str(out), sims_dir=str(sims_dir), workers=2)
+
+        assert sorted(df['case'].unique()) == [1, 2, 3]
+        expected = [level for level, _ in toa_isochrones(radial_toa(radius=15))]
+        assert df[df['case'] == 3]['toa_seconds'].tolist() == expected
+
+        # nothing to contour: an empty table and a warning
+        empty = isochrones_for_cases(str(Path(temp_dir) / 'cases'), str(out), sims_dir=str(Path(temp_dir) / 'none'))
+        assert empty.empty and 'Warning: no time of arrival' in capsys.readouterr().out
+
+if __name__ == "__main__":
+    for test in [test_contours_follow_toa, test_single_cell_is_closed, test_campaign_table]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharded tar export.
+"""
+
+import numpy as np
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import save_case_arrays
+from shard_export import export_shards, read_shard, read_sample, iterate_shards
+
+def test_shards_round_trip():
+    """Every sample lands in exactly one shard and reads back unchanged."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        rng = np.random.default_rng(1)
+        cases = {}
+        for run in range(3):
+            toa = [rng.random((8, 8)).astype(np.float32) for _ in range(5)]
+            cases[run] = {'toa': toa, 'burnscar': [(a > 0.5).astype(np.int8) for a in toa]}
+            save_case_arrays(f'case_{run}', cases[run], 15, str(output_dir))
+
+        shard_dir = Path(temp_dir) / 'shards'
+        export_shards(str(shard_dir), str(output_dir), shard_bytes=4096)
+        shards = sorted(shard_dir.glob('shard_*.tar'))
+        assert len(shards) > 1
+
+        keys = []
+        for shard in shards:
+            for sample in read_shard(str(shard)):
+                case_num, t = map(int, sample['key'].split('_'))
+                assert np.array_equal(sample['toa'], cases[case_num]['toa'][t])
+                assert np.array_equal(sample['burnscar'], cases[case_num]['burnscar'][t])
+                keys.append(sample['key'])
+        assert sorted(keys) == sorted(f"{run}_{t}" for run in range(3) for t in range(5))
+
+        sample = read_sample(str(shards[-1]), keys[-1])
+        case_num, t = map(int, keys[-1].split('_'))
+        assert np.array_equal(sample['toa'], cases[case_num]['toa'][t])
+
+        streamed = [s['key'] for s in iterate_shards(str(shard_dir), buffer_size=4, seed=0)]
+        assert sorted(streamed) == sorted(keys)
+
+def test_cases_are_interleaved():
+    """Consecutive samples come from different cases, and each case keeps its timestep order."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        for run in range(4):
+            toa = [np.full((4, 4), run * 100 + t, dtype=np.float32) for t in range(20)]
+            save_case_arrays(f'case_{run}', {'toa': toa}, 15, str(output_dir))
+
+        shard_dir = Path(temp_dir) / 'shards'
+        export_shards(str(shard_dir), str(output_dir), interleave=4)
+        keys = [sample['key'] for sample in read_shard(str(shard_dir / 'shard_000000.tar'))]
+
+    cases = [int(key.split('_')[0]) for key in keys]
+    assert len(keys) == 80
+    assert len(set(cases[:20])) > 1
+    for run in range(4):
+        assert [int(key.split('_')[1]) for key in keys if key.startswith(f'{run}_')] == list(range(20))
+
+if __name__ == "__main__":
+    for test in [test_shards_round_trip, test_cases_are_interleaved]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the deterministic split manifest.
+"""
+
+import numpy as np
+import pandas as pd
+import tempfile
+from pathlib import Path
+from split_manifest import build_split_manifest, load_split, TRACKING_COLUMNS
+
+def write_tracking(path, runs):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'run': runs,
+        'fuel': [[101, 102, 165][run % 3] for run in runs],
+        'firearea': rng.exponential(200.0, size=len(runs)).round(1)
+    }).to_csv(path, index=False)
+
+def test_unstratified_split_is_stable():
+    """Assignments depend only on (seed, case id) and survive campaign growth."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        manifest = Path(temp_dir) / 'split_manifest.csv'
+        write_tracking(tracking, list(range(1000)))
+        first = build_split_manifest(str(tracking), str(manifest), seed=3)
+        fractions = first['split'].value_counts(normalize=True)
+        assert abs(fractions['train'] - 0.8) < 0.05
+
+        manifest.unlink()
+        write_tracking(tracking, list(range(1500)))
+        grown = build_split_manifest(str(tracking), str(manifest), seed=3)
+        assert list(grown['split'][:1000]) == list(first['split'])
+
+def test_stratified_split_balances_strata():
+    """Each stratum follows 80:10:10 and earlier assignments are kept."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        manifest = Path(temp_dir) / 'split_manifest.csv'
+        write_tracking(tracking, list(range(300)))
+        first = build_split_manifest(str(tracking), str(manifest), seed=1, stratify=['fuel', 'firearea'])
+        for _, group in first.groupby('stratum'):
+            counts = group['split'].value_counts()
+            assert abs(counts.get('val', 0) - 0.1 * len(group)) <= 1
+
+        write_tracking(tracking, list(range(600)))
+        grown = build_split_manifest(str(tracking), str(manifest), seed=1, stratify=['fuel', 'firearea'])
+        assert list(grown['split'][:300]) == list(first['split'])
+        assert len(load_split('test', str(manifest))) == (grown['split'] == 'test').sum()
+
+def test_related_cases_share_a_split():
+    """Fires of one parameter draw and augmented copies never straddle splits."""
+    rng = np.random.default_rng(2)
+    rows = []
+    for draw in range(60):
+        params = {c: float(rng.uniform(0, 30)) for c in TRACKING_COLUMNS}
+        params['fuel'] = [101, 102, 165][draw % 3]
+        for fire in range(4):  # four packed fires per draw, differing only in the ignition
+            rows.append({'run': 4 * draw + fire + 1, **params,
+                         'xign': float(rng.uniform(-900, 900)), 'yign': float(rng.uniform(-900, 900))})
+    tracking_rows = pd.DataFrame(rows)
+    augmented = pd.concat([tracking_rows.assign(source_run=tracking_rows['run'], transform='identity'),
+                           tracking_rows.assign(source_run=tracking_rows['run'], run=tracking_rows['run'] + 1000,
+                                                transform='rot90')])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracking = Path(temp_dir) / 'input_tracking.txt'
+        manifest_file = Path(temp_dir) / 'split_manifest.csv'
+        tracking_rows.to_csv(tracking, index=False)
+        augmented.to_csv(Path(temp_dir) / 'input_tracking_augmented.txt', index=False)
+
+        for stratify in (None, ['fuel']):
+            manifest = build_split_manifest(str(tracking), str(manifest_file), seed=5, stratify=stratify)
+            assert len(manifest) == 480 and manifest['group'].nunique() == 60
+            assert (manifest.groupby('group')['split'].nunique() == 1).all()
+            assert set(manifest['split']) == {'train', 'val', 'test'}
+            manifest_file.unlink()
+
+        # runs added to input_tracking.txt after the augmentation are still assigned
+        later = tracking_rows.tail(4).assign(run=range(241, 245), fuel=40)
+        pd.concat([tracking_rows, later]).to_csv(tracking, index=False)
+        manifest = build_split_manifest(str(tracking), str(manifest_file), seed=5)
+        assert len(manifest) == 484
+        assert manifest.set_index('run').loc[241:244, 'group'].tolist() == [241] * 4
+
+if __name__ == "__main__":
+    for test in [test_unstratified_split_is_stable, test_stratified_split_balances_strata,
+                 test_related_cases_share_a_split]:
+        test()
+        print(f"✓ {test.__name__}")
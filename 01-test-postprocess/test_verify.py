@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the header-only output verifier.
+"""
+
+import sys
+import json
+import subprocess
+import numpy as np
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import save_case_arrays, read_npy_header, verify_all_cases
+
+def test_read_npy_header():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'a.npy'
+        np.save(path, np.zeros((3, 4), dtype=np.int8))
+        assert read_npy_header(path) == ((3, 4), np.dtype(np.int8))
+
+def test_verify_all_cases_report():
+    """Complete cases pass; missing variables, timesteps and bad shapes are reported."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        grid = np.zeros((4, 4), dtype=np.float32)
+        save_case_arrays('case_1', {'toa': [grid] * 5, 'burnscar': [grid.astype(np.int8)] * 5}, 15, str(output_dir))
+        save_case_arrays('case_2', {'toa': [grid] * 3}, 15, str(output_dir))
+        save_case_arrays('case_3', {'toa': [grid] * 4 + [np.zeros((5, 5), dtype=np.float32)],
+                                    'burnscar': [grid.astype(np.int8)] * 5}, 15, str(output_dir))
+
+        report_file = Path(temp_dir) / 'report.json'
+        verify_all_cases(str(output_dir), ['toa', 'burnscar'], 15, 1.0, str(report_file), workers=2)
+        report = json.loads(report_file.read_text())
+
+        results = {r['case']: r for r in report['cases']}
+        assert report['num_cases'] == 3 and report['num_failed'] == 2
+        assert results['1']['ok'] and results['1']['dtypes'] == {'toa': ['float32'], 'burnscar': ['int8']}
+        assert 'missing variable burnscar' in results['2']['issues']
+        assert any('toa missing 2 timesteps' in issue for issue in results['2']['issues'])
+        assert any('inconsistent shapes' in issue for issue in results['3']['issues'])
+
+def test_verify_cli_checks_default_variables():
+    """--verify without --variables checks toa, burnscar, flin and vs."""
+    script = Path(__file__).resolve().parent / 'elmfire_postprocessor.py'
+    with tempfile.TemporaryDirectory() as temp_dir:
+        grid = np.zeros((4, 4), dtype=np.float32)
+        save_case_arrays('case_1', {'toa': [grid] * 289, 'burnscar': [grid.astype(np.int8)] * 289},
+                         15, str(Path(temp_dir) / 'elmfire_sims'))
+        result = subprocess.run([sys.executable, str(script), '--verify'], cwd=temp_dir,
+                                capture_output=True, text=True)
+        assert result.returncode == 1
+        assert 'missing variable flin' in result.stdout and 'missing variable vs' in result.stdout
+
+        result = subprocess.run([sys.executable, str(script), '--verify', '--variables', 'toa', 'burnscar'],
+                                cwd=temp_dir, capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout
+
+if __name__ == "__main__":
+    for test in [test_read_npy_header, test_verify_all_cases_report, test_verify_cli_checks_default_variables]:
+        test()
+        print(f"✓ {test.__name__}")
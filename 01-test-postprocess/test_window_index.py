@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the autoregressive window index.
+"""
+
+import numpy as np
+import tempfile
+from pathlib import Path
+from elmfire_postprocessor import save_case_arrays
+from flat_dataset import export_flat_dataset, FlatCaseDataset
+from window_index import build_window_index, window_view
+
+def test_windows_skip_static_cases_and_are_views():
+    """Zero-area cases and windows after the fire is out get no windows; windows are views."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir) / 'elmfire_sims'
+        empty = np.full((3, 3), -9999, dtype=np.float32)
+        toa = [empty.copy() for _ in range(10)]
+        for t in range(1, 4):  # fire grows between timesteps 1 and 3, then stops
+            toa[t] = toa[t - 1].copy()
+            toa[t][t - 1, 0] = t * 900
+        for t in range(4, 10):
+            toa[t] = toa[3]
+        save_case_arrays('case_0', {'toa': toa}, 15, str(output_dir))
+        save_case_arrays('case_1', {'toa': [empty] * 10}, 15, str(output_dir))
+
+        prefix = str(Path(temp_dir) / 'flat' / 'elmfire')
+        export_flat_dataset(prefix, str(output_dir))
+        dataset = FlatCaseDataset(prefix)
+
+        windows = build_window_index(dataset, lengths=[3], stride=2)
+        assert set(windows[:, 0]) == {0}
+        # last change is at timestep 3, so windows must start before it and end at or after timestep 1
+        assert list(windows[:, 1]) == [0, 1, 2]
+
+        view = window_view(dataset, windows[1])['toa']
+        assert view.shape == (3, 3, 3)
+        assert np.shares_memory(view, dataset.arrays['toa'])
+        assert np.array_equal(view, np.stack(toa[1:6:2]))
+
+if __name__ == "__main__":
+    test_windows_skip_static_cases_and_are_views()
+    print("✓ test_windows_skip_static_cases_and_are_views")
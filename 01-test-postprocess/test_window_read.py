@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for windowed reads in load_tif_as_array.
+"""
+
+import numpy as np
+import pandas as pd
+import tempfile
+from pathlib import Path
+from rasterio.windows import Window
+from elmfire_postprocessor import load_tif_as_array, create_sims_from_toa_all_cases, load_case_arrays
+from test_robust import create_test_tif, TestData
+
+def test_load_tif_window():
+    """A window reads only its region, clipped to the raster or padded with -9999."""
+    toa = np.arange(100, dtype=np.float32).reshape(10, 10)
+    toa[0, 0] = -1
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tif = Path(temp_dir) / 'time_of_arrival_0000001_0000060.tif'
+        create_test_tif(toa, tif, nodata_value=-1)
+
+        assert np.array_equal(load_tif_as_array(str(tif), Window(4, 1, 2, 3)), toa[1:4, 4:6])
+        window = Window.from_slices((-1, 3), (-1, 2), boundless=True)
+        clipped = load_tif_as_array(str(tif), window)
+        assert clipped.shape == (3, 2) and clipped[0, 0] == -9999
+        padded = load_tif_as_array(str(tif), window, pad_nodata=True)
+        assert padded.shape == (4, 3)
+        assert (padded[0] == -9999).all() and (padded[:, 0] == -9999).all()
+        assert np.array_equal(padded[2:, 2:], toa[1:3, 1:2])
+        assert load_tif_as_array(str(tif), Window(0, 0, 0, 0)).size == 0
+
+def test_burned_extent_processing():
+    """Reading only the burned extents from the case summaries gives the same case arrays."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cases_dir = Path(temp_dir) / 'cases'
+        summaries = []
+        for run, toa in [(1, TestData.basic_toa()), (2, TestData.complex_toa()), (3, np.full((5, 5), -9999.0))]:
+            (cases_dir / f'case_{run}').mkdir(parents=True)
+            create_test_tif(toa, cases_dir / f'case_{run}' / 'time_of_arrival_0000001_0259200.tif')
+            create_test_tif(np.full(toa.shape, 7.0), cases_dir / f'case_{run}' / 'flin_0000001_0259200.tif')
+            rows, cols = np.nonzero(toa != -9999)
+            summaries.append({'run': run, 'burned_cells': rows.size,
+                              'row_min': rows.min() if rows.size else -1, 'row_max': rows.max() if rows.size else -1,
+                              'col_min': cols.min() if cols.size else -1, 'col_max': cols.max() if cols.size else -1})
+        summary_file = Path(temp_dir) / 'case_summaries.csv'
+        pd.DataFrame(summaries).to_csv(summary_file, index=False)
+
+        full, windowed = Path(temp_dir) / 'full', Path(temp_dir) / 'windowed'
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa', 'burnscar', 'flin', 'vegetation'], 15, 1.0, str(full))
+        create_sims_from_toa_all_cases(str(cases_dir), ['toa', 'burnscar', 'flin', 'vegetation'], 15, 1.0,
+                                       str(windowed), summary_file=str(summary_file))
+
+        for run in (1, 2, 3):
+            expected, arrays = load_case_arrays(run, str(full)), load_case_arrays(run, str(windowed))
+            assert arrays['toa'][0].shape == (5, 5)
+            for variable, array_list in expected.items():
+                assert all(np.array_equal(a, b) for a, b in zip(arrays[variable], array_list))
+
+if __name__ == "__main__":
+    for test in [test_load_tif_window, test_burned_extent_processing]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Autoregressive window index over a flat dataset export.
+
+Instead of materializing every 6 h or 24 h training window as a copy, the
+windows are enumerated as (case, start, length, stride) rows: frames
+start, start + stride, ..., start + (length - 1) * stride of one case.
+Windows in which nothing changes are dropped, using the valid timestep range
+of each case from the flat export index: zero-area runs have no valid range,
+and windows that start after the fire is out see no change. Windows are read
+as strided views into the memory-mapped flat files, so no data is copied.
+"""
+
+import sys
+import argparse
+import numpy as np
+from typing import Dict, Iterator, List
+from flat_dataset import FlatCaseDataset
+
+WINDOW_COLUMNS = ['case', 'start', 'length', 'stride']
+
+def case_windows(entry: Dict, length: int, stride: int = 1, start_step: int = 1) -> np.ndarray:
+    """Start timesteps of the windows of one case that contain a change.
+
+    The fire changes between timesteps valid_start - 1 and valid_stop - 1, so a
+    window spanning frames [start, end] sees a change if start < valid_stop - 1
+    and end >= valid_start.
+    """
+    span = (length - 1) * stride
+    starts = np.arange(0, entry['num_timesteps'] - span, start_step)
+    changes = (starts < entry['valid_stop'] - 1) & (starts + span >= entry['valid_start'])
+    return starts[changes]
+
+def build_window_index(dataset: FlatCaseDataset,
+                       lengths: List[int] = (25, 97),
+                       stride: int = 1,
+                       start_step: int = 1) -> np.ndarray:
+    """(num windows, 4) int array of (case, start, length, stride) rows for every window length."""
+    rows = []
+    for entry in dataset.index['cases']:
+        for length in lengths:
+            starts = case_windows(entry, length, stride, start_step)
+            rows.append(np.column_stack([np.full(len(starts), entry['case']), starts,
+                                         np.full(len(starts), length), np.full(len(starts), stride)]))
+    return np.concatenate(rows).astype(np.int64) if rows else np.zeros((0, len(WINDOW_COLUMNS)), dtype=np.int64)
+
+def window_view(dataset: FlatCaseDataset, window) -> Dict[str, np.ndarray]:
+    """(length, h, w) views of every variable for one (case, start, length, stride) row."""
+    case_num, start, length, stride = (int(v) for v in window)
+    entry = dataset.cases[case_num]
+    first = entry['offset'] + start
+    frames = slice(first, first + (length - 1) * stride + 1, stride)
+    return {variable: array[frames] for variable, array in dataset.arrays.items()}
+
+def iterate_windows(dataset: FlatCaseDataset, windows: np.ndarray, shuffle: bool = False,
+                    seed: int = None) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the window views in index order, or shuffled."""
+    order = np.random.default_rng(seed).permutation(len(windows)) if shuffle else range(len(windows))
+    for i in order:
+        yield window_view(dataset, windows[i])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the autoregressive window index of a flat export")
+    parser.add_argument("--prefix", default='./flat/elmfire', help="Prefix of the flat export")
+    parser.add_argument("--lengths", nargs="+", type=int, default=[25, 97],
+                        help="Window lengths in timesteps (default: 6 h and 24 h at 15 minutes)")
+    parser.add_argument("--stride", type=int, default=1, help="Timesteps between frames of a window")
+    parser.add_argument("--start_step", type=int, default=1, help="Timesteps between window starts")
+    parser.add_argument("--out", default=None, help="Output .npy (default: <prefix>_windows.npy)")
+    args = parser.parse_args()
+
+    windows = build_window_index(FlatCaseDataset(args.prefix), args.lengths, args.stride, args.start_step)
+    out = args.out or f"{args.prefix}_windows.npy"
+    np.save(out, windows)
+    print(f"Saved {len(windows)} windows ({', '.join(WINDOW_COLUMNS)}) to {out}")
+    sys.exit(0)
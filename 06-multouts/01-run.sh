@@ -53,8 +53,6 @@ OUTPUTS=./outputs
 rm -f -r $SCRATCH $INPUTS $OUTPUTS
 mkdir $SCRATCH $INPUTS $OUTPUTS
 
-cp elmfire.data.in $INPUTS/elmfire.data
-
 printf "x,y,z\n-100000,-100000,0\n100000,-100000,0\n-100000,100000,0\n100000,100000,0\n" > $SCRATCH/dummy.xyz
 
 gdalwarp -tr 200000 200000 -te -100000 -100000 100000 100000 -s_srs "$A_SRS" -t_srs "$A_SRS" $SCRATCH/dummy.xyz $SCRATCH/dummy.tif
@@ -63,32 +61,33 @@ gdalwarp -dstnodata -9999 -ot Int16   -tr $TR -te $TE $SCRATCH/dummy.tif $SCRATC
 
 # Create float input rasters
 for i in $(eval echo "{1..$NUM_FLOAT_RASTERS}"); do
-   gdal_calc.py -A $SCRATCH/float.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/${FLOAT_RASTER[i]}.tif" --calc="A + ${FLOAT_VAL[i]}"
+   gdal_calc.py -A $SCRATCH/float.tif $(raster_co --co float) --NoDataValue=-9999 --outfile="$INPUTS/${FLOAT_RASTER[i]}.tif" --calc="A + ${FLOAT_VAL[i]}"
 done
 
 # Create integer input rasters
 for i in $(eval echo "{1..$NUM_INT_RASTERS}"); do
-   gdal_calc.py -A $SCRATCH/int.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/${INT_RASTER[i]}.tif" --calc="A + ${INT_VAL[i]}"
+   gdal_calc.py -A $SCRATCH/int.tif $(raster_co --co int) --NoDataValue=-9999 --outfile="$INPUTS/${INT_RASTER[i]}.tif" --calc="A + ${INT_VAL[i]}"
 done
 
 # Create the ignition mask (1.0 in all cells)
-# gdal_calc.py -A $SCRATCH/float.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/ignition_mask.tif" --calc="A + 1.0"
-
-# Set inputs in elmfire.data
-replace_line COMPUTATIONAL_DOMAIN_XLLCORNER $XMIN no
-replace_line COMPUTATIONAL_DOMAIN_YLLCORNER $YMIN no
-replace_line COMPUTATIONAL_DOMAIN_CELLSIZE $CELLSIZE no
-replace_line SIMULATION_TSTOP $SIMULATION_TSTOP no
-replace_line LH_MOISTURE_CONTENT $LH_MOISTURE_CONTENT no
-replace_line LW_MOISTURE_CONTENT $LW_MOISTURE_CONTENT no
-replace_line A_SRS "$A_SRS" yes
+# gdal_calc.py -A $SCRATCH/float.tif $(raster_co --co float) --NoDataValue=-9999 --outfile="$INPUTS/ignition_mask.tif" --calc="A + 1.0"
+
+# Set inputs in elmfire.data (rendered from elmfire.data.in in a single write)
+render_elmfire_data elmfire.data.in $INPUTS/elmfire.data \
+   COMPUTATIONAL_DOMAIN_XLLCORNER=$XMIN \
+   COMPUTATIONAL_DOMAIN_YLLCORNER=$YMIN \
+   COMPUTATIONAL_DOMAIN_CELLSIZE=$CELLSIZE \
+   SIMULATION_TSTOP=$SIMULATION_TSTOP \
+   LH_MOISTURE_CONTENT=$LH_MOISTURE_CONTENT \
+   LW_MOISTURE_CONTENT=$LW_MOISTURE_CONTENT \
+   A_SRS="$A_SRS"
 
 # Execute ELMFIRE
 elmfire_$ELMFIRE_VER ./inputs/elmfire.data
 
 # Postprocess
 for f in ./outputs/*.bil; do
-   gdal_translate -a_srs "$A_SRS" -co "COMPRESS=DEFLATE" -co "ZLEVEL=9" $f ./outputs/`basename $f | cut -d. -f1`.tif
+   gdal_translate -a_srs "$A_SRS" $(raster_co -co float) $f ./outputs/`basename $f | cut -d. -f1`.tif
 done
 # gdal_contour -i 3600 `ls ./outputs/time_of_arrival*.tif` ./outputs/hourly_isochrones.shp
 
@@ -13,6 +13,10 @@ import rasterio
 from pathlib import Path
 import time
 import csv
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from elmfire_namelist import ElmfireNamelist
 
 def calculate_burned_area(time_arrival_file):
     """Calculate burned area in acres from time of arrival raster"""
@@ -46,22 +50,15 @@ def extract_all_parameters_from_elmfire_data():
     params = {}
     
     try:
-        with open('./inputs/elmfire.data', 'r') as f:
-            content = f.read()
-        
-        import re
+        config = ElmfireNamelist.read('./inputs/elmfire.data')
         
         # Extract ignition coordinates
-        x_match = re.search(r'X_IGN\(1\)\s*=\s*([0-9.-]+)', content)
-        y_match = re.search(r'Y_IGN\(1\)\s*=\s*([0-9.-]+)', content)
-        params['x_ignition'] = float(x_match.group(1)) if x_match else 0.0
-        params['y_ignition'] = float(y_match.group(1)) if y_match else 0.0
+        params['x_ignition'] = float(config.get('X_IGN(1)', 0.0))
+        params['y_ignition'] = float(config.get('Y_IGN(1)', 0.0))
         
         # Extract live moisture values
-        lh_match = re.search(r'LH_MOISTURE_CONTENT\s*=\s*([0-9.-]+)', content)
-        lw_match = re.search(r'LW_MOISTURE_CONTENT\s*=\s*([0-9.-]+)', content)
-        params['live_herbaceous'] = float(lh_match.group(1)) if lh_match else np.nan
-        params['live_woody'] = float(lw_match.group(1)) if lw_match else np.nan
+        params['live_herbaceous'] = float(config.get('LH_MOISTURE_CONTENT', np.nan))
+        params['live_woody'] = float(config.get('LW_MOISTURE_CONTENT', np.nan))
         
     except Exception as e:
         print(f"    Warning: Could not extract parameters from elmfire.data: {e}")
@@ -127,20 +124,18 @@ def modify_elmfire_config(x_ign, y_ign):
     config_path = "elmfire.data.in"
     
     # Read the config
-    with open(config_path, 'r') as f:
-        content = f.read()
+    config = ElmfireNamelist.read(config_path)
     
     # Set ignition coordinates
-    import re
-    content = re.sub(r'X_IGN\(1\)\s*=\s*[0-9.-]+', f'X_IGN(1)      = {x_ign:.1f}', content)
-    content = re.sub(r'Y_IGN\(1\)\s*=\s*[0-9.-]+', f'Y_IGN(1)      = {y_ign:.1f}', content)
+    config.set('X_IGN(1)', round(x_ign, 1))
+    config.set('Y_IGN(1)', round(y_ign, 1))
     
     # Ensure Monte Carlo is enabled but with single ignition (not random ignitions)
-    content = content.replace('RANDOM_IGNITIONS = .TRUE.', 'RANDOM_IGNITIONS = .FALSE.')
+    if config.get('RANDOM_IGNITIONS') is True:
+        config.set('RANDOM_IGNITIONS', False)
     
     # Write modified config
-    with open(config_path, 'w') as f:
-        f.write(content)
+    config.write(config_path)
 
 def generate_random_parameters():
     """Generate random slope and aspect values"""
@@ -0,0 +1,105 @@
+# this script measures the speed/size trade-off of the GeoTIFF codec settings on our own
+# rasters, to choose the campaign codec policy (RASTER_CODEC, RASTER_LEVEL, RASTER_PREDICTOR
+# in functions.sh). Every raster found under the given directories is rewritten with each
+# setting, and the mean write time, read time and bytes are reported per raster type
+# (time_of_arrival, flin, vs, fbfm40, ...).
+#
+# Usage:
+#   python3 benchmark_codecs.py ../01-dataset/cases/case_1 ../01-dataset/inputs [--repeat 5] [--out codecs.csv]
+
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import rasterio
+
+# (RASTER_CODEC, RASTER_LEVEL, RASTER_PREDICTOR) settings to compare
+SETTINGS = [
+    ('NONE', None, 1),
+    ('LZW', None, 1),
+    ('LZW', None, 2),
+    ('DEFLATE', 1, 1),
+    ('DEFLATE', 6, 1),
+    ('DEFLATE', 9, 1),
+    ('DEFLATE', 1, 2),
+    ('DEFLATE', 6, 3),
+    ('ZSTD', 1, 1),
+    ('ZSTD', 9, 1),
+    ('ZSTD', 1, 2),
+    ('ZSTD', 9, 3),
+]
+
+# raster type from the file name, e.g. time_of_arrival_0000001_0022100.tif -> time_of_arrival
+def raster_type(path):
+    return re.sub(r'(_\d+)+$', '', os.path.splitext(os.path.basename(path))[0])
+
+# GTiff creation options for one setting, matching raster_co in functions.sh
+def creation_options(codec, level, predictor, dtype):
+    options = {'compress': codec}
+    if codec == 'DEFLATE':
+        options['zlevel'] = level
+    elif codec == 'ZSTD':
+        options['zstd_level'] = level
+    if codec != 'NONE':
+        if predictor == 3 and not np.issubdtype(np.dtype(dtype), np.floating):
+            predictor = 2
+        if predictor != 1:
+            options['predictor'] = predictor
+    return options
+
+def benchmark(paths, settings=SETTINGS, repeat=5):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            with rasterio.open(path) as src:
+                data = src.read()
+                profile = src.profile.copy()
+            for codec, level, predictor in settings:
+                out = os.path.join(tmp, 'bench.tif')
+                write_profile = {k: v for k, v in profile.items()
+                                 if k not in ('compress', 'zlevel', 'zstd_level', 'predictor')}
+                write_profile.update(driver='GTiff', **creation_options(codec, level, predictor, profile['dtype']))
+
+                write_times, read_times = [], []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    with rasterio.open(out, 'w', **write_profile) as dst:
+                        dst.write(data)
+                    write_times.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    with rasterio.open(out) as src:
+                        src.read()
+                    read_times.append(time.perf_counter() - start)
+
+                rows.append({
+                    'raster_type': raster_type(path), 'codec': codec, 'level': level, 'predictor': predictor,
+                    'write_ms': 1000 * np.median(write_times), 'read_ms': 1000 * np.median(read_times),
+                    'bytes': os.path.getsize(out)
+                })
+    df = pd.DataFrame(rows)
+    return df.groupby(['raster_type', 'codec', 'level', 'predictor'], dropna=False).mean().reset_index()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GeoTIFF codec settings on ELMFIRE rasters")
+    parser.add_argument("dirs", nargs="+", help="Directories with .tif rasters (case outputs, inputs)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per raster and setting")
+    parser.add_argument("--out", default=None, help="Optional CSV file for the results")
+    args = parser.parse_args()
+
+    paths = sorted(p for d in args.dirs for p in glob.glob(os.path.join(d, '*.tif')))
+    if not paths:
+        print("No .tif rasters found")
+        sys.exit(1)
+
+    results = benchmark(paths, repeat=args.repeat)
+    pd.set_option('display.width', 200)
+    print(results.to_string(index=False, float_format='%.2f'))
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"Saved results to {args.out}")
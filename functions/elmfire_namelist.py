@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+In-memory model of the Fortran namelists in elmfire.data.
+
+The template (elmfire.data.in) is parsed once into groups (&INPUTS, &OUTPUTS,
+&COMPUTATIONAL_DOMAIN, &TIME_CONTROL, &SIMULATOR, ...). Values can then be
+read and changed in memory, including indexed arrays like X_IGN(n), and the
+run's elmfire.data is rendered with a single write. Lines that are not
+changed (comments, blank lines, untouched keys) are written back verbatim.
+
+Command line use (replaces a series of replace_line calls):
+    python3 elmfire_namelist.py elmfire.data.in ./inputs/elmfire.data \
+        COMPUTATIONAL_DOMAIN_XLLCORNER=-1920.0 A_SRS='EPSG: 32610' X_IGN(1)=10.0
+"""
+
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+_GROUP_START_RE = re.compile(r'^\s*&([A-Za-z_][A-Za-z0-9_]*)\s*$')
+_GROUP_END_RE = re.compile(r'^\s*/\s*$')
+_ENTRY_RE = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(?:\(\s*(\d+)\s*\))?\s*=\s*(.*?)\s*$')
+_KEY_RE = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(?:\(\s*(\d+)\s*\))?\s*$')
+_INT_RE = re.compile(r'^[+-]?\d+$')
+_FLOAT_RE = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eEdD][+-]?\d+)?$')
+
+
+def split_key(key: str) -> Tuple[str, Optional[int]]:
+    """Split 'X_IGN(2)' into ('X_IGN', 2) and 'DTDUMP' into ('DTDUMP', None)."""
+    match = _KEY_RE.match(key)
+    if not match:
+        raise ValueError(f"Invalid namelist key: {key}")
+    name, index = match.groups()
+    return name.upper(), int(index) if index is not None else None
+
+
+def _strip_comment(text: str) -> str:
+    """Remove a trailing '!' comment that is not inside a quoted string."""
+    quote = None
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '!':
+            return text[:i]
+    return text
+
+
+def _split_values(text: str) -> List[str]:
+    """Split a comma separated value list, ignoring commas inside quotes."""
+    parts, current, quote = [], '', None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == ',':
+            parts.append(current.strip())
+            current = ''
+            continue
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def parse_value(text: str, bare_strings: bool = False) -> Any:
+    """Convert a Fortran namelist literal to a Python value.
+
+    Quoted strings become str, .TRUE./.FALSE. become bool, integers and reals
+    become int and float. A comma separated list becomes a list. With
+    bare_strings=True, unquoted text that is not a number or logical is kept
+    as a string (used for command line overrides).
+    """
+    text = _strip_comment(text).strip()
+    parts = _split_values(text)
+    if len(parts) > 1:
+        return [parse_value(part, bare_strings) for part in parts]
+
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"'):
+        return text[1:-1]
+    if text.upper() in ('.TRUE.', 'T', '.T.'):
+        return True
+    if text.upper() in ('.FALSE.', 'F', '.F.'):
+        return False
+    if _INT_RE.match(text):
+        return int(text)
+    if _FLOAT_RE.match(text):
+        return float(text.replace('d', 'e').replace('D', 'e'))
+    if bare_strings:
+        return text
+    raise ValueError(f"Cannot parse namelist value: {text}")
+
+
+def format_value(value: Any) -> str:
+    """Convert a Python value to a Fortran namelist literal."""
+    if hasattr(value, 'item') and not isinstance(value, (list, tuple, str)):
+        value = value.item()  # numpy scalar
+    if isinstance(value, (list, tuple)):
+        return ', '.join(format_value(v) for v in value)
+    if isinstance(value, bool):
+        return '.TRUE.' if value else '.FALSE.'
+    if isinstance(value, str):
+        return f"'{value}'"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class ElmfireNamelist:
+    """Ordered namelist groups parsed from an elmfire.data template.
+
+    Each group keeps its lines in order. A line is either raw text (comments,
+    blank lines) or an entry dict with 'name', 'index', 'value' and the
+    original 'raw' line, which is reused when the value has not changed.
+    Text between groups is kept in `leading` (before each group) and
+    `trailer` (after the last group).
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, List[Any]] = {}
+        self.leading: Dict[str, List[str]] = {}
+        self.trailer: List[str] = []
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ElmfireNamelist':
+        """Parse the contents of an elmfire.data file."""
+        namelist = cls()
+        current = None
+        outside: List[str] = []
+        for line in text.splitlines():
+            start = _GROUP_START_RE.match(line)
+            if current is None:
+                if start:
+                    current = start.group(1).upper()
+                    namelist.groups[current] = []
+                    namelist.leading[current] = outside
+                    outside = []
+                else:
+                    outside.append(line)
+                continue
+
+            if _GROUP_END_RE.match(line):
+                current = None
+                continue
+
+            entry = _ENTRY_RE.match(_strip_comment(line))
+            if entry:
+                name, index, value = entry.groups()
+                namelist.groups[current].append({
+                    'name': name.upper(),
+                    'index': int(index) if index is not None else None,
+                    'value': parse_value(value, bare_strings=True),
+                    'raw': line,
+                    'changed': False,
+                })
+            else:
+                namelist.groups[current].append(line)
+
+        if current is not None:
+            raise ValueError(f"Namelist group &{current} is not terminated with '/'")
+        namelist.trailer = outside
+        return namelist
+
+    @classmethod
+    def read(cls, filepath: str) -> 'ElmfireNamelist':
+        """Parse an elmfire.data(.in) file."""
+        with open(filepath, 'r') as f:
+            return cls.from_text(f.read())
+
+    def _entries(self, group: Optional[str] = None):
+        groups = [group.upper()] if group else list(self.groups)
+        for group_name in groups:
+            for item in self.groups[group_name]:
+                if isinstance(item, dict):
+                    yield group_name, item
+
+    def _find(self, name: str, index: Optional[int]) -> Tuple[Optional[str], Optional[dict]]:
+        for group_name, entry in self._entries():
+            if entry['name'] == name and entry['index'] == index:
+                return group_name, entry
+        return None, None
+
+    def group_of(self, key: str) -> Optional[str]:
+        """Return the group that defines a key (any index for arrays)."""
+        name, _ = split_key(key)
+        for group_name, entry in self._entries():
+            if entry['name'] == name:
+                return group_name
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value, e.g. get('SIMULATION_TSTOP') or get('X_IGN(1)')."""
+        _, entry = self._find(*split_key(key))
+        return entry['value'] if entry else default
+
+    def get_array(self, name: str) -> List[Any]:
+        """Get the values of an indexed array (X_IGN(1), X_IGN(2), ...) in index order."""
+        name = name.upper()
+        entries = [e for _, e in self._entries() if e['name'] == name and e['index'] is not None]
+        return [e['value'] for e in sorted(entries, key=lambda e: e['index'])]
+
+    def set(self, key: str, value: Any, group: Optional[str] = None):
+        """Set a value. New keys go to the end of `group`, or after the
+        existing elements of the same array."""
+        name, index = split_key(key)
+        group_name, entry = self._find(name, index)
+        if entry is not None:
+            entry['value'] = value
+            entry['changed'] = True
+            return
+
+        group_name = group.upper() if group else self.group_of(name)
+        if group_name is None:
+            raise KeyError(f"{key} is not in the template; specify the namelist group")
+        if group_name not in self.groups:
+            self.groups[group_name] = []
+            self.leading[group_name] = [''] if len(self.groups) > 1 else []
+
+        new_entry = {'name': name, 'index': index, 'value': value, 'raw': None, 'changed': True}
+        lines = self.groups[group_name]
+        position = None
+        for i, item in enumerate(lines):
+            if isinstance(item, dict) and item['name'] == name:
+                position = i + 1
+                if item['raw'] is not None:
+                    # line up with the other elements of the array
+                    new_entry['width'] = item['raw'].index('=')
+        if position is None:
+            # end of the group, before any trailing blank lines
+            position = len(lines)
+            while position > 0 and isinstance(lines[position - 1], str) and not lines[position - 1].strip():
+                position -= 1
+        lines.insert(position, new_entry)
+
+    def set_array(self, name: str, values: List[Any], group: Optional[str] = None):
+        """Set NAME(1..n) to `values`, removing any higher indices."""
+        name = name.upper()
+        for i, value in enumerate(values, start=1):
+            self.set(f"{name}({i})", value, group)
+        for group_name in self.groups:
+            self.groups[group_name] = [
+                item for item in self.groups[group_name]
+                if not (isinstance(item, dict) and item['name'] == name
+                        and item['index'] is not None and item['index'] > len(values))
+            ]
+
+    def update(self, values: Dict[str, Any]):
+        """Set several keys at once."""
+        for key, value in values.items():
+            self.set(key, value)
+
+    def copy(self) -> 'ElmfireNamelist':
+        """Return an independent copy (to render many runs from one template)."""
+        other = ElmfireNamelist()
+        other.leading = {name: list(lines) for name, lines in self.leading.items()}
+        other.trailer = list(self.trailer)
+        other.groups = {
+            name: [dict(item) if isinstance(item, dict) else item for item in lines]
+            for name, lines in self.groups.items()
+        }
+        return other
+
+    @staticmethod
+    def _render_entry(entry: dict) -> str:
+        if entry['raw'] is not None and not entry['changed']:
+            return entry['raw']
+        key = entry['name'] if entry['index'] is None else f"{entry['name']}({entry['index']})"
+        if entry['raw'] is not None:
+            # keep the original alignment up to the '='
+            prefix = entry['raw'][:entry['raw'].index('=') + 1]
+            return f"{prefix} {format_value(entry['value'])}"
+        if entry.get('width'):
+            return f"{key.ljust(entry['width'])}= {format_value(entry['value'])}"
+        return f"{key} = {format_value(entry['value'])}"
+
+    def render(self) -> str:
+        """Render the namelist groups as elmfire.data text."""
+        out = []
+        for group_name, lines in self.groups.items():
+            out.extend(self.leading.get(group_name, []))
+            out.append(f"&{group_name}")
+            for item in lines:
+                out.append(self._render_entry(item) if isinstance(item, dict) else item)
+            out.append('/')
+        out.extend(self.trailer)
+        return '\n'.join(out) + '\n'
+
+    def write(self, filepath: str):
+        """Write the rendered namelist in a single write."""
+        with open(filepath, 'w') as f:
+            f.write(self.render())
+
+
+def render_elmfire_data(template: str, output: str, overrides: Dict[str, Any]):
+    """Parse `template` once, apply `overrides` and write `output`."""
+    namelist = ElmfireNamelist.read(template)
+    namelist.update(overrides)
+    namelist.write(output)
+
+
+def parse_overrides(args: List[str]) -> Dict[str, Any]:
+    """Parse KEY=VALUE command line arguments."""
+    overrides = {}
+    for arg in args:
+        if '=' not in arg:
+            raise ValueError(f"Expected KEY=VALUE, got: {arg}")
+        key, value = arg.split('=', 1)
+        overrides[key.strip()] = parse_value(value, bare_strings=True)
+    return overrides
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python3 elmfire_namelist.py <template> <output> [KEY=VALUE ...]")
+        sys.exit(1)
+    render_elmfire_data(sys.argv[1], sys.argv[2], parse_overrides(sys.argv[3:]))
@@ -1,3 +1,5 @@
+FUNCTIONS_DIR=$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)
+
 function replace_line {
    MATCH_PATTERN=$1
    NEW_VALUE="$2"
@@ -12,6 +14,49 @@ function replace_line {
    fi
 }
 
+# Render elmfire.data from a template in a single write. Overrides are given
+# as KEY=VALUE arguments, e.g. SIMULATION_TSTOP=22100.0 "X_IGN(1)=10.0"
+function render_elmfire_data {
+   local TEMPLATE=$1
+   local OUTPUT=$2
+   shift 2
+
+   python3 $FUNCTIONS_DIR/elmfire_namelist.py "$TEMPLATE" "$OUTPUT" "$@"
+}
+
+# Raster codec policy for the GeoTIFFs written by 01-run.sh, set once per campaign
+# (see 0N-run.sh and benchmark_codecs.py for measured trade-offs):
+#   RASTER_CODEC      NONE | LZW | DEFLATE | ZSTD         (default DEFLATE)
+#   RASTER_LEVEL      ZLEVEL (1-9) or ZSTD_LEVEL (1-22)   (default 9)
+#   RASTER_PREDICTOR  1 none, 2 horizontal, 3 floating point (default 1; 3 falls back to 2 for int rasters)
+# Prints the creation options, e.g. `raster_co -co float` -> -co COMPRESS=DEFLATE -co ZLEVEL=9
+function raster_co {
+   local FLAG=${1:--co}
+   local KIND=${2:-float}
+   local CODEC=${RASTER_CODEC:-DEFLATE}
+   local LEVEL=${RASTER_LEVEL:-9}
+   local PREDICTOR=${RASTER_PREDICTOR:-1}
+
+   CODEC=${CODEC^^}
+   if [ "$CODEC" = "NONE" ]; then
+      echo "$FLAG COMPRESS=NONE"
+      return
+   fi
+   local OPTS="$FLAG COMPRESS=$CODEC"
+   if [ "$CODEC" = "DEFLATE" ]; then
+      OPTS="$OPTS $FLAG ZLEVEL=$LEVEL"
+   elif [ "$CODEC" = "ZSTD" ]; then
+      OPTS="$OPTS $FLAG ZSTD_LEVEL=$LEVEL"
+   fi
+   if [ "$PREDICTOR" = "3" ] && [ "$KIND" = "int" ]; then
+      PREDICTOR=2
+   fi
+   if [ "$PREDICTOR" != "1" ]; then
+      OPTS="$OPTS $FLAG PREDICTOR=$PREDICTOR"
+   fi
+   echo "$OPTS"
+}
+
 function create_transient_inputs {
    local WX_INPUTS_FILE=$1
 
@@ -31,7 +76,7 @@ function create_transient_inputs {
          gdal_calc.py -A $SCRATCH/float.tif --NoDataValue=-9999 --type=Float32 --outfile="$FNOUT" --calc="A + $VAL"
          let "TIMESTEP=TIMESTEP+1"
       done < $SCRATCH/wx.csv
-      gdal_merge.py -separate -n -9999 -init -9999 -a_nodata -9999 -co "COMPRESS=DEFLATE" -co "ZLEVEL=9" -o $INPUTS/$QUANTITY.tif $FNLIST
+      gdal_merge.py -separate -n -9999 -init -9999 -a_nodata -9999 $(raster_co -co float) -o $INPUTS/$QUANTITY.tif $FNLIST
    done
 
 }
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Windowed GeoTIFF reads bounded to the burned extent of a case.
+
+Most of a 128 x 128 case domain never burns. The per-case summaries
+(01-dataset/case_summary.py) record the burned bounding box, and the loaders
+(analysis, postprocessing, reference scripts) read only that window of each
+raster.
+"""
+
+import numpy as np
+from rasterio.windows import Window
+from typing import Mapping, Optional, Tuple
+
+
+def bbox_window(summary: Mapping, padding: int = 0) -> Window:
+    """Window of the burned bounding box in a case summary row, grown by padding cells.
+
+    An unburned case gives an empty window. With padding the window may extend
+    past the domain; read_window clips it or fills the outside with nodata.
+    """
+    if summary['burned_cells'] == 0:
+        return Window(0, 0, 0, 0)
+    return Window.from_slices((int(summary['row_min']) - padding, int(summary['row_max']) + 1 + padding),
+                              (int(summary['col_min']) - padding, int(summary['col_max']) + 1 + padding),
+                              boundless=True)
+
+
+def read_window(src, window: Window = None, pad_nodata: bool = False) -> Tuple[np.ndarray, Optional[Window]]:
+    """Band 1 of an open raster, optionally only a window of it.
+
+    Parts of the window outside the raster are clipped, or filled with nodata
+    (-9999 if unset) with pad_nodata. Returns the data and the window that was
+    read (None for the full raster), for window transforms.
+    """
+    if window is None:
+        return src.read(1), None
+    if not pad_nodata and window.width and window.height:
+        window = window.intersection(Window(0, 0, src.width, src.height))
+    data = src.read(1, window=window, boundless=pad_nodata,
+                    fill_value=src.nodata if src.nodata is not None else -9999)
+    return data, window
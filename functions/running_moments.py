@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Shared pieces of the mergeable running statistics.
+
+Both the per-channel statistics of the processed cases
+(01-test-postprocess/channel_stats.py) and the parameter covariance of a
+campaign (01-dataset/param_stats.py) keep a count, a mean and a second
+moment, combine partial results with Chan's parallel formula and save
+themselves as JSON files that other processes read while a campaign runs.
+"""
+
+import os
+import json
+import tempfile
+import numpy as np
+from typing import Any, Tuple
+
+
+def chan_merge(count_a: int, mean_a, m2_a, count_b: int, mean_b, m2_b) -> Tuple[int, Any, Any]:
+    """Combine (count, mean, second moment) of two disjoint sets of values.
+
+    Means may be scalars (second moment sum((x - mean)^2)) or vectors (co-moment
+    matrix sum((x - mean)(x - mean)^T)); merging gives the same result as one
+    pass over both sets (Chan et al.).
+    """
+    count = count_a + count_b
+    if count_b == 0:
+        return count_a, mean_a, m2_a
+    delta = mean_b - mean_a
+    m2 = m2_a + m2_b + np.multiply.outer(delta, delta) * count_a * count_b / count
+    return count, mean_a + delta * count_b / count, m2
+
+
+def write_json_atomic(obj: Any, path: str):
+    """Write obj as JSON to path so that readers never see a partial file.
+
+    The data goes to a uniquely named temporary file in the same directory,
+    which is moved into place; concurrent writers do not share a temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(obj, f)
+        # mkstemp creates the file readable by its owner only; use the usual mode for new files
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the GeoTIFF codec benchmark.
+"""
+
+import os
+import tempfile
+import subprocess
+import numpy as np
+import rasterio
+from pathlib import Path
+from rasterio.transform import from_origin
+from benchmark_codecs import SETTINGS, raster_type, creation_options, benchmark
+
+FUNCTIONS_SH = Path(__file__).resolve().parent / 'functions.sh'
+
+def raster_co(codec, level, predictor, kind):
+    """Creation options printed by raster_co in functions.sh, as a dict like creation_options."""
+    env = dict(os.environ, RASTER_CODEC=codec, RASTER_LEVEL=str(level or 9), RASTER_PREDICTOR=str(predictor))
+    out = subprocess.run(['bash', '-c', f'source {FUNCTIONS_SH}; raster_co -co {kind}'],
+                         env=env, capture_output=True, text=True, check=True).stdout.split()
+    options = dict(option.split('=') for option in out[1::2])
+    return {key.lower(): int(value) if value.isdigit() else value for key, value in options.items()}
+
+def write_tif(data, path):
+    with rasterio.open(path, 'w', driver='GTiff', height=data.shape[0], width=data.shape[1], count=1,
+                       dtype=data.dtype, transform=from_origin(-60, 60, 30, 30), nodata=-9999) as dst:
+        dst.write(data, 1)
+
+def test_raster_type():
+    assert raster_type('cases/case_1/time_of_arrival_0000001_0022100.tif') == 'time_of_arrival'
+    assert raster_type('inputs/fbfm40.tif') == 'fbfm40'
+
+def test_creation_options_match_functions_sh():
+    """Every benchmarked setting gives the options 01-run.sh would use for that policy."""
+    assert creation_options('NONE', None, 2, 'float32') == {'compress': 'NONE'}
+    assert creation_options('DEFLATE', 6, 3, 'int16') == {'compress': 'DEFLATE', 'zlevel': 6, 'predictor': 2}
+    for codec, level, predictor in SETTINGS:
+        for dtype, kind in (('float32', 'float'), ('int16', 'int')):
+            assert creation_options(codec, level, predictor, dtype) == raster_co(codec, level, predictor, kind)
+
+def test_benchmark_rows():
+    """One row per raster type and setting; compression shrinks a smooth raster."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rows, cols = np.indices((64, 64))
+        write_tif((rows * 30.0 + cols).astype(np.float32), Path(temp_dir) / 'time_of_arrival_0000001_0003600.tif')
+        write_tif(np.full((64, 64), 102, dtype=np.int16), Path(temp_dir) / 'fbfm40.tif')
+        settings = [('NONE', None, 1), ('DEFLATE', 9, 3)]
+        paths = sorted(str(p) for p in Path(temp_dir).glob('*.tif'))
+        results = benchmark(paths, settings, repeat=1)
+
+    assert len(results) == 4
+    assert set(results['raster_type']) == {'time_of_arrival', 'fbfm40'}
+    assert (results['write_ms'] > 0).all() and (results['read_ms'] > 0).all()
+    for _, group in results.groupby('raster_type'):
+        sizes = group.set_index('codec')['bytes']
+        assert sizes['DEFLATE'] < sizes['NONE']
+
+if __name__ == "__main__":
+    for test in [test_raster_type, test_creation_options_match_functions_sh, test_benchmark_rows]:
+        test()
+        print(f"✓ {test.__name__}")
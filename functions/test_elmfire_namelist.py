@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the elmfire.data namelist reader/writer.
+"""
+
+import tempfile
+from pathlib import Path
+from elmfire_namelist import ElmfireNamelist, parse_overrides, render_elmfire_data
+
+TEMPLATE = """&OUTPUTS
+OUTPUTS_DIRECTORY    = './outputs'
+DTDUMP               = 3600.
+DUMP_FLIN            = .TRUE.
+/
+
+&COMPUTATIONAL_DOMAIN
+A_SRS = 'EPSG: 32610'
+COMPUTATIONAL_DOMAIN_CELLSIZE = 30
+/
+
+&SIMULATOR
+! single ignition
+NUM_IGNITIONS = 1
+X_IGN(1)      = 1147.5
+Y_IGN(1)      = 1029.3
+/
+"""
+
+
+def test_round_trip_unchanged():
+    """An unmodified template renders back verbatim."""
+    namelist = ElmfireNamelist.from_text(TEMPLATE)
+    assert namelist.render() == TEMPLATE
+
+
+def test_typed_values():
+    """Values are converted to Python types."""
+    namelist = ElmfireNamelist.from_text(TEMPLATE)
+    assert namelist.get('DTDUMP') == 3600.0
+    assert namelist.get('DUMP_FLIN') is True
+    assert namelist.get('A_SRS') == 'EPSG: 32610'
+    assert namelist.get('COMPUTATIONAL_DOMAIN_CELLSIZE') == 30
+    assert namelist.get('X_IGN(1)') == 1147.5
+    assert namelist.get('MISSING', 'default') == 'default'
+
+
+def test_set_values_and_arrays():
+    """Setting scalars keeps alignment and arrays grow and shrink in place."""
+    namelist = ElmfireNamelist.from_text(TEMPLATE)
+    namelist.set('DTDUMP', 900.0)
+    namelist.set('NUM_IGNITIONS', 3)
+    namelist.set_array('X_IGN', [1.0, 2.0, 3.0])
+    text = namelist.render()
+    assert 'DTDUMP               = 900.0' in text
+    assert 'X_IGN(3)      = 3.0' in text
+    assert text.index('X_IGN(3)') < text.index('Y_IGN(1)')
+    assert ElmfireNamelist.from_text(text).get_array('X_IGN') == [1.0, 2.0, 3.0]
+
+    namelist.set_array('X_IGN', [5.0])
+    assert namelist.get_array('X_IGN') == [5.0]
+    assert 'X_IGN(2)' not in namelist.render()
+
+
+def test_new_key_needs_group():
+    """Keys missing from the template are added to the named group."""
+    namelist = ElmfireNamelist.from_text(TEMPLATE)
+    try:
+        namelist.set('T_IGN(1)', 0.0)
+        assert False, "expected KeyError"
+    except KeyError:
+        pass
+    namelist.set('T_IGN(1)', 0.0, group='SIMULATOR')
+    assert ElmfireNamelist.from_text(namelist.render()).group_of('T_IGN') == 'SIMULATOR'
+
+
+def test_render_with_overrides():
+    """Command line style overrides are applied in a single write."""
+    overrides = parse_overrides(['A_SRS=EPSG: 32611', 'COMPUTATIONAL_DOMAIN_CELLSIZE=30.0', 'X_IGN(1)=-10'])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template = Path(temp_dir) / 'elmfire.data.in'
+        output = Path(temp_dir) / 'elmfire.data'
+        template.write_text(TEMPLATE)
+        render_elmfire_data(str(template), str(output), overrides)
+        rendered = ElmfireNamelist.read(str(output))
+    assert rendered.get('A_SRS') == 'EPSG: 32611'
+    assert rendered.get('COMPUTATIONAL_DOMAIN_CELLSIZE') == 30.0
+    assert rendered.get('X_IGN(1)') == -10
+
+
+if __name__ == "__main__":
+    for test in [test_round_trip_unchanged, test_typed_values, test_set_values_and_arrays,
+                 test_new_key_needs_group, test_render_with_overrides]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared running-statistics helpers.
+"""
+
+import os
+import json
+import tempfile
+import numpy as np
+from pathlib import Path
+from running_moments import chan_merge, write_json_atomic
+
+def test_chan_merge_scalar_and_vector():
+    """Merging two halves gives the moments of the whole, for scalars and vectors."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(30, 3))
+    a, b = values[:7], values[7:]
+    moments = [(len(x), x.mean(axis=0), (x - x.mean(axis=0)).T @ (x - x.mean(axis=0))) for x in (a, b)]
+    count, mean, comoment = chan_merge(*moments[0], *moments[1])
+    centered = values - values.mean(axis=0)
+    assert count == 30
+    assert np.allclose(mean, values.mean(axis=0)) and np.allclose(comoment, centered.T @ centered)
+
+    column = values[:, 0]
+    count, mean, m2 = chan_merge(7, a[:, 0].mean(), ((a[:, 0] - a[:, 0].mean()) ** 2).sum(),
+                                 23, b[:, 0].mean(), ((b[:, 0] - b[:, 0].mean()) ** 2).sum())
+    assert np.isclose(mean, column.mean()) and np.isclose(m2 / count, column.var())
+    assert chan_merge(5, 1.0, 2.0, 0, 0.0, 0.0) == (5, 1.0, 2.0)
+
+def test_write_json_atomic():
+    """The file is replaced in one step with the usual permissions and no temporary file is left."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'stats.json'
+        write_json_atomic({'count': 1}, str(path))
+        write_json_atomic({'count': 2}, str(path))
+        assert json.loads(path.read_text()) == {'count': 2}
+        assert os.listdir(temp_dir) == ['stats.json']
+        umask = os.umask(0)
+        os.umask(umask)
+        assert path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+if __name__ == "__main__":
+    for test in [test_chan_merge_scalar_and_vector, test_write_json_atomic]:
+        test()
+        print(f"✓ {test.__name__}")
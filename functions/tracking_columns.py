@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Columns of the campaign tracking file (input_tracking.txt).
+
+Each row is the run number followed by TRACKING_COLUMNS, in this order, and
+firearea once it is known (backfill_firearea.py keeps it last). The columns
+in FLOAT_COLUMNS are written with one decimal, the others as integers.
+Shared by the campaign scripts in 01-dataset and the postprocessing in
+01-test-postprocess.
+"""
+
+TRACKING_COLUMNS = ['xign', 'yign', 'fuel', 'slp', 'asp', 'ws', 'wd', 'm1', 'm10', 'm100',
+                    'cc', 'ch', 'cbh', 'cbd', 'lhc', 'lwc']
+FLOAT_COLUMNS = ['xign', 'yign', 'ws', 'wd', 'm1', 'm10', 'm100', 'lhc', 'lwc']
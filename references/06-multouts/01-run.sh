@@ -36,7 +36,8 @@ A_SRS="EPSG: 32610" # Spatial reference system - UTM Zone 10
 
 ELMFIRE_VER=${ELMFIRE_VER:-2025.0212}
 
-. ../functions/functions.sh
+# functions.sh is two levels up from this reference copy
+. "$(dirname "${BASH_SOURCE[0]}")/../../functions/functions.sh"
 
 XMIN=`echo "0.0 - 0.5 * $DOMAINSIZE" | bc -l`
 XMAX=`echo "0.0 + 0.5 * $DOMAINSIZE" | bc -l`
@@ -63,16 +64,16 @@ gdalwarp -dstnodata -9999 -ot Int16   -tr $TR -te $TE $SCRATCH/dummy.tif $SCRATC
 
 # Create float input rasters
 for i in $(eval echo "{1..$NUM_FLOAT_RASTERS}"); do
-   gdal_calc.py -A $SCRATCH/float.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/${FLOAT_RASTER[i]}.tif" --calc="A + ${FLOAT_VAL[i]}"
+   gdal_calc.py -A $SCRATCH/float.tif $(raster_co --co float) --NoDataValue=-9999 --outfile="$INPUTS/${FLOAT_RASTER[i]}.tif" --calc="A + ${FLOAT_VAL[i]}"
 done
 
 # Create integer input rasters
 for i in $(eval echo "{1..$NUM_INT_RASTERS}"); do
-   gdal_calc.py -A $SCRATCH/int.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/${INT_RASTER[i]}.tif" --calc="A + ${INT_VAL[i]}"
+   gdal_calc.py -A $SCRATCH/int.tif $(raster_co --co int) --NoDataValue=-9999 --outfile="$INPUTS/${INT_RASTER[i]}.tif" --calc="A + ${INT_VAL[i]}"
 done
 
 # Create the ignition mask (1.0 in all cells)
-# gdal_calc.py -A $SCRATCH/float.tif --co="COMPRESS=DEFLATE" --co="ZLEVEL=9" --NoDataValue=-9999 --outfile="$INPUTS/ignition_mask.tif" --calc="A + 1.0"
+# gdal_calc.py -A $SCRATCH/float.tif $(raster_co --co float) --NoDataValue=-9999 --outfile="$INPUTS/ignition_mask.tif" --calc="A + 1.0"
 
 # Set inputs in elmfire.data
 replace_line COMPUTATIONAL_DOMAIN_XLLCORNER $XMIN no
@@ -88,7 +89,7 @@ elmfire_$ELMFIRE_VER ./inputs/elmfire.data
 
 # Postprocess
 for f in ./outputs/*.bil; do
-   gdal_translate -a_srs "$A_SRS" -co "COMPRESS=DEFLATE" -co "ZLEVEL=9" $f ./outputs/`basename $f | cut -d. -f1`.tif
+   gdal_translate -a_srs "$A_SRS" $(raster_co -co float) $f ./outputs/`basename $f | cut -d. -f1`.tif
 done
 # gdal_contour -i 3600 `ls ./outputs/time_of_arrival*.tif` ./outputs/hourly_isochrones.shp
 
@@ -0,0 +1,102 @@
+#!/bin/bash
+
+# 0N-sims.sh - Run ELMFIRE once and dump the outputs at every target timestep
+# ELMFIRE writes time_of_arrival, flin and vs rasters every DTDUMP seconds, so a single
+# simulation up to the last target time produces all T timesteps. (This script used to
+# rerun the whole simulation once per SIMULATION_TSTOP, repeating all the work for every
+# earlier time.) mult_outs_postprocess.py reads the dumped rasters from the results
+# directory directly into the (timesteps, channel, h, w) case array.
+#
+# Usage, from a campaign directory with 01-run.sh and elmfire.data.in (e.g. 01-dataset):
+#   bash ../references/full-sim-mult-timesteps/0N-sims.sh [DTDUMP] [SIMULATION_TSTOP]
+
+# Configuration: dump interval and last timestep (in seconds)
+DTDUMP=${1:-1800}              # 30 minutes
+SIMULATION_TSTOP=${2:-21600}   # 6 hours
+
+# Directory for the dumped rasters of this simulation
+RESULTS_BASE_DIR="./mult_timestep_outputs"
+
+# functions.sh lives two levels up, next to references/
+. "$(dirname "${BASH_SOURCE[0]}")/../../functions/functions.sh"
+
+for f in 01-run.sh elmfire.data.in; do
+    if [ ! -f "$f" ]; then
+        echo "Error: $f not found in $(pwd); run this script from a campaign directory"
+        exit 1
+    fi
+done
+
+# Backup the original 01-run.sh and elmfire.data.in files
+if [ ! -f "01-run.sh.backup" ]; then
+    echo "Creating backup of original 01-run.sh..."
+    cp 01-run.sh 01-run.sh.backup
+fi
+if [ ! -f "elmfire.data.in.backup" ]; then
+    cp elmfire.data.in elmfire.data.in.backup
+fi
+
+# Function to restore original files
+restore() {
+    echo "Restoring original 01-run.sh and elmfire.data.in..."
+    cp 01-run.sh.backup 01-run.sh
+    cp elmfire.data.in.backup elmfire.data.in
+}
+
+# Set trap to restore on interrupt
+trap "restore; exit 1" INT TERM
+
+hours=$(echo "scale=2; $SIMULATION_TSTOP / 3600" | bc)
+echo "Starting ELMFIRE simulation to $SIMULATION_TSTOP seconds ($hours hours)"
+echo "Dumping outputs every $DTDUMP seconds to: $RESULTS_BASE_DIR"
+
+# Set the stop time in 01-run.sh and the dump interval in elmfire.data.in
+sed -i.tmp "s/^SIMULATION_TSTOP=.*/SIMULATION_TSTOP=$SIMULATION_TSTOP.0 # Simulation stop time (seconds)/" 01-run.sh
+rm -f 01-run.sh.tmp
+render_elmfire_data elmfire.data.in elmfire.data.in DTDUMP=$DTDUMP.0
+
+start_time=$(date +%s)
+if bash 01-run.sh; then
+    end_time=$(date +%s)
+    runtime=$((end_time - start_time))
+    echo "Simulation completed successfully in $runtime seconds"
+
+    rm -rf "$RESULTS_BASE_DIR"
+    mkdir -p "$RESULTS_BASE_DIR"
+    mv ./outputs/* "$RESULTS_BASE_DIR/"
+
+    # ELMFIRE only dumps every DTDUMP seconds if the dump outputs are enabled; with a single
+    # final raster per variable the case would silently have one timestep
+    expected_dumps=$(( SIMULATION_TSTOP / DTDUMP ))
+    num_dumps=$(ls "$RESULTS_BASE_DIR"/time_of_arrival_*.tif 2>/dev/null | wc -l)
+    if [ "$num_dumps" -ne "$expected_dumps" ]; then
+        echo "Error: found $num_dumps time_of_arrival dumps, expected $expected_dumps (TSTOP / DTDUMP)"
+        restore
+        exit 1
+    fi
+
+    # Create a summary file with simulation parameters
+    cat > "$RESULTS_BASE_DIR/simulation_info.txt" << EOF
+
+Simulation Parameters:
+====================
+Stop Time: $SIMULATION_TSTOP seconds ($hours hours)
+Output Interval: $DTDUMP seconds
+Runtime: $runtime seconds
+Date: $(date)
+
+Files Generated:
+$(ls -la $RESULTS_BASE_DIR)
+EOF
+else
+    echo "Error: Simulation failed"
+    restore
+    exit 1
+fi
+
+restore
+
+echo "========================================"
+echo "Simulation completed!"
+echo "Results are saved in: $RESULTS_BASE_DIR"
+echo "Run python3 mult_outs_postprocess.py to build the case array"
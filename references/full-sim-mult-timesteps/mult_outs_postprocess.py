@@ -1,22 +1,36 @@
 import numpy as np
 import os
+import sys
 import glob
+import argparse
 import rasterio
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'functions'))
+from raster_window import read_window
+
 # Desired shape: (timesteps, channel/band, h, w)
+# fire_data holds the dynamic channels; static channels (fuel model) are stored once
+# in static_data and broadcast over the timesteps by load_case
 
 # function to convert geotiff to numpy array
-def tif_to_npy(file_path, handle_nodata=True):
+def tif_to_npy(file_path, handle_nodata=True, window=None, pad_nodata=False):
     """
     Load a GeoTIFF file as a numpy array, optionally handling NoData values
+
+    If a rasterio window is given (e.g. case_summary.burned_window), only that
+    region is read and the returned metadata describes the window. Parts of the
+    window outside the raster are clipped, or filled with nodata if pad_nodata is set.
     """
     with rasterio.open(file_path) as src:
-        data = src.read(1)
+        meta = src.meta.copy()
+        data, window = read_window(src, window, pad_nodata)
+        if window is not None:
+            meta.update(height=data.shape[0], width=data.shape[1], transform=src.window_transform(window))
         # replace nodata values with nan if there are some
         if handle_nodata and src.nodata is not None:
             data = np.where(data==src.nodata, np.nan, data)
 
-        return data, src.meta
+        return data, meta
 
 # function to load multiptle timesteps
 def load_mult_timestep_elmfire_data(base_dir, variable_name):
@@ -75,86 +89,217 @@ def load_mult_timestep_elmfire_data(base_dir, variable_name):
     # convert sim_data to numpy array
     return sim_data, sim_metadata, timestep_metadata
 
-# load all 3 data types that we want, and load the fuel data (array and meta)
-# if it's the last timestep because they're all the same and cat to be the
-# desired shape: (timesteps, channel/band, h, w)
-desired_vars = ['flin', 'time_of_arrival', 'vs']
-
-all_fire_vars = []
-all_fire_meta = []
-
-for var in desired_vars:
-    var_data, sim_metadata, timestep_metadata = load_mult_timestep_elmfire_data(
-        base_dir='mult_timestep_outputs',
-        variable_name=var
-    )
-    stacked_var = np.stack(var_data, axis=0)  # shape: (timesteps, h, w)
-    all_fire_vars.append(stacked_var)
-    all_fire_meta.append({'var': var, 'meta': timestep_metadata})
-
-# get the number of timesteps for each variable
-ts_counts = [len(data) for data in all_fire_vars]
-
-# raise an error if the number of timesteps is not the same for all variables
-if len(set(ts_counts)) != 1:
-    raise ValueError("All variables must have the same number of timesteps")
-
-fuel_array, fuel_meta = tif_to_npy('./inputs/fbfm40.tif', handle_nodata=False)
-num_timesteps = ts_counts[0]
-
-if num_timesteps>1 and fuel_array is not None:
-    # fuel_array is (h, w), we need to expand it to (timesteps, h, w)
-    # assuming the number of timesteps is the same as the first variable
-    fuel_repeated = np.repeat(fuel_array[np.newaxis, ...], num_timesteps, axis=0)  # (timesteps, h, w)
-else:
-    # if num_timesteps is 1, we can just use the fuel_array as is
-    fuel_repeated = fuel_array[np.newaxis, ...]
-
-# concatenate all fire variables with the fuel data
-# fuel_repeated should be (timesteps, h, w)
-if len(all_fire_vars) > 0:
-    all_fire_vars = [np.expand_dims(var, axis=1) for var in all_fire_vars]  # add channel dimension
-    all_fire_vars = np.concatenate(all_fire_vars, axis=1)  # concatenate along channel dimension
-    fuel_prepped = np.expand_dims(fuel_repeated, axis=1)  # add channel dimension
-    all_fire_vars = np.concatenate([all_fire_vars, fuel_prepped], axis=1)
-
-# save the processed data in cases directory
-output_dir = './cases'
-os.makedirs(output_dir, exist_ok=True)
-case_dirs = glob.glob(os.path.join(output_dir, 'case_*'))
-
-print(case_dirs)
-if len(case_dirs)==0:
-    print('no cases yet')
-    new_case_num = 0
-else:
-    # get the maximum case number so we can save as the next case
+# read the stop time and dump interval that 0N-sims.sh records in simulation_info.txt
+def read_simulation_info(results_dir):
+    """
+    Return (tstop, dtdump) in seconds from simulation_info.txt, or (None, None) if it is missing
+    """
+    info_file = os.path.join(results_dir, 'simulation_info.txt')
+    tstop, dtdump = None, None
+    if os.path.exists(info_file):
+        with open(info_file, 'r') as f:
+            for line in f:
+                if line.startswith('Stop Time:'):
+                    tstop = float(line.split()[2])
+                elif line.startswith('Output Interval:'):
+                    dtdump = float(line.split()[2])
+    return tstop, dtdump
+
+def expected_dump_count(tstop, dtdump):
+    """Number of dumps of a run to tstop with a dump every dtdump seconds"""
+    return int(np.floor(tstop / dtdump + 1e-9))
+
+# function to load the rasters dumped every DTDUMP seconds by a single simulation
+def load_dumped_elmfire_data(outputs_dir, variable_name, expected_count=None):
+    """
+    Load every dump of a variable written by one ELMFIRE run
+    
+    ELMFIRE writes <variable>_<ensemble member>_<seconds>.bil every DTDUMP seconds
+    (converted to .tif by 01-run.sh), so one run up to the last target time gives all
+    the timesteps that previously needed one simulation each.
+
+    Parameters:
+    - outputs_dir: directory with the dumped rasters of one simulation
+    - variable_name: 'time_of_arrival', 'flin', or 'vs'
+    - expected_count: number of dumps expected (TSTOP / DTDUMP); a different number of
+      files raises a ValueError, e.g. when ELMFIRE only wrote the final raster
+    """
+    files = glob.glob(os.path.join(outputs_dir, f'{variable_name}_*.tif'))
+
+    # function to extract the dump time in seconds from the file name
+    def extract_dump_time(file_path):
+        return int(os.path.splitext(os.path.basename(file_path))[0].rsplit('_', 1)[-1])
+
+    files.sort(key=extract_dump_time)
+
+    if expected_count is not None and len(files) != expected_count:
+        raise ValueError(f"Found {len(files)} {variable_name} dumps in {outputs_dir}, expected {expected_count} "
+                         f"(TSTOP / DTDUMP); check that DTDUMP was set and every dump was written")
+
+    sim_data = []
+    sim_metadata = []
+    timestep_metadata = []
+
+    for file_path in files:
+        timestep_seconds = extract_dump_time(file_path)
+        try:
+            data, metadata = tif_to_npy(file_path)
+            sim_data.append(data)
+            sim_metadata.append({
+                'seconds': timestep_seconds,
+                'hours': timestep_seconds / 3600.0,
+                'file': file_path
+            })
+            timestep_metadata.append(metadata)
+            print(f"Loaded timestep {timestep_seconds / 3600.0:.1f}h: {data.shape}")
+        except Exception as e:
+            print(f"Error loading {file_path}: {e}")
+
+    if not files:
+        print(f"No {variable_name} files found in {outputs_dir}")
+
+    return sim_data, sim_metadata, timestep_metadata
+
+# channels that change with time, and static channels stored once per case
+DYNAMIC_CHANNELS = ['flin', 'time_of_arrival', 'vs']
+STATIC_CHANNELS = ['fuel_model']
+
+def assemble_case_array(var_data):
+    """
+    Fill one preallocated (timesteps, channel, h, w) array from per-variable lists of
+    (h, w) timesteps, without the intermediate stack/expand_dims/concatenate copies
+    """
+    ts_counts = [len(data) for data in var_data]
+
+    # raise an error if the number of timesteps is not the same for all variables
+    if len(set(ts_counts)) != 1:
+        raise ValueError("All variables must have the same number of timesteps")
+
+    first = var_data[0][0]
+    case_array = np.empty((ts_counts[0], len(var_data)) + first.shape, dtype=first.dtype)
+    for c, data in enumerate(var_data):
+        for t, timestep in enumerate(data):
+            case_array[t, c] = timestep
+    return case_array
+
+def load_case(case_file):
+    """
+    Load a saved case as (fire_data, static_data, metadata)
+
+    static_data is the (1, static channel, h, w) array stored once per case, broadcast
+    to (timesteps, static channel, h, w) as a read-only view without copying
+    """
+    with np.load(case_file, allow_pickle=True) as case:
+        fire_data = case['fire_data']
+        metadata = case['metadata'][0]
+        if 'static_data' in case:
+            static_data = np.broadcast_to(case['static_data'],
+                                          (fire_data.shape[0],) + case['static_data'].shape[1:])
+        else:
+            # older cases stored the fuel channel repeated in fire_data
+            static_data = fire_data[:, len(DYNAMIC_CHANNELS):]
+            fire_data = fire_data[:, :len(DYNAMIC_CHANNELS)]
+    return fire_data, static_data, metadata
+
+def case_tensor(case_file):
+    """Full (timesteps, channel, h, w) tensor of a case, in the order of metadata['channels']"""
+    fire_data, static_data, _ = load_case(case_file)
+    tensor = np.empty(fire_data.shape[:1] + (fire_data.shape[1] + static_data.shape[1],) + fire_data.shape[2:],
+                      dtype=np.result_type(fire_data, static_data))
+    tensor[:, :fire_data.shape[1]] = fire_data
+    tensor[:, fire_data.shape[1]:] = static_data
+    return tensor
+
+def next_case_num(output_dir):
+    """Next free case number in the cases directory"""
+    case_files = glob.glob(os.path.join(output_dir, 'case_*'))
+    if len(case_files) == 0:
+        print('no cases yet')
+        return 0
+
     # function to extract case num for proper sorting
-    def extract_casenum(dir_name):
-        basename = os.path.basename(dir_name)
-        timestep_str = basename.replace('case_', '')
-        return int(timestep_str)
-    # sort case_dirs by casenum
-    case_nums = []
-    case_nums = [extract_casenum(dir_name) for dir_name in case_dirs]
-    # get the max case num
-    max_case_num = max(case_nums)
-    new_case_num = max_case_num + 1
-
-# set output file path (going to save in cases directory as new case)
-output_file = os.path.join(output_dir, f'case_{new_case_num}.npz')
-
-# timesteps in case
-ts_in_case = [entry['seconds'] for entry in sim_metadata]
-
-# Prepare metadata (can be a dict, but must be converted for npz)
-metadata = {
-    'channels': ['flin', 'time_of_arrival', 'vs', 'fuel_model'],
-    'timesteps_in_case': ts_in_case,
-    'num_timesteps': num_timesteps,
-    'fuel_meta': fuel_meta,
-    'fire_meta': all_fire_meta
-}
-
-np.savez_compressed(output_file, fire_data=all_fire_vars, metadata=np.array([metadata], dtype=object))
-print(f"Saved case {new_case_num} data to {output_file}")
+    def extract_casenum(file_name):
+        basename = os.path.splitext(os.path.basename(file_name))[0]
+        return int(basename.replace('case_', ''))
+
+    # get the max case num so we can save as the next case
+    return max(extract_casenum(file_name) for file_name in case_files) + 1
+
+def build_case(results_dir='mult_timestep_outputs', fuel_file='./inputs/fbfm40.tif',
+               output_dir='./cases', legacy_mult_runs=False, tstop=None, dtdump=None):
+    """
+    Load the dumped fire variables and the fuel raster and save them as the next case
+
+    tstop and dtdump (seconds) default to the values in simulation_info.txt; the number
+    of dumps of every variable must be tstop / dtdump
+    """
+    var_data = []
+    all_fire_meta = []
+
+    expected_count = None
+    if not legacy_mult_runs:
+        info_tstop, info_dtdump = read_simulation_info(results_dir)
+        tstop = tstop if tstop is not None else info_tstop
+        dtdump = dtdump if dtdump is not None else info_dtdump
+        if tstop is None or dtdump is None:
+            print(f"Warning: no TSTOP/DTDUMP given or found in {results_dir}/simulation_info.txt, "
+                  f"the number of dumps is not checked")
+        else:
+            expected_count = expected_dump_count(tstop, dtdump)
+
+    for var in DYNAMIC_CHANNELS:
+        if legacy_mult_runs:
+            data, sim_metadata, timestep_metadata = load_mult_timestep_elmfire_data(
+                base_dir=results_dir,
+                variable_name=var
+            )
+        else:
+            data, sim_metadata, timestep_metadata = load_dumped_elmfire_data(
+                outputs_dir=results_dir,
+                variable_name=var,
+                expected_count=expected_count
+            )
+        var_data.append(data)
+        all_fire_meta.append({'var': var, 'meta': timestep_metadata})
+
+    fire_data = assemble_case_array(var_data)
+    num_timesteps = fire_data.shape[0]
+
+    # the fuel model is the same at every timestep, so it is saved once as (1, 1, h, w)
+    # and broadcast over the timesteps by load_case
+    fuel_array, fuel_meta = tif_to_npy(fuel_file, handle_nodata=False)
+    static_data = fuel_array[np.newaxis, np.newaxis, ...]
+
+    os.makedirs(output_dir, exist_ok=True)
+    new_case_num = next_case_num(output_dir)
+
+    # set output file path (going to save in cases directory as new case)
+    output_file = os.path.join(output_dir, f'case_{new_case_num}.npz')
+
+    # Prepare metadata (can be a dict, but must be converted for npz)
+    metadata = {
+        'channels': DYNAMIC_CHANNELS + STATIC_CHANNELS,
+        'dynamic_channels': DYNAMIC_CHANNELS,
+        'static_channels': STATIC_CHANNELS,
+        'timesteps_in_case': [entry['seconds'] for entry in sim_metadata],
+        'num_timesteps': num_timesteps,
+        'fuel_meta': fuel_meta,
+        'fire_meta': all_fire_meta
+    }
+
+    np.savez_compressed(output_file, fire_data=fire_data, static_data=static_data,
+                        metadata=np.array([metadata], dtype=object))
+    print(f"Saved case {new_case_num} data to {output_file}")
+    return output_file
+
+if __name__ == "__main__":
+    # by default mult_timestep_outputs holds the dumps of the single run from 0N-sims.sh;
+    # pass --legacy to stack the older sim_<seconds>s directories (one simulation per timestep)
+    parser = argparse.ArgumentParser(description="Build a multi-timestep case from ELMFIRE dumps")
+    parser.add_argument("--results_dir", default='mult_timestep_outputs', help="Directory with the dumped rasters")
+    parser.add_argument("--legacy", action="store_true", help="Stack sim_<seconds>s directories instead")
+    parser.add_argument("--tstop", type=float, help="Simulation stop time in seconds (default: simulation_info.txt)")
+    parser.add_argument("--dtdump", type=float, help="Dump interval in seconds (default: simulation_info.txt)")
+    args = parser.parse_args()
+
+    build_case(args.results_dir, legacy_mult_runs=args.legacy, tstop=args.tstop, dtdump=args.dtdump)
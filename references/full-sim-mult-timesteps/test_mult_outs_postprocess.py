@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for building multi-timestep cases from the DTDUMP dumps of one run.
+"""
+
+import numpy as np
+import pytest
+import rasterio
+import tempfile
+from pathlib import Path
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from mult_outs_postprocess import (tif_to_npy, load_dumped_elmfire_data, build_case, load_case, case_tensor,
+                                   assemble_case_array, expected_dump_count)
+
+def write_tif(data, path, nodata=-9999.0):
+    with rasterio.open(path, 'w', driver='GTiff', height=data.shape[0], width=data.shape[1], count=1,
+                       dtype=data.dtype, transform=from_origin(-60, 60, 30, 30), nodata=nodata) as dst:
+        dst.write(data, 1)
+
+def write_dumps(results_dir, dump_times, shape=(4, 4)):
+    """One raster per variable and dump time, named like ELMFIRE's outputs."""
+    results_dir.mkdir(parents=True, exist_ok=True)
+    for seconds in dump_times:
+        for variable in ('time_of_arrival', 'flin', 'vs'):
+            data = np.full(shape, seconds, dtype=np.float32)
+            write_tif(data, results_dir / f'{variable}_0000001_{seconds:07d}.tif')
+
+def write_info(results_dir, tstop, dtdump):
+    (results_dir / 'simulation_info.txt').write_text(
+        f"\nSimulation Parameters:\n====================\nStop Time: {tstop} seconds (1 hours)\n"
+        f"Output Interval: {dtdump} seconds\nRuntime: 1 seconds\n")
+
+def test_dumps_loaded_in_time_order():
+    """Every dump is loaded, sorted by its time, and the count is checked."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results_dir = Path(temp_dir) / 'mult_timestep_outputs'
+        write_dumps(results_dir, [3600, 1800, 5400])
+        data, sim_metadata, _ = load_dumped_elmfire_data(str(results_dir), 'flin', expected_count=3)
+        assert [entry['seconds'] for entry in sim_metadata] == [1800, 3600, 5400]
+        assert [d[0, 0] for d in data] == [1800, 3600, 5400]
+        assert expected_dump_count(5400, 1800) == 3
+
+        with pytest.raises(ValueError, match='expected 4'):
+            load_dumped_elmfire_data(str(results_dir), 'flin', expected_count=4)
+
+def test_single_final_raster_is_rejected():
+    """A run that only wrote its final raster does not silently become a T=1 case."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results_dir = Path(temp_dir) / 'mult_timestep_outputs'
+        write_dumps(results_dir, [22105])
+        write_info(results_dir, 21600, 1800)
+        fuel_file = Path(temp_dir) / 'fbfm40.tif'
+        write_tif(np.full((4, 4), 102, dtype=np.int16), fuel_file, nodata=None)
+
+        with pytest.raises(ValueError, match='expected 12'):
+            build_case(str(results_dir), str(fuel_file), str(Path(temp_dir) / 'cases'))
+
+def test_build_case_from_dumps():
+    """A complete set of dumps gives one case with the dump times as timesteps."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results_dir = Path(temp_dir) / 'mult_timestep_outputs'
+        write_dumps(results_dir, [1800, 3600])
+        write_info(results_dir, 3600, 1800)
+        fuel_file = Path(temp_dir) / 'fbfm40.tif'
+        write_tif(np.full((4, 4), 102, dtype=np.int16), fuel_file, nodata=None)
+
+        case_file = build_case(str(results_dir), str(fuel_file), str(Path(temp_dir) / 'cases'))
+        fire_data, static_data, metadata = load_case(case_file)
+        assert fire_data.shape == (2, 3, 4, 4)
+        assert metadata['timesteps_in_case'] == [1800, 3600]
+        assert static_data.shape == (2, 1, 4, 4) and (static_data == 102).all()
+
+def test_window_read_metadata():
+    """A windowed read returns the window and metadata georeferenced to it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tif = Path(temp_dir) / 'flin_0000001_0001800.tif'
+        data = np.arange(16, dtype=np.float32).reshape(4, 4)
+        data[0, 0] = -9999.0
+        write_tif(data, tif)
+
+        window_data, meta = tif_to_npy(str(tif), window=Window(-1, -1, 3, 3))
+        assert window_data.shape == (2, 2) and np.isnan(window_data[0, 0])
+        assert (meta['height'], meta['width']) == (2, 2) and meta['transform'] * (0, 0) == (-60.0, 60.0)
+
+        padded, meta = tif_to_npy(str(tif), window=Window(-1, -1, 3, 3), pad_nodata=True)
+        assert padded.shape == (3, 3) and np.isnan(padded[0]).all()
+        assert meta['transform'] * (0, 0) == (-90.0, 90.0)
+
+def test_assemble_case_array_matches_stack():
+    """The preallocated case array equals stacking the timesteps, channel by channel."""
+    rng = np.random.default_rng(0)
+    var_data = [[rng.random((4, 5)).astype(np.float32) for _ in range(3)] for _ in range(2)]
+    case_array = assemble_case_array(var_data)
+    assert case_array.shape == (3, 2, 4, 5) and case_array.dtype == np.float32
+    assert np.array_equal(case_array, np.stack([np.stack(data) for data in var_data], axis=1))
+
+    with pytest.raises(ValueError, match='same number of timesteps'):
+        assemble_case_array([var_data[0], var_data[1][:2]])
+
+def test_case_tensor_broadcasts_static_channels():
+    """The fuel channel is stored once and broadcast over timesteps without a copy."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results_dir = Path(temp_dir) / 'mult_timestep_outputs'
+        write_dumps(results_dir, [1800, 3600, 5400])
+        write_info(results_dir, 5400, 1800)
+        fuel_file = Path(temp_dir) / 'fbfm40.tif'
+        write_tif(np.arange(16, dtype=np.int16).reshape(4, 4), fuel_file, nodata=None)
+        case_file = build_case(str(results_dir), str(fuel_file), str(Path(temp_dir) / 'cases'))
+
+        with np.load(case_file, allow_pickle=True) as case:
+            assert case['static_data'].shape == (1, 1, 4, 4)
+        fire_data, static_data, metadata = load_case(case_file)
+        assert static_data.shape == (3, 1, 4, 4) and static_data.strides[0] == 0
+        assert not static_data.flags.writeable
+
+        tensor = case_tensor(case_file)
+        assert tensor.shape == (3, 4, 4, 4) and metadata['channels'][-1] == 'fuel_model'
+        assert np.array_equal(tensor[:, :3], fire_data)
+        assert all(np.array_equal(tensor[t, 3], np.arange(16).reshape(4, 4)) for t in range(3))
+        assert np.array_equal(tensor[:, 1, 0, 0], [1800, 3600, 5400])
+
+def test_legacy_case_layout():
+    """Older cases with the fuel channel repeated in fire_data load the same way."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fire = np.arange(2 * 3 * 4 * 4, dtype=np.float32).reshape(2, 3, 4, 4)
+        fuel = np.full((2, 1, 4, 4), 102, dtype=np.float32)
+        case_file = Path(temp_dir) / 'case_0.npz'
+        np.savez_compressed(case_file, fire_data=np.concatenate([fire, fuel], axis=1),
+                            metadata=np.array([{'channels': ['flin', 'time_of_arrival', 'vs', 'fuel_model']}],
+                                              dtype=object))
+
+        fire_data, static_data, _ = load_case(str(case_file))
+        assert np.array_equal(fire_data, fire) and np.array_equal(static_data, fuel)
+        assert np.array_equal(case_tensor(str(case_file)), np.concatenate([fire, fuel], axis=1))
+
+if __name__ == "__main__":
+    for test in [test_dumps_loaded_in_time_order, test_single_final_raster_is_rejected, test_build_case_from_dumps,
+                 test_window_read_metadata, test_assemble_case_array_matches_stack,
+                 test_case_tensor_broadcasts_static_channels, test_legacy_case_layout]:
+        test()
+        print(f"✓ {test.__name__}")
@@ -1,8 +1,12 @@
 import numpy as np
 import os
+import sys
 import glob
 import rasterio
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions'))
+from raster_window import read_window
+
 # This script takes in the time of arrival file, specified like so:
 # toa = './outputs/time_of_arrival_0000001_0001805.tif'
 # and converts it to a numpy array, which is then saved as a .npy file.
@@ -11,16 +15,23 @@ import rasterio
 # Desired shape: (timesteps, channel/band, h, w)
 
 # function to convert geotiff to numpy array
-def tif_to_npy(file_path, handle_nodata=True):
+def tif_to_npy(file_path, handle_nodata=True, window=None, pad_nodata=False):
     """
     Load a GeoTIFF file as a numpy array, optionally handling NoData values
+
+    If a rasterio window is given (e.g. case_summary.burned_window), only that
+    region is read and the returned metadata describes the window. Parts of the
+    window outside the raster are clipped, or filled with nodata if pad_nodata is set.
     """
     with rasterio.open(file_path) as src:
-        data = src.read(1)
+        meta = src.meta.copy()
+        data, window = read_window(src, window, pad_nodata)
+        if window is not None:
+            meta.update(height=data.shape[0], width=data.shape[1], transform=src.window_transform(window))
         # replace nodata values with nan if there are some
         if handle_nodata and src.nodata is not None:
             data = np.where(data==src.nodata, np.nan, data)
 
-        return data, src.meta
+        return data, meta
 
 